@@ -44,11 +44,20 @@ class ConfigLoader:
             'api_key': self._api_keys['openai'],
             'chat': {
                 'model': self._config.get('service', {}).get('openai', {}).get('chat', {}).get('model', 'gpt-4-turbo-preview'),
-                'temperature': self._config.get('service', {}).get('openai', {}).get('chat', {}).get('temperature', 0.1)
+                'temperature': self._config.get('service', {}).get('openai', {}).get('chat', {}).get('temperature', 0.1),
+                'structured_output': self._config.get('service', {}).get('openai', {}).get('chat', {}).get('structured_output', 'json_object')
             },
             'embedding': {
-                'model': self._health_mapping.get('openai', {}).get('embedding_model', 'text-embedding-ada-002')
-            }
+                'model': self._health_mapping.get('openai', {}).get('embedding_model', 'text-embedding-ada-002'),
+                'cache_max_entries': self._config.get('service', {}).get('openai', {}).get('embedding', {}).get('cache_max_entries', 50000),
+                'cache_path': self._config.get('service', {}).get('openai', {}).get('embedding', {}).get('cache_path', 'cache/embeddings.sqlite3'),
+                'cache_quantize': self._config.get('service', {}).get('openai', {}).get('embedding', {}).get('cache_quantize', False)
+            },
+            'http': self._config.get('service', {}).get('openai', {}).get('http', {}),
+            'max_concurrency': self._config.get('service', {}).get('openai', {}).get('max_concurrency', 8),
+            'llm_max_concurrency': self._config.get('service', {}).get('openai', {}).get('llm_max_concurrency', 4),
+            'rate_limit_retries': self._config.get('service', {}).get('openai', {}).get('rate_limit_retries', 5),
+            'rate_limit_max_wait': self._config.get('service', {}).get('openai', {}).get('rate_limit_max_wait', 30.0)
         }
         
         # 5. 서비스 설정
@@ -1,4 +1,4 @@
-from typing import Dict, Optional, List
+from typing import Dict, Optional, List, Union
 from pydantic import BaseModel
 import logging
 from datetime import datetime
@@ -11,8 +11,16 @@ class HealthDataAnalyzer:
         self.logger = logger
         self.config_loader = ConfigLoader()
 
-    async def analyze_health_data(self, data: Dict) -> Dict:
-        """건강 데이터 종합 분석"""
+    async def analyze_health_data(self, data: Union[Dict, BaseModel]) -> Dict:
+        """건강 데이터 종합 분석
+
+        Args:
+            data: 건강 데이터 딕셔너리 또는 Pydantic 모델 (모델은 model_dump 없이 그대로 전달)
+        """
+        return self.analyze_health_data_sync(data)
+
+    def analyze_health_data_sync(self, data: Union[Dict, BaseModel]) -> Dict:
+        """건강 데이터 종합 분석 (동기 CPU 작업, 이벤트 루프 밖에서 실행용)"""
         try:
             # 1. 데이터 파싱 및 검증
             health_data = self.parse_health_data(data)
@@ -35,9 +43,14 @@ class HealthDataAnalyzer:
             self.logger.error(f"건강 데이터 분석 중 오류: {str(e)}")
             raise
 
-    def parse_health_data(self, data: Dict) -> 'HealthData':
+    def parse_health_data(self, data: Union[Dict, BaseModel]) -> 'HealthData':
         """건강 데이터 파싱"""
         try:
+            if isinstance(data, HealthData):
+                return data
+            if isinstance(data, BaseModel):
+                # model_dump()의 재귀 복사 대신 최상위 필드만 얕게 매핑
+                data = dict(data)
             return HealthData(**data)
         except Exception as e:
             self.logger.error(f"건강 데이터 파싱 실패: {str(e)}")
@@ -10,6 +10,16 @@ import asyncio
 
 logger = setup_logger('data_source')
 
+def format_authors(authors) -> str:
+    """저자 목록(이름 문자열 또는 {'name': ...} 딕셔너리 리스트)을 쉼표로 구분된 문자열로 변환"""
+    if isinstance(authors, str):
+        return authors
+    if not authors:
+        return ""
+    if isinstance(authors[0], dict):
+        return ", ".join([author.get("name", "") for author in authors])
+    return ", ".join(map(str, authors))
+
 class DataSource(ABC):
     """데이터 소스 추상 클래스"""
     
@@ -49,7 +59,8 @@ class DataSourceManager:
             logger.info(f"데이터 수집 시작 - 소스: {source}")
             results = await data_source.search(query, max_results)
             
-            # 2. 상세 정보 수집
+            # 2. 상세 정보 수집 (수집 시각은 호출당 한 번만 생성)
+            collected_at = datetime.now().isoformat()
             detailed_results = []
             for result in results:
                 details = await data_source.get_details(result["id"])
@@ -58,7 +69,7 @@ class DataSourceManager:
                     "metadata": {
                         "source": source,
                         "query": query,
-                        "collected_at": datetime.now().isoformat()
+                        "collected_at": collected_at
                     }
                 })
             
@@ -442,6 +453,8 @@ class PubMedSource:
                 paper['processed_text'] = text + f"\nAnalysis:\n{clean_response}\n"
                 paper['llm_analysis'] = clean_response
                 paper['author_names'] = author_names
+                # 저장 단계에서 다시 변환하지 않도록 메타데이터용 문자열로 한 번만 변환
+                paper['authors'] = format_authors(authors)
                 
                 logger.info(f"=== 논문 처리 완료 - PMID: {pmid} ===")
                 return paper
@@ -1,30 +1,142 @@
-from typing import List, Dict, Set, Optional
-from models.supplement import Supplement, HealthEffect, Interaction
+from typing import List, Dict, Set, Optional, Tuple, Union, AsyncIterator
+from models.supplement import Supplement, HealthEffect, Interaction, PrimaryRecommendation
 from models.health_data import HealthData
 from config.config_loader import CONFIG
 from core.vector_db.vector_store_manager import ChromaManager
 from core.services.rag_service import RAGService
 from core.analysis.client_health_analyzer import HealthDataAnalyzer
 from utils.logger_config import PrettyLogger
-import json
-from datetime import datetime, date
+from utils.openai_client import retry_on_rate_limit
+from utils.response_cache import ResponseCache
+from utils.health_binning import health_cache_key
+from utils import json_utils
+from pydantic import TypeAdapter, ValidationError
+from collections import OrderedDict
+import asyncio
+from datetime import datetime
+from itertools import combinations
+from operator import attrgetter
+import numpy as np
 import time
 
 logger = PrettyLogger('health_service')
 
-class DateTimeEncoder(json.JSONEncoder):
-    def default(self, obj):
-        if isinstance(obj, (date, datetime)):
-            return obj.isoformat()
-        elif hasattr(obj, 'model_dump'):  # Pydantic v2
-            return obj.model_dump()
-        elif hasattr(obj, 'dict'):  # Pydantic v1
-            return obj.dict()
-        elif hasattr(obj, '__dict__'):  # 일반 객체
-            return obj.__dict__
-        return str(obj)  # 기타 타입은 문자열로 변환
+# LLM 프롬프트 템플릿 (정적 부분은 모듈 로드 시 한 번만 생성, 호출 시 동적 값만 치환)
+_PRIMARY_PROMPT = """
+            다음 건강 데이터와 검색된 영양제 정보를 바탕으로 추천할 영양제를 분석해주세요.
+            각 영양제별로 추천 이유를 자세히 설명해주시되, 실제 수치를 포함해서 설명해주세요.
+            
+            건강 데이터:
+            {health_context}
+            
+            검색된 영양제 정보:
+            {supplements_results}
+            
+            다음 형식의 JSON 객체로 응답해주세요:
+            {{
+                "items": [
+                    {{"name": "영양제_이름", "reason": "추천 이유 (수치 기반으로 설명)"}}
+                ]
+            }}
+            
+            응답은 한국어로 작성하고, 이유는 최대한 자세하게 설명해주세요.
+            """
+
+_CUSTOM_QUESTION_PROMPT = """
+            다음 건강 데이터와 추천된 영양제를 바탕으로, 가장 중요한 하나의 추가 질문을 생성해주세요:
+            
+            건강 데이터:
+            {health_context}
+            
+            추천된 영양제:
+            {recommendations}
+            
+            질문은:
+            1. 현재 건강 상태에서 가장 주의가 필요한 부분에 대해
+            2. 친근한 어조로
+            3. '-요'로 끝나도록
+            4. 30자 이내로 작성해주세요.
+            """
+
+# 1차 추천 프롬프트에 포함할 건강 컨텍스트 필드 (HealthDataAnalyzer.build_health_context 기준)
+_CONTEXT_KEYS = frozenset({
+    "basic_info",
+    "risk_factors",
+    "current_medications",
+    "current_supplements",
+    "health_conditions",
+    "lifestyle",
+    "analysis_data",
+    "cancer_data",
+})
+
+# 1차 추천 응답 원소 스키마 (스트리밍 중 완성된 원소마다 형식 검증)
+_PRIMARY_RECOMMENDATION_ADAPTER = TypeAdapter(PrimaryRecommendation)
+
+# 1차 추천 응답 형식 (service.openai.chat.structured_output 설정별)
+# json_schema는 지원 모델에서 스키마를 강제하고, json_object는 유효한 JSON만 보장
+_PRIMARY_RESPONSE_FORMATS = {
+    "json_schema": {
+        "type": "json_schema",
+        "json_schema": {
+            "name": "primary_recommendations",
+            "strict": True,
+            "schema": {
+                "type": "object",
+                "properties": {
+                    "items": {
+                        "type": "array",
+                        "items": {
+                            "type": "object",
+                            "properties": {
+                                "name": {"type": "string"},
+                                "reason": {"type": "string"}
+                            },
+                            "required": ["name", "reason"],
+                            "additionalProperties": False
+                        }
+                    }
+                },
+                "required": ["items"],
+                "additionalProperties": False
+            }
+        }
+    },
+    "json_object": {"type": "json_object"},
+}
+
+# 상호작용 분석 기본 질문 (호출마다 새 리스트를 만들지 않도록 모듈 수준 튜플로 공유)
+_DEFAULT_QUESTIONS: Tuple[str, ...] = (
+    "해당 영양제들을 함께 복용하신 적이 있나요?",
+    "복용 시 불편함을 느끼신 적이 있나요?",
+    "현재 다른 약물을 복용 중이신가요?"
+)
+
+# 상세 분석 쿼리 구성 규칙: (HealthData 섹션, 값 추출기, 포함 조건, 포맷터)
+_DETAILED_QUERY_FIELDS = (
+    # 1. 기본 건강 정보
+    ("vital_signs", attrgetter("blood_pressure_systolic", "blood_pressure_diastolic"), all, "혈압: {0[0]}/{0[1]}".format),
+    # 2. 혈액 검사 결과
+    ("blood_test", attrgetter("total_cholesterol"), bool, "총 콜레스테롤: {}".format),
+    ("blood_test", attrgetter("hdl_cholesterol"), bool, "HDL: {}".format),
+    ("blood_test", attrgetter("ldl_cholesterol"), bool, "LDL: {}".format),
+    # 3. 의료 이력
+    ("medical_history", attrgetter("chronic_conditions"), bool, lambda v: f"만성질환: {', '.join(v)}"),
+    ("medical_history", attrgetter("medications"), bool, lambda v: f"복용 중인 약물: {', '.join(v)}"),
+    # 4. 생활습관
+    ("lifestyle", attrgetter("exercise_frequency"), lambda v: v is not None, "운동 빈도: 주 {}회".format),
+    ("lifestyle", attrgetter("smoking"), bool, lambda v: "흡연자"),
+    ("lifestyle", attrgetter("alcohol_consumption"), bool, "음주: {}".format),
+)
 
 class HealthService:
+    CACHE_MAX_ENTRIES = 1024
+    # 상호작용 분석을 요청할 최대 영양제 쌍 수 (초과 시 유사도 상위 쌍만 분석)
+    MAX_INTERACTION_PAIRS = 10
+    # 건강 데이터 분석 결과 재사용 (동일 세션의 연속 요청용)
+    ANALYSIS_CACHE_MAX_ENTRIES = 256
+    ANALYSIS_CACHE_TTL = 300
+
     def __init__(self, chroma_manager: ChromaManager):
         self.chroma_manager = chroma_manager
         self.rag_service = RAGService(
@@ -32,12 +144,95 @@ class HealthService:
             openai_client=chroma_manager.openai_client
         )
         self.health_analyzer = HealthDataAnalyzer()
-        self.json_encoder = DateTimeEncoder()
+        # 동일 프롬프트 LLM 응답 캐시 (프롬프트 전체 해시 키, 사용자 간 공유 불가)
+        response_cache_settings = CONFIG.get_service_settings().get('response_cache', {})
+        self.response_cache = ResponseCache(
+            enabled=response_cache_settings.get('enabled', True),
+            ttl=response_cache_settings.get('ttl', 86400),
+            max_entries=response_cache_settings.get('max_entries', self.CACHE_MAX_ENTRIES)
+        )
+        # 구간화된 건강 데이터 키 기반 조회 캐시
+        self._search_cache: OrderedDict = OrderedDict()
+        self._interaction_cache: OrderedDict = OrderedDict()
+        # 분석 진행 중인 영양제 쌍 -> 결과 Future (동시 요청 간 중복 분석 방지)
+        self._interaction_inflight: Dict[Tuple, asyncio.Future] = {}
+        # 직렬화된 건강 데이터 -> (만료 시각, 분석 결과)
+        self._analysis_cache: OrderedDict = OrderedDict()
+        openai_settings = CONFIG.get_openai_settings()
+        # 동시 Chroma/OpenAI 호출 수 제한 (rate limit 방지)
+        self._semaphore = asyncio.Semaphore(openai_settings.get('max_concurrency') or 8)
+        # 채팅 완료 요청 전용 동시 실행 제한 및 429 재시도 설정
+        self._llm_semaphore = asyncio.Semaphore(openai_settings.get('llm_max_concurrency') or 4)
+        self._llm_retries = openai_settings.get('rate_limit_retries', 5)
+        self._llm_max_wait = openai_settings.get('rate_limit_max_wait', 30.0)
+        self._primary_response_format = _PRIMARY_RESPONSE_FORMATS.get(
+            openai_settings.get('chat', {}).get('structured_output', 'json_object')
+        )
+
+    def _cache_get(self, cache: OrderedDict, key):
+        """LRU 캐시 조회"""
+        if key in cache:
+            cache.move_to_end(key)
+            return cache[key]
+        return None
+
+    def _cache_put(self, cache: OrderedDict, key, value):
+        """LRU 캐시 저장"""
+        cache[key] = value
+        cache.move_to_end(key)
+        if len(cache) > self.CACHE_MAX_ENTRIES:
+            cache.popitem(last=False)
+
+    async def _analyze_cached(self, health_data: Union[HealthData, Dict], health_data_dict: Dict) -> Dict:
+        """건강 데이터 분석 (같은 데이터는 TTL 동안 분석 결과 재사용)
+        
+        analyze_health_metrics 이후 detailed_interaction_analysis가 같은 데이터로
+        호출될 때 분석기 실행을 한 번으로 줄입니다.
+        """
+        key = json_utils.dumps(health_data_dict)
+        now = time.monotonic()
+        cached = self._analysis_cache.get(key)
+        if cached is not None and cached[0] > now:
+            self._analysis_cache.move_to_end(key)
+            return cached[1]
+            
+        analysis_result = await asyncio.to_thread(
+            self.health_analyzer.analyze_health_data_sync, health_data
+        )
+        self._analysis_cache[key] = (now + self.ANALYSIS_CACHE_TTL, analysis_result)
+        self._analysis_cache.move_to_end(key)
+        if len(self._analysis_cache) > self.ANALYSIS_CACHE_MAX_ENTRIES:
+            self._analysis_cache.popitem(last=False)
+        return analysis_result
+
+    async def _bounded(self, coro):
+        """세마포어로 동시 실행 수를 제한하여 코루틴 실행"""
+        async with self._semaphore:
+            return await coro
+
+    async def _chat_completion(self, messages: List[Dict[str, str]]) -> Dict[str, str]:
+        """채팅 완료 요청 (동시 실행 제한 + RateLimitError 시 지수 백오프 재시도)"""
+        return await retry_on_rate_limit(
+            lambda: self.chroma_manager.openai_client.chat_completion(messages=messages),
+            semaphore=self._llm_semaphore,
+            retries=self._llm_retries,
+            max_wait=self._llm_max_wait
+        )
+
+    async def _cached_chat_completion(self, messages: List[Dict[str, str]]) -> Dict[str, str]:
+        """응답 캐시를 거치는 채팅 완료 요청 (같은 프롬프트 적중 시 LLM 호출 생략)"""
+        cached = self.response_cache.get(messages)
+        if cached is not None:
+            return cached
+            
+        response = await self._chat_completion(messages)
+        self.response_cache.set(messages, response)
+        return response
 
     def _serialize_json(self, data):
         """JSON 직렬화 헬퍼 메서드"""
         try:
-            return json.dumps(data, cls=DateTimeEncoder, ensure_ascii=False)
+            return json_utils.dumps(data)
         except Exception as e:
             logger.error(f"JSON 직렬화 중 오류: {str(e)}")
             # 기본값으로 안전하게 변환 시도
@@ -48,11 +243,11 @@ class HealthService:
         try:
             start_time = time.time()
             logger.info("건강 지표 분석 시작", step="초기화")
+            # 요청당 한 번만 직렬화하여 하위 헬퍼에 전달
+            health_data_dict = health_data.model_dump()
             
             # 1. 건강 데이터 상세 분석
-            analysis_result = await self.health_analyzer.analyze_health_data(
-                health_data.model_dump()
-            )
+            analysis_result = await self._analyze_cached(health_data, health_data_dict)
             logger.info("건강 데이터 분석 결과", data=analysis_result, step="데이터_분석")
             
             # 2. 1차 추천 (건강 지표별)
@@ -60,25 +255,36 @@ class HealthService:
             primary_recs = await self._get_primary_recommendations(
                 analysis_result.get("context", {})
             )
+            
+            # 추가 질문 생성은 1차 추천에만 의존하므로 나머지 포맷팅과 동시에 진행
+            question_task = asyncio.create_task(
+                self._generate_custom_question(health_data_dict, primary_recs)
+            )
             logger.info("1차 추천 결과", data=primary_recs, step="추천_완료")
             
-            # 3. 결과 포맷팅
+            # 3. 결과 포맷팅 (영양제 목록과 이유를 한 번의 순회로 구성)
+            names = []
+            reasons = {}
+            for rec in primary_recs:
+                name = rec["name"]
+                names.append(name)
+                reasons[name] = rec["reason"]
             result = {
                 '분석_요약': '현재 건강 데이터를 기반으로 분석했어요',
                 '추천': {
-                    '영양제': [rec["name"] for rec in primary_recs],
-                    '이유': {rec["name"]: rec["reason"] for rec in primary_recs}
-                },
-                '추가_질문': await self._generate_custom_question(health_data, primary_recs),
-                '분석_시간': f'{time.time() - start_time:.2f}초',
-                '분석_일시': datetime.now().isoformat()
+                    '영양제': names,
+                    '이유': reasons
+                }
             }
+            result['추가_질문'] = await question_task
+            result['분석_시간'] = f'{time.time() - start_time:.2f}초'
+            result['분석_일시'] = datetime.now().isoformat()
             
             logger.info("최종 분석 결과", data=result, step="분석_완료")
             return result
             
         except Exception as e:
-            logger.error("건강 지표 분석 중 오류", error=str(e))
+            logger.error("건강 지표 분석 중 오류", error=e)
             raise
 
     async def generate_interaction_notice(self, analysis: Dict) -> Dict:
@@ -94,9 +300,19 @@ class HealthService:
                 )
             }
         except Exception as e:
-            logger.error(f"상호작용 알림 생성 중 오류: {str(e)}")
+            logger.error("상호작용 알림 생성 중 오류", error=e)
             raise
 
+    @staticmethod
+    def _recommended_supplement_names(initial_recommendations: Dict) -> Optional[List]:
+        """초기 추천 결과에서 영양제 목록 추출 (형식을 알 수 없으면 None)"""
+        for container in (initial_recommendations, initial_recommendations.get('추천')):
+            if isinstance(container, dict):
+                for key in ('영양제', 'supplements'):
+                    if isinstance(container.get(key), list):
+                        return container[key]
+        return None
+
     async def detailed_interaction_analysis(
         self,
         health_data: HealthData,
@@ -110,10 +326,21 @@ class HealthService:
             if not initial_recommendations:
                 raise ValueError("initial_recommendations가 제공되지 않았습니다")
             
-            # 1. 상세 컨텍스트 검색
+            # 영양제가 2개 미만이면 상호작용이 있을 수 없으므로 컨텍스트 검색/RAG 분석 생략
+            supplement_names = self._recommended_supplement_names(initial_recommendations)
+            if supplement_names is not None and len(supplement_names) < 2:
+                return {
+                    "status": "success",
+                    "description": "상호작용을 분석할 영양제 조합이 없습니다",
+                    "interactions": []
+                }
+            
+            # 1. 상세 컨텍스트 검색 (직렬화는 요청당 한 번)
+            health_data_dict = health_data.model_dump()
             context = await self._get_detailed_context(
                 health_data,
-                initial_recommendations
+                initial_recommendations,
+                health_data_dict=health_data_dict
             )
             
             # 컨텍스트 검증
@@ -133,25 +360,25 @@ class HealthService:
             
             # 분석 결과 검증
             if not isinstance(analysis, dict):
-                logger.error(f"예상치 못한 분석 결과 형식: {type(analysis)}")
+                logger.error("예상치 못한 분석 결과 형식", data=type(analysis).__name__)
                 raise ValueError("분석 결과가 올바른 형식이 아닙니다")
             
             required_fields = {"status", "description"}
             if not all(field in analysis for field in required_fields):
-                logger.error(f"분석 결과에 필수 필드가 누락됨: {analysis}")
+                logger.error("분석 결과에 필수 필드가 누락됨", data=analysis)
                 raise ValueError("분석 결과에 필수 필드가 누락되었습니다")
             
             return analysis
             
         except ValueError as e:
-            logger.error(f"상세 분석 중 유효성 검증 오류: {str(e)}")
+            logger.error("상세 분석 중 유효성 검증 오류", error=e)
             return {
                 "status": "error",
                 "description": str(e),
                 "error_type": "validation_error"
             }
         except Exception as e:
-            logger.error(f"상세 분석 중 오류: {str(e)}")
+            logger.error("상세 분석 중 오류", error=e)
             return {
                 "status": "error",
                 "description": "상세 분석 중 오류가 발생했습니다",
@@ -164,6 +391,9 @@ class HealthService:
         recommendations: List[str],
         interactions: List[Dict]
     ) -> str:
+        if not interactions:
+            return ""
+            
         return f"""
             건강 상태 개선을 위해 {', '.join(recommendations)}을(를) 추천드립니다.
             
@@ -178,56 +408,224 @@ class HealthService:
         """건강 지표별 1차 추천"""
         try:
             logger.info("1차 추천 시작")
-            # 1. 건강 데이터를 문자열로 변환
-            health_context = json.dumps(health_data, ensure_ascii=False)
-            logger.info(f"건강 데이터 컨텍스트: {health_context}")
+            # 추천에 필요한 컨텍스트 필드만 남겨 프롬프트 토큰 수 절감
+            health_data = {k: v for k, v in health_data.items() if k in _CONTEXT_KEYS} or health_data
             
-            # 2. 영양제 검색
-            supplements_results = await self.chroma_manager.search_supplements(
-                query=f"다음 건강 데이터를 바탕으로 적절한 영양제를 추천해주세요: {health_context}",
-                n_results=5
-            )
-            logger.info(f"검색된 영양제 결과: {str(supplements_results)[:50]}...")
+            # 1. 건강 데이터를 문자열로 변환
+            health_context = json_utils.dumps(health_data)
+            logger.info("건강 데이터 컨텍스트", data=health_context)
+            
+            # 2. 영양제 검색 (구간화된 건강 데이터가 같으면 캐시 재사용)
+            # 캐시에는 검색 결과와 프롬프트용 직렬화 문자열을 함께 저장하여 재인코딩 생략
+            search_key = health_cache_key(health_data)
+            cached = self._cache_get(self._search_cache, search_key)
+            if cached is None:
+                supplements_results = await self.chroma_manager.search_supplements(
+                    query=f"다음 건강 데이터를 바탕으로 적절한 영양제를 추천해주세요: {health_context}",
+                    n_results=5,
+                    cache_key=search_key
+                )
+                supplements_json = json_utils.dumps(supplements_results)
+                if supplements_results:
+                    self._cache_put(self._search_cache, search_key, (supplements_results, supplements_json))
+            else:
+                supplements_results, supplements_json = cached
+            logger.info("검색된 영양제 결과", data=supplements_results)
             
             # 3. GPT를 통한 분석
-            analysis_prompt = f"""
-            다음 건강 데이터와 검색된 영양제 정보를 바탕으로 추천할 영양제를 분석해주세요.
-            각 영양제별로 추천 이유를 자세히 설명해주시되, 실제 수치를 포함해서 설명해주세요.
-            
-            건강 데이터:
-            {health_context}
-            
-            검색된 영양제 정보:
-            {json.dumps(supplements_results, ensure_ascii=False)}
-            
-            다음 형식으로 응답해주세요:
-            [
-                {{"name": "영양제_이름", "reason": "추천 이유 (수치 기반으로 설명)"}}
-            ]
-            
-            응답은 한국어로 작성하고, 이유는 최대한 자세하게 설명해주세요.
-            """
+            analysis_prompt = _PRIMARY_PROMPT.format_map({
+                "health_context": health_context,
+                "supplements_results": supplements_json
+            })
             
             logger.info("GPT 분석 요청 시작")
-            analysis = await self.chroma_manager.openai_client.chat_completion(
-                messages=[{"role": "user", "content": analysis_prompt}]
-            )
-            logger.info(f"GPT 분석 결과: {analysis}")
-            
-            # 4. 결과 파싱
-            try:
-                recommendations = json.loads(analysis['content'])
-                logger.info(f"1차 추천 결과: {recommendations}")
-                return recommendations
-            except json.JSONDecodeError as e:
-                logger.error(f"1차 추천 결과 파싱 실패: {str(e)}")
-                return []
+            # 4. 스트리밍 응답에서 완성된 추천 항목부터 파싱
+            recommendations = [
+                rec async for rec in self._iter_primary_recommendations(
+                    messages=[{"role": "user", "content": analysis_prompt}]
+                )
+            ]
+            logger.info("1차 추천 결과", data=recommendations)
+            return recommendations
                 
         except Exception as e:
             logger.error("-" * 50)  # 구분선 추가
             logger.error(f"1차 추천 생성 중 오류 발생: {str(e)}", exc_info=True)
             return []
     
+    async def _iter_primary_recommendations(self, messages: List[Dict[str, str]]) -> AsyncIterator[Dict]:
+        """1차 추천 LLM 응답을 스트리밍으로 받아 추천 항목을 완성되는 대로 반환
+        
+        응답 토큰 수신과 JSON 파싱/검증을 겹쳐 처리하며, 응답 캐시 적중 시에는
+        저장된 응답을 같은 파서로 한 번에 처리합니다.
+        """
+        parser = json_utils.ArrayItemParser()
+        cached = self.response_cache.get(messages)
+        if cached is not None:
+            for rec in self._validate_primary_items(parser.feed(cached['content'])):
+                yield rec
+            return
+            
+        content = []
+        yielded = 0
+        # 본문 수신이 끝날(또는 스트림이 닫힐) 때까지 동시 실행 슬롯을 유지하여
+        # llm_max_concurrency가 스트리밍 요청에도 적용되도록 함 (재시도는 연결 단계에만 적용)
+        async with self._llm_semaphore:
+            stream = await retry_on_rate_limit(
+                lambda: self.chroma_manager.openai_client.open_chat_stream(
+                    messages=messages,
+                    response_format=self._primary_response_format
+                ),
+                retries=self._llm_retries,
+                max_wait=self._llm_max_wait
+            )
+            try:
+                async for chunk in stream:
+                    content.append(chunk)
+                    for rec in self._validate_primary_items(parser.feed(chunk)):
+                        yielded += 1
+                        yield rec
+            except json_utils.JSONDecodeError as e:
+                logger.error("1차 추천 결과 파싱 실패", error=e)
+                return
+            finally:
+                await stream.aclose()
+            
+        # 배열이 끝까지 수신되고 유효한 항목이 하나 이상일 때만 캐시 (잘린 응답/빈 응답 재사용 방지)
+        if parser.done and yielded:
+            self.response_cache.set(messages, {'content': ''.join(content), 'role': 'assistant'})
+        else:
+            logger.warning("1차 추천 응답이 불완전하여 캐시하지 않음", data={"items": yielded, "complete": parser.done})
+    
+    @staticmethod
+    def _validate_primary_items(items: List) -> List[Dict]:
+        """파싱된 추천 항목 중 형식이 맞는 것만 반환"""
+        valid = []
+        for item in items:
+            try:
+                valid.append(_PRIMARY_RECOMMENDATION_ADAPTER.validate_python(item))
+            except ValidationError as e:
+                logger.warning("1차 추천 항목 형식 오류", data={"item": item, "error": str(e)})
+        return valid
+    
+    async def _select_interaction_pairs(self, names: List[str]) -> List[Tuple[int, int]]:
+        """상호작용 분석 대상 영양제 쌍 선택
+        
+        쌍의 수가 MAX_INTERACTION_PAIRS 이하이면 모든 쌍을 반환하고,
+        초과하면 영양제 임베딩의 코사인 유사도 행렬에서 상위 쌍만 선택합니다.
+        
+        Args:
+            names: 영양제 이름 리스트
+            
+        Returns:
+            names 기준 (i, j) 인덱스 쌍 리스트
+        """
+        pairs = list(combinations(range(len(names)), 2))
+        if len(pairs) <= self.MAX_INTERACTION_PAIRS:
+            return pairs
+            
+        try:
+            embeddings = await self.chroma_manager.get_supplement_embeddings(names)
+            vectors = np.asarray(embeddings, dtype=np.float32)
+            norms = np.linalg.norm(vectors, axis=1, keepdims=True)
+            norms[norms == 0] = 1.0
+            vectors /= norms
+            
+            # N×N 코사인 유사도 행렬의 상삼각 성분에서 상위 K개 쌍 선택
+            similarity = vectors @ vectors.T
+            rows, cols = np.triu_indices(len(names), k=1)
+            pair_scores = similarity[rows, cols]
+            top = np.argpartition(-pair_scores, self.MAX_INTERACTION_PAIRS - 1)[:self.MAX_INTERACTION_PAIRS]
+            top = top[np.argsort(-pair_scores[top])]
+            
+            return [(int(rows[i]), int(cols[i])) for i in top]
+            
+        except Exception as e:
+            logger.error("상호작용 후보 쌍 선택 중 오류", error=e)
+            return pairs
+
+    async def _pairwise_supplement_interactions(
+        self,
+        recommendations: List[Dict],
+        health_data: Optional[Dict]
+    ) -> List[Dict]:
+        """영양제 쌍별 상호작용 분석 (건강 영향/약물 분석 없이 쌍 분석만 수행)"""
+        if len(recommendations) < 2:
+            return []
+            
+        # 상호작용 프롬프트에는 원본 health_data가 그대로 들어가므로 구간화하지 않고
+        # 프롬프트와 같은 직렬화 결과를 캐시 키로 사용
+        health_data = health_data if health_data else {}
+        health_key = json_utils.dumps(health_data)
+        
+        # 영양제 이름을 한 번만 추출해 두고 쌍은 인덱스로 참조
+        names = [rec['name'] for rec in recommendations]
+        pairs = await self._select_interaction_pairs(names)
+        # 쌍 순서와 무관한 키 (A+B와 B+A는 같은 분석 결과 공유)
+        cache_keys = [(frozenset((names[i], names[j])), health_key) for i, j in pairs]
+        results = [self._cache_get(self._interaction_cache, key) for key in cache_keys]
+        
+        # 캐시에 없는 쌍 중 다른 요청이 이미 분석 중인 쌍은 그 결과를 기다리고,
+        # 나머지만 모아 한 번의 일괄 요청으로 분석
+        loop = asyncio.get_running_loop()
+        owned, waiting = [], []
+        for i, interaction in enumerate(results):
+            if interaction is not None:
+                continue
+            future = self._interaction_inflight.get(cache_keys[i])
+            if future is None:
+                self._interaction_inflight[cache_keys[i]] = loop.create_future()
+                owned.append(i)
+            else:
+                waiting.append((i, future))
+                
+        if owned:
+            batch = None
+            try:
+                batch = await self._bounded(
+                    self.chroma_manager.get_supplement_interactions_batch(
+                        health_data=health_data,
+                        supplement_groups=[(names[pairs[i][0]], names[pairs[i][1]]) for i in owned],
+                        # 1차 추천/상세 분석과 같은 LLM 동시 실행 한도를 공유
+                        llm_semaphore=self._llm_semaphore
+                    )
+                )
+            except Exception as e:
+                batch = [e] * len(owned)
+            finally:
+                # 취소 시에도 같은 쌍을 기다리는 요청이 멈추지 않도록 Future를 항상 해제
+                if batch is None:
+                    batch = [RuntimeError("상호작용 분석이 취소되었습니다")] * len(owned)
+                for i, interaction in zip(owned, batch):
+                    results[i] = interaction
+                    if isinstance(interaction, dict) and interaction.get("status") == "success":
+                        self._cache_put(self._interaction_cache, cache_keys[i], interaction)
+                    future = self._interaction_inflight.pop(cache_keys[i])
+                    if not future.done():
+                        future.set_result(interaction)
+                    
+        for i, future in waiting:
+            # 대기 측 취소가 공유 Future를 취소하지 않도록 shield
+            results[i] = await asyncio.shield(future)
+        
+        supplement_interactions = []
+        for (i, j), interaction in zip(pairs, results):
+            if isinstance(interaction, Exception):
+                logger.error("상호작용 분석 중 오류", error=interaction)
+                supplement_interactions.append({
+                    "supplements": [names[i], names[j]],
+                    "description": f"분석 중 오류 발생: {str(interaction)}",
+                    "evidence": []
+                })
+            elif interaction and interaction.get("status") == "success":
+                supplement_interactions.append({
+                    "supplements": [names[i], names[j]],
+                    "description": interaction.get("description", "상호작용 정보가 없습니다."),
+                    "evidence": interaction.get("evidence", [])
+                })
+        
+        return supplement_interactions
+
     async def _analyze_interactions(
         self,
         recommendations: List[Dict],
@@ -235,70 +633,69 @@ class HealthService:
         user_profile: Optional[Dict]
     ) -> Dict:
         """간섭도 분석"""
-        interactions = {
-            "supplement_interactions": [],
-            "health_condition_impacts": [],
-            "medication_interactions": []
-        }
+        has_medications = bool(user_profile and user_profile.get('medications'))
         
         # 1. 영양제 간 상호작용
-        for i, supp1 in enumerate(recommendations):
-            for supp2 in recommendations[i+1:]:
-                # 영양제 정보 구성
-                supplements_info = {
-                    supp1['name']: supp1.get('related', []),
-                    supp2['name']: supp2.get('related', [])
-                }
-                
-                try:
-                    # 상호작용 분석 요청
-                    interaction = await self.chroma_manager.get_supplement_interaction(
-                        health_data=health_data if health_data else {},
-                        current_supplements=[supp1['name'], supp2['name']]
-                    )
-                    
-                    if interaction and interaction.get("status") == "success":
-                        interactions["supplement_interactions"].append({
-                            "supplements": [supp1['name'], supp2['name']],
-                            "description": interaction.get("description", "상호작용 정보가 없습니다."),
-                            "evidence": interaction.get("evidence", [])
-                        })
-                except Exception as e:
-                    logger.error(f"상호작용 분석 중 오류: {str(e)}")
-                    interactions["supplement_interactions"].append({
-                        "supplements": [supp1['name'], supp2['name']],
-                        "description": f"분석 중 오류 발생: {str(e)}",
-                        "evidence": []
-                    })
+        supplement_interactions = await self._pairwise_supplement_interactions(
+            recommendations,
+            health_data
+        )
+        
+        # 건강 데이터와 약물 정보가 없으면 쌍 분석 결과만으로 바로 반환
+        if not health_data and not has_medications:
+            return {
+                "supplement_interactions": supplement_interactions,
+                "health_condition_impacts": [],
+                "medication_interactions": []
+            }
+        
+        # 섹션별 결과는 지역 리스트에 모은 뒤 마지막에 한 번만 딕셔너리로 구성
+        health_condition_impacts = []
+        medication_interactions = []
         
         # 2. 건강 상태에 미치는 영향 (health_data가 있는 경우에만)
         if health_data:
-            for supp in recommendations:
-                try:
-                    impacts = await self.chroma_manager.get_health_impacts(
-                        supplement=supp['name'],
+            try:
+                results = await self._bounded(
+                    self.chroma_manager.get_health_impacts_batch(
+                        supplements=[supp['name'] for supp in recommendations],
                         health_data=health_data
                     )
+                )
+                for impacts in results:
                     if impacts:
-                        interactions["health_condition_impacts"].extend(impacts)
-                except Exception as e:
-                    logger.error(f"건강 영향 분석 중 오류: {str(e)}")
+                        health_condition_impacts.extend(impacts)
+            except Exception as e:
+                logger.error("건강 영향 분석 중 오류", error=e)
 
         # 3. 약물 상호작용 (사용자 프로필이 있는 경우)
-        if user_profile and 'medications' in user_profile:
-            for supp in recommendations:
-                for med in user_profile['medications']:
-                    try:
-                        interaction = await self.chroma_manager.get_medication_interaction(
-                            supplement=supp['name'],
-                            medication=med
-                        )
-                        if interaction:
-                            interactions["medication_interactions"].append(interaction)
-                    except Exception as e:
-                        logger.error(f"약물 상호작용 분석 중 오류: {str(e)}")
+        if has_medications:
+            async def _medication_interaction(supp: Dict, med: str) -> Optional[Dict]:
+                # 메서드 조회 오류도 gather 결과의 예외로 수집되도록 코루틴 내부에서 호출
+                return await self.chroma_manager.get_medication_interaction(
+                    supplement=supp['name'],
+                    medication=med
+                )
+            
+            results = await asyncio.gather(
+                *[
+                    self._bounded(_medication_interaction(supp, med))
+                    for supp in recommendations
+                    for med in user_profile['medications']
+                ],
+                return_exceptions=True
+            )
+            for interaction in results:
+                if isinstance(interaction, Exception):
+                    logger.error("약물 상호작용 분석 중 오류", error=interaction)
+                elif interaction:
+                    medication_interactions.append(interaction)
         
-        return interactions
+        return {
+            "supplement_interactions": supplement_interactions,
+            "health_condition_impacts": health_condition_impacts,
+            "medication_interactions": medication_interactions
+        }
 
     async def analyze_interactions(self, recommendations: Dict[str, List[str]]) -> Dict:
         """영양제 간 상호작용 분석"""
@@ -314,7 +711,7 @@ class HealthService:
                     for supp_name, related in recommendations.items()
                 ]
             except Exception as e:
-                logger.error(f"추천 데이터 형식 변환 실패: {str(e)}")
+                logger.error("추천 데이터 형식 변환 실패", error=e)
                 raise ValueError("올바르지 않은 추천 데이터 형식입니다")
             
             # 상호작용 분석
@@ -353,7 +750,7 @@ class HealthService:
             }
             
         except ValueError as e:
-            logger.error(f"영양제 상호작용 분석 중 유효성 검증 오류: {str(e)}")
+            logger.error("영양제 상호작용 분석 중 유효성 검증 오류", error=e)
             return {
                 "has_interactions": False,
                 "interactions": [{
@@ -365,7 +762,7 @@ class HealthService:
                 "evidence": []
             }
         except Exception as e:
-            logger.error(f"영양제 상호작용 분석 중 오류: {str(e)}")
+            logger.error("영양제 상호작용 분석 중 오류", error=e)
             return {
                 "has_interactions": False,
                 "interactions": [{
@@ -377,19 +774,15 @@ class HealthService:
                 "evidence": []
             }
 
-    def _get_default_questions(self) -> List[str]:
-        """기본 질문 목록 반환"""
-        return [
-            "해당 영양제들을 함께 복용하신 적이 있나요?",
-            "복용 시 불편함을 느끼신 적이 있나요?",
-            "현재 다른 약물을 복용 중이신가요?"
-        ]
+    def _get_default_questions(self) -> Tuple[str, ...]:
+        """기본 질문 목록 반환 (공유 불변 튜플)"""
+        return _DEFAULT_QUESTIONS
 
     def _get_interaction_questions(self, analysis_result: Dict) -> List[str]:
         """분석 결과에 따른 맞춤 질문 생성"""
         try:
             severity = analysis_result.get("severity", "unknown")
-            base_questions = self._get_default_questions()
+            base_questions = list(_DEFAULT_QUESTIONS)
             
             if severity == "high":
                 base_questions.append("이전에 비슷한 영양제 조합으로 부작용을 경험하신 적이 있나요?")
@@ -402,67 +795,15 @@ class HealthService:
             logger.error(f"맞춤 질문 생성 중 오류: {str(e)}")
             return self._get_default_questions()
 
-    def _analyze_health_condition(self, field: str, values: Dict) -> Optional[str]:
-        """건강 지표를 분석하여 상태를 판단합니다."""
-        try:
-            if field == "blood_pressure":
-                systolic = values.get("systolic", 0)
-                diastolic = values.get("diastolic", 0)
-                if systolic >= 140 or diastolic >= 90:
-                    return "hypertension"
-                elif systolic >= 130 or diastolic >= 85:
-                    return "prehypertension"
-            
-            elif field == "cholesterol":
-                total = values.get("total", 0)
-                ldl = values.get("ldl", 0)
-                hdl = values.get("hdl", 0)
-                if total > 240 or ldl > 160 or hdl < 40:
-                    return "high_cholesterol"
-            
-            elif field == "blood_sugar":
-                fasting = values.get("fasting", 0)
-                post_meal = values.get("post_meal", 0)
-                if fasting > 100 or post_meal > 140:
-                    return "prediabetes"
-            
-            elif field == "vitamin_d":
-                if values < 20:
-                    return "vitamin_d_deficiency"
-            
-            elif field == "omega_3_index":
-                if values < 4:
-                    return "omega3_deficiency"
-            
-            return None
-            
-        except Exception as e:
-            logger.error(f"건강 상태 분석 중 오류: {str(e)}")
-            return None 
-
-    async def _generate_custom_question(self, health_data: HealthData, recommendations: List[Dict]) -> str:
-        """건강 데이터 기반 맞춤 질문 생성"""
+    async def _generate_custom_question(self, health_data_dict: Dict, recommendations: List[Dict]) -> str:
+        """건강 데이터 기반 맞춤 질문 생성 (health_data_dict는 호출 측에서 model_dump한 결과)"""
         try:
-            # 건강 데이터를 안전하게 직렬화
-            health_data_dict = health_data.model_dump() if hasattr(health_data, 'model_dump') else health_data.dict()
+            prompt = _CUSTOM_QUESTION_PROMPT.format_map({
+                "health_context": json_utils.dumps(health_data_dict),
+                "recommendations": json_utils.dumps(recommendations)
+            })
             
-            prompt = f"""
-            다음 건강 데이터와 추천된 영양제를 바탕으로, 가장 중요한 하나의 추가 질문을 생성해주세요:
-            
-            건강 데이터:
-            {json.dumps(health_data_dict, cls=DateTimeEncoder, ensure_ascii=False)}
-            
-            추천된 영양제:
-            {json.dumps(recommendations, cls=DateTimeEncoder, ensure_ascii=False)}
-            
-            질문은:
-            1. 현재 건강 상태에서 가장 주의가 필요한 부분에 대해
-            2. 친근한 어조로
-            3. '-요'로 끝나도록
-            4. 30자 이내로 작성해주세요.
-            """
-            
-            response = await self.chroma_manager.openai_client.chat_completion(
+            response = await self._cached_chat_completion(
                 messages=[{"role": "user", "content": prompt}]
             )
             
@@ -475,46 +816,57 @@ class HealthService:
     async def _get_detailed_context(
         self,
         health_data: HealthData,
-        initial_recommendations: Dict
+        initial_recommendations: Dict,
+        health_data_dict: Optional[Dict] = None
     ) -> Dict:
-        """상세 컨텍스트 검색"""
+        """상세 컨텍스트 검색
+        
+        Args:
+            health_data: 건강 데이터
+            initial_recommendations: 초기 추천 결과
+            health_data_dict: 호출 측에서 이미 model_dump한 결과 (없으면 여기서 한 번 생성)
+        """
         try:
             logger.info("상세 컨텍스트 검색 시작")
-            logger.info(f"입력 health_data 타입: {type(health_data)}")
-            logger.info(f"입력 health_data 내용: {health_data.model_dump()}")
-            logger.info(f"입력 initial_recommendations: {initial_recommendations}")
+            # 로깅/컨텍스트 구성에 재사용할 직렬화 결과 (요청당 한 번)
+            if health_data_dict is None:
+                health_data_dict = health_data.model_dump()
+            # 입력 정보는 구조화된 필드로 전달 (로그 레벨이 꺼져 있으면 포맷팅하지 않음)
+            logger.info("상세 컨텍스트 검색 입력", data={
+                "health_data_type": type(health_data).__name__,
+                "health_data": health_data_dict,
+                "initial_recommendations": initial_recommendations
+            })
             
             # 1. 건강 데이터 분석
-            analysis_result = await self.health_analyzer.analyze_health_data(health_data.model_dump())
-            logger.info(f"건강 데이터 분석 결과 -def _get_detailed_context : {analysis_result}")
+            analysis_result = await self._analyze_cached(health_data, health_data_dict)
+            logger.info("건강 데이터 분석 결과 - _get_detailed_context", data=analysis_result)
             
             # 2. 초기 추천사항과 분석 결과 통합
             try:
                 medical_history = health_data.medical_history
-                logger.info(f"medical_history 데이터: {medical_history}")
+                logger.info("medical_history 데이터", data=medical_history)
                 
                 lifestyle = health_data.lifestyle
-                logger.info(f"lifestyle 데이터: {lifestyle}")
+                logger.info("lifestyle 데이터", data=lifestyle)
                 
                 context = {
                     "health_analysis": analysis_result,
                     "initial_recommendations": initial_recommendations,
                     "current_medications": medical_history.medications if medical_history else [],
                     "chronic_conditions": medical_history.chronic_conditions if medical_history else [],
-                    "lifestyle_factors": lifestyle.dict() if lifestyle else {}
+                    "lifestyle_factors": health_data_dict.get("lifestyle") or {}
                 }
-                logger.info(f"생성된 context: {context}")
+                logger.info("생성된 context", data=context)
             except Exception as e:
-                logger.error(f"컨텍스트 생성 중 에러 - 타입: {type(e).__name__}")
-                logger.error(f"에러 메시지: {str(e)}")
-                logger.error("스택 트레이스:", exc_info=True)
+                logger.error("컨텍스트 생성 중 에러", error=e, exc_info=True)
                 raise
             
             # 3. 관련 건강 지표 매핑
             try:
                 health_metrics = {}
                 if health_data.vital_signs:
-                    logger.info(f"vital_signs 데이터: {health_data.vital_signs}")
+                    logger.info("vital_signs 데이터", data=health_data.vital_signs)
                     health_metrics.update({
                         "blood_pressure": {
                             "systolic": health_data.vital_signs.blood_pressure_systolic,
@@ -523,7 +875,7 @@ class HealthService:
                     })
                 
                 if health_data.blood_test:
-                    logger.info(f"blood_test 데이터: {health_data.blood_test}")
+                    logger.info("blood_test 데이터", data=health_data.blood_test)
                     health_metrics.update({
                         "cholesterol": {
                             "total": health_data.blood_test.total_cholesterol,
@@ -541,60 +893,33 @@ class HealthService:
                     })
                 
                 context["health_metrics"] = health_metrics
-                logger.info(f"최종 health_metrics: {health_metrics}")
+                logger.info("최종 health_metrics", data=health_metrics)
             except Exception as e:
-                logger.error(f"건강 지표 매핑 중 에러 - 타입: {type(e).__name__}")
-                logger.error(f"에러 메시지: {str(e)}")
-                logger.error("스택 트레이스:", exc_info=True)
+                logger.error("건강 지표 매핑 중 에러", error=e, exc_info=True)
                 raise
             
             return context
             
         except Exception as e:
-            logger.error(f"상세 컨텍스트 검색 중 오류 - 타입: {type(e).__name__}")
-            logger.error(f"에러 메시지: {str(e)}")
-            logger.error("스택 트레이스:", exc_info=True)
-            logger.error(f"전체 health_data: {health_data.model_dump() if health_data else None}")
+            logger.error(
+                "상세 컨텍스트 검색 중 오류",
+                error=e,
+                data={"health_data": health_data_dict},
+                exc_info=True
+            )
             raise 
 
     def _create_detailed_query(self, health_data: HealthData) -> str:
         """건강 데이터를 기반으로 상세 분석을 위한 쿼리를 생성합니다."""
         try:
             query_parts = []
-            
-            # 1. 기본 건강 정보
-            if health_data.vital_signs:
-                vital_signs = health_data.vital_signs
-                if vital_signs.blood_pressure_systolic and vital_signs.blood_pressure_diastolic:
-                    query_parts.append(f"혈압: {vital_signs.blood_pressure_systolic}/{vital_signs.blood_pressure_diastolic}")
-            
-            # 2. 혈액 검사 결과
-            if health_data.blood_test:
-                blood_test = health_data.blood_test
-                if blood_test.total_cholesterol:
-                    query_parts.append(f"총 콜레스테롤: {blood_test.total_cholesterol}")
-                if blood_test.hdl_cholesterol:
-                    query_parts.append(f"HDL: {blood_test.hdl_cholesterol}")
-                if blood_test.ldl_cholesterol:
-                    query_parts.append(f"LDL: {blood_test.ldl_cholesterol}")
-            
-            # 3. 의료 이력
-            if health_data.medical_history:
-                medical_history = health_data.medical_history
-                if medical_history.chronic_conditions:
-                    query_parts.append(f"만성질환: {', '.join(medical_history.chronic_conditions)}")
-                if medical_history.medications:
-                    query_parts.append(f"복용 중인 약물: {', '.join(medical_history.medications)}")
-            
-            # 4. 생활습관
-            if health_data.lifestyle:
-                lifestyle = health_data.lifestyle
-                if lifestyle.exercise_frequency is not None:
-                    query_parts.append(f"운동 빈도: 주 {lifestyle.exercise_frequency}회")
-                if lifestyle.smoking:
-                    query_parts.append("흡연자")
-                if lifestyle.alcohol_consumption:
-                    query_parts.append(f"음주: {lifestyle.alcohol_consumption}")
+            for section, getter, guard, formatter in _DETAILED_QUERY_FIELDS:
+                section_data = getattr(health_data, section)
+                if not section_data:
+                    continue
+                value = getter(section_data)
+                if guard(value):
+                    query_parts.append(formatter(value))
             
             # 쿼리 조합
             return " AND ".join(query_parts) if query_parts else "기본 건강 분석"
@@ -609,22 +934,25 @@ class HealthService:
             logger.info("건강 지표 분석 시작")
             
             # 건강 데이터 분석
-            analysis_result = await self._analyze_health_data(health_data)
-            logger.info(f"건강 데이터 분석 결과 - analyze_supplements: {analysis_result}")
+            # 분석기(CPU 작업)는 워커 스레드에서 실행
+            analysis_result = await self._analyze_cached(health_data, health_data)
+            logger.info("건강 데이터 분석 결과 - analyze_supplements", data=analysis_result)
             
             # 1차 추천
             logger.info("1차 추천 요청 시작")
-            recommendations = await self._get_primary_recommendations(analysis_result)
-            logger.info(f"1차 추천 결과 타입: {type(recommendations)}")
-            logger.info(f"1차 추천 결과 내용: {recommendations}")
+            recommendations = await self._get_primary_recommendations(
+                analysis_result.get("context", analysis_result)
+            )
+            logger.info("1차 추천 결과 타입", data=type(recommendations).__name__)
+            logger.info("1차 추천 결과 내용", data=recommendations)
             
             try:
                 # 최종 분석 결과 생성
                 영양제_목록 = [rec["name"] for rec in recommendations]
-                logger.info(f"영양제 목록 생성: {영양제_목록}")
+                logger.info("영양제 목록 생성", data=영양제_목록)
                 
                 이유_매핑 = {rec["name"]: rec["reason"] for rec in recommendations}
-                logger.info(f"이유 매핑 생성: {이유_매핑}")
+                logger.info("이유 매핑 생성", data=이유_매핑)
                 
                 final_result = {
                     "분석_요약": "현재 건강 데이터를 기반으로 분석했어요",
@@ -637,19 +965,23 @@ class HealthService:
                     "분석_일시": datetime.now().isoformat()
                 }
                 
-                logger.info(f"최종 분석 결과: {final_result}")
+                logger.info("최종 분석 결과", data=final_result)
                 return final_result
                 
             except Exception as e:
-                logger.error(f"최종 결과 생성 중 에러 발생 - 타입: {type(e).__name__}")
-                logger.error(f"에러 메시지: {str(e)}")
-                logger.error("스택 트레이스:", exc_info=True)
-                logger.error(f"recommendations 데이터: {recommendations}")
+                logger.error(
+                    "최종 결과 생성 중 에러 발생",
+                    error=e,
+                    data={"recommendations": recommendations},
+                    exc_info=True
+                )
                 raise
                 
         except Exception as e:
-            logger.error(f"분석 중 에러 발생 - 타입: {type(e).__name__}")
-            logger.error(f"에러 메시지: {str(e)}")
-            logger.error("스택 트레이스:", exc_info=True)
-            logger.error(f"입력 데이터: {health_data}")
+            logger.error(
+                "분석 중 에러 발생",
+                error=e,
+                data={"health_data": health_data},
+                exc_info=True
+            )
             raise 
\ No newline at end of file
@@ -1,15 +1,110 @@
-from typing import Dict, List, Optional
+from typing import Dict, FrozenSet, List, Optional, Set
+import asyncio
 from datetime import datetime
 from utils.logger_config import get_logger
 from core.vector_db.vector_store_manager import ChromaManager
 from models.health_data import HealthData
 from config.config_loader import CONFIG
+from utils.uuid_pool import fast_uuid4
 import json
+import numpy as np
 
 logger = get_logger('pattern_service')
 
-class PatternService:
+# 유사도 가중치
+SIMILARITY_WEIGHTS = {"entity": 0.4, "effect": 0.4, "context": 0.2}
+
+class _PatternIndex:
+    """패턴 유형별 SoA(Struct of Arrays) 저장소 (벡터화된 유사도 계산용)
+    
+    엔티티 포함 행렬(행은 패턴, 열은 엔티티)과 효과 코드/신뢰도/빈도를 패턴 행 순서의
+    병렬 배열로 보관하며, 패턴 추가 시 용량을 두 배씩 늘려 재할당 횟수를 줄입니다.
+    """
+    
     def __init__(self):
+        self.ids: List[str] = []
+        self.rows: Dict[str, int] = {}
+        self.vocab: Dict[str, int] = {}
+        self.effect_vocab: Dict = {}
+        self.entity_matrix = np.zeros((8, 8), dtype=bool)
+        self.entity_counts = np.zeros(8, dtype=np.int32)
+        self.effect_codes = np.zeros(8, dtype=np.int32)
+        self.confidences = np.zeros(8, dtype=np.float64)
+        self.frequencies = np.zeros(8, dtype=np.int32)
+        
+    def __len__(self) -> int:
+        return len(self.ids)
+        
+    def _grow(self, rows_needed: int, cols_needed: int):
+        """행/열 용량이 부족하면 두 배로 늘려 재할당"""
+        rows_cap, cols_cap = self.entity_matrix.shape
+        if rows_needed <= rows_cap and cols_needed <= cols_cap:
+            return
+            
+        new_rows = rows_needed * 2 if rows_needed > rows_cap else rows_cap
+        new_cols = cols_needed * 2 if cols_needed > cols_cap else cols_cap
+        grown = np.zeros((new_rows, new_cols), dtype=bool)
+        grown[:rows_cap, :cols_cap] = self.entity_matrix
+        self.entity_matrix = grown
+        
+        for name in ("entity_counts", "effect_codes", "confidences", "frequencies"):
+            current = getattr(self, name)
+            resized = np.zeros(new_rows, dtype=current.dtype)
+            resized[:rows_cap] = current
+            setattr(self, name, resized)
+        
+    def add(self, pattern_id: str, entities: FrozenSet[str], effect, confidence: float) -> int:
+        """패턴 행 추가 (entities는 패턴 생성 시 만든 frozenset), 추가된 행 번호 반환"""
+        row = len(self.ids)
+        cols = [self.vocab.setdefault(entity, len(self.vocab)) for entity in entities]
+        self._grow(row + 1, len(self.vocab))
+            
+        self.entity_matrix[row, cols] = True
+        self.entity_counts[row] = len(cols)
+        self.effect_codes[row] = self.effect_vocab.setdefault(effect, len(self.effect_vocab))
+        self.confidences[row] = confidence
+        self.frequencies[row] = 1
+        self.ids.append(pattern_id)
+        self.rows[pattern_id] = row
+        return row
+        
+    def strengthen(self, row: int, confidence: float):
+        """기존 패턴 행의 신뢰도(빈도 가중 평균)와 빈도를 제자리 갱신"""
+        frequency = self.frequencies[row]
+        self.confidences[row] = (self.confidences[row] * frequency + confidence) / (frequency + 1)
+        self.frequencies[row] = frequency + 1
+        
+    def entity_similarity(self, query: FrozenSet[str], rows: Optional[np.ndarray] = None) -> np.ndarray:
+        """패턴과의 엔티티 Jaccard 유사도 (rows가 없으면 전체 패턴 대상)"""
+        if rows is None:
+            rows = np.arange(len(self.ids))
+        cols = [self.vocab[entity] for entity in query if entity in self.vocab]
+        
+        intersection = self.entity_matrix[np.ix_(rows, cols)].sum(axis=1) if cols else np.zeros(len(rows))
+        union = self.entity_counts[rows] + len(query) - intersection
+        with np.errstate(divide="ignore", invalid="ignore"):
+            return np.where(union > 0, intersection / union, 0.0)
+            
+    def effect_similarity(self, effect, rows: Optional[np.ndarray] = None) -> np.ndarray:
+        """패턴과의 효과 일치 여부 (1.0/0.0 배열, rows가 없으면 전체 패턴 대상)"""
+        codes = self.effect_codes[:len(self.ids)] if rows is None else self.effect_codes[rows]
+        code = self.effect_vocab.get(effect)
+        if code is None:
+            return np.zeros(len(codes))
+        return (codes == code).astype(float)
+
+class PatternService:
+    # 패턴 임베딩 ANN 검색 설정 (패턴 수가 적으면 전체 벡터화 검색이 더 빠름)
+    # ANN은 후보 선별에만 쓰고 최종 판정은 구조적 유사도로 다시 계산하므로 후보는 넉넉히 가져옴
+    COLLECTION_NAME = "patterns"
+    ANN_MIN_PATTERNS = 1000
+    ANN_CANDIDATES = 50
+
+    def __init__(self, chroma_manager: Optional[ChromaManager] = None):
+        self.chroma_manager = chroma_manager
+        self._pattern_collection = None
+        # 최초 사용 시 컬렉션 재생성이 동시에 두 번 실행되지 않도록 보호
+        self._collection_lock = asyncio.Lock()
         self.patterns = {
             "supplement_interactions": {},
             "health_conditions": {},
@@ -18,58 +113,57 @@ class PatternService:
         }
         self.feedback_history = []
         self.confidence_threshold = 0.7
+        self._indexes = {pattern_type: _PatternIndex() for pattern_type in self.patterns}
+        # 임베딩을 Chroma에 반영 중인 패턴 유형 (ANN_MIN_PATTERNS 도달 후부터)
+        self._mirrored: Set[str] = set()
 
-    async def initialize(self):
-        """패턴 학습 시스템 초기화"""
-        self.patterns = {
-            "supplement_interactions": {},
-            "health_conditions": {},
-            "medication_interactions": {},
-            "temporal_patterns": {}
-        }
-        
     async def learn_from_interaction(self, data: Dict):
         """새로운 상호작용에서 패턴 학습"""
         try:
+            # 타임스탬프는 학습 1회당 한 번만 생성하여 하위 단계에 전달
+            timestamp = datetime.now().isoformat()
+            
             # 1. 패턴 추출
-            pattern = await self._extract_pattern(data)
+            pattern = await self._extract_pattern(data, timestamp)
             
-            # 2. 유사 패턴 검색
-            similar_patterns = self._find_similar_patterns(pattern)
+            # 2. 유사 패턴 검색 (패턴이 많으면 ANN 후보에 대해서만 정밀 비교)
+            candidate_ids = await self._ann_candidates(pattern)
+            similar_patterns = self._find_similar_patterns(pattern, candidate_ids)
             
             # 3. 패턴 강화 또는 새로운 패턴 추가
             if similar_patterns:
                 await self._strengthen_pattern(similar_patterns[0], pattern)
             else:
-                await self._add_new_pattern(pattern)
+                await self._add_new_pattern(pattern, timestamp)
                 
             # 4. 피드백 기록
-            self._record_feedback(pattern)
+            self._record_feedback(pattern, timestamp)
             
         except Exception as e:
             logger.error(f"패턴 학습 실패: {str(e)}")
             raise
 
-    async def _extract_pattern(self, data: Dict) -> Dict:
+    async def _extract_pattern(self, data: Dict, timestamp: Optional[str] = None) -> Dict:
         """데이터에서 패턴 추출"""
         return {
             "type": data.get("interaction_type"),
             "entities": data.get("entities", []),
+            # 유사도 계산에서 매번 set을 만들지 않도록 생성 시 한 번만 구성
+            "entities_set": frozenset(data.get("entities", [])),
             "effect": data.get("effect"),
             "confidence": data.get("confidence", 0.0),
             "context": data.get("context", {}),
-            "timestamp": datetime.now().isoformat()
+            "timestamp": timestamp or datetime.now().isoformat()
         }
 
     async def _strengthen_pattern(self, existing: Dict, new: Dict):
         """기존 패턴 강화"""
-        # 1. 신뢰도 업데이트
-        existing["confidence"] = (
-            existing["confidence"] * existing["frequency"] + new["confidence"]
-        ) / (existing["frequency"] + 1)
-        
-        # 2. 빈도 증가
-        existing["frequency"] += 1
+        # 1. 신뢰도/빈도 업데이트 (SoA 배열에서 제자리 계산 후 딕셔너리 뷰에 반영)
+        index = self._indexes[existing["type"]]
+        row = index.rows[existing["pattern_id"]]
+        index.strengthen(row, new["confidence"])
+        existing["confidence"] = float(index.confidences[row])
+        existing["frequency"] = int(index.frequencies[row])
         
         # 3. 컨텍스트 병합
         existing["context"] = self._merge_contexts(
@@ -77,75 +171,177 @@ class PatternService:
             new["context"]
         )
 
-    async def _add_new_pattern(self, pattern: Dict):
+    async def _add_new_pattern(self, pattern: Dict, timestamp: Optional[str] = None):
         """새로운 패턴 추가"""
         pattern_type = pattern["type"]
-        pattern_id = f"{pattern_type}_{len(self.patterns[pattern_type])}"
+        # 초기화 후에도 이전 패턴과 겹치지 않는 ID
+        pattern_id = fast_uuid4()
         
         self.patterns[pattern_type][pattern_id] = {
             **pattern,
+            "pattern_id": pattern_id,
             "frequency": 1,
-            "last_updated": datetime.now().isoformat(),
+            "last_updated": timestamp or datetime.now().isoformat(),
             "related_patterns": []
         }
+        self._indexes[pattern_type].add(
+            pattern_id, pattern["entities_set"], pattern["effect"], pattern["confidence"]
+        )
+        await self._mirror_patterns(pattern_type, [pattern_id])
 
-    def _find_similar_patterns(self, pattern: Dict) -> List[Dict]:
-        """유사한 패턴 검색"""
-        pattern_type = pattern["type"]
-        similar_patterns = []
+    @staticmethod
+    def _pattern_text(pattern: Dict) -> str:
+        """패턴 임베딩용 텍스트"""
+        return f"{pattern['type']} {' '.join(pattern['entities'])} {pattern['effect']}"
+
+    async def _get_pattern_collection(self):
+        """패턴 임베딩 컬렉션 조회 (최초 사용 시 생성, Chroma가 없으면 None)
         
-        for existing_pattern in self.patterns[pattern_type].values():
-            similarity_score = self._calculate_similarity(
-                pattern,
-                existing_pattern
-            )
-            if similarity_score >= self.confidence_threshold:
-                similar_patterns.append(existing_pattern)
+        패턴은 메모리에만 있으므로 이전 프로세스가 남긴 컬렉션은 현재 패턴과 ID가
+        맞지 않습니다. 최초 사용 시 기존 컬렉션을 지우고 새로 만듭니다.
+        """
+        if self.chroma_manager is None:
+            return None
+        async with self._collection_lock:
+            if self._pattern_collection is None:
+                client = self.chroma_manager.client
+                try:
+                    await asyncio.to_thread(client.delete_collection, self.COLLECTION_NAME)
+                except Exception:
+                    # 아직 생성되지 않은 경우
+                    pass
+                # 임베딩은 직접 전달하므로 Chroma 기본 임베딩 함수는 사용하지 않음
+                self._pattern_collection = await asyncio.to_thread(
+                    client.get_or_create_collection,
+                    name=self.COLLECTION_NAME,
+                    metadata={"hnsw:space": "cosine", "description": "학습된 상호작용 패턴"},
+                    embedding_function=None
+                )
+        return self._pattern_collection
+
+    async def _mirror_patterns(self, pattern_type: str, pattern_ids: List[str]):
+        """패턴 임베딩을 HNSW 컬렉션에 저장
         
-        return sorted(
-            similar_patterns,
-            key=lambda x: x["confidence"],
-            reverse=True
-        )
+        ANN 검색은 ANN_MIN_PATTERNS 이상에서만 쓰이므로 그 전에는 저장하지 않고,
+        처음 도달했을 때 해당 유형의 전체 패턴을 한 번에 저장한 뒤 이후 새 패턴만 추가합니다.
+        """
+        if pattern_type not in self._mirrored:
+            if len(self._indexes[pattern_type]) < self.ANN_MIN_PATTERNS:
+                return
+            pattern_ids = list(self._indexes[pattern_type].ids)
+            
+        try:
+            collection = await self._get_pattern_collection()
+            if collection is None:
+                return
+            patterns = self.patterns[pattern_type]
+            embeddings = await self.chroma_manager.embedding_creator.embed_matrix(
+                [self._pattern_text(patterns[pattern_id]) for pattern_id in pattern_ids],
+                cache_in_memory=False
+            )
+            # 임베딩 생성에 실패한 (0 벡터) 패턴은 제외 (전체 검색 대상에는 그대로 남음)
+            mask = embeddings.any(axis=1)
+            ids = [pattern_id for pattern_id, valid in zip(pattern_ids, mask) if valid]
+            if ids:
+                await asyncio.to_thread(
+                    collection.upsert,
+                    ids=ids,
+                    embeddings=embeddings[mask],
+                    metadatas=[{"type": pattern_type}] * len(ids)
+                )
+            self._mirrored.add(pattern_type)
+        except Exception as e:
+            logger.warning(f"패턴 임베딩 저장 실패: {str(e)}")
 
-    def _calculate_similarity(self, pattern1: Dict, pattern2: Dict) -> float:
-        """패턴 간 유사도 계산"""
-        # 1. 엔티티 유사도
-        entity_similarity = len(
-            set(pattern1["entities"]) & set(pattern2["entities"])
-        ) / len(set(pattern1["entities"]) | set(pattern2["entities"]))
+    async def _ann_candidates(self, pattern: Dict) -> Optional[List[str]]:
+        """ANN 검색으로 유사 패턴 후보 ID 조회 (전체 검색을 사용할 경우 None)"""
+        if pattern["type"] not in self._mirrored:
+            return None
+            
+        try:
+            collection = await self._get_pattern_collection()
+            if collection is None:
+                return None
+            embedding = (await self.chroma_manager.embedding_creator(self._pattern_text(pattern)))[0]
+            results = await asyncio.to_thread(
+                collection.query,
+                query_embeddings=[embedding],
+                n_results=self.ANN_CANDIDATES,
+                where={"type": pattern["type"]}
+            )
+            # 텍스트 임베딩 거리는 구조적 유사도와 척도가 다르므로 거리로 거르지 않고
+            # 후보 전체를 _find_similar_patterns에서 구조적 유사도로 다시 판정
+            return results["ids"][0]
+        except Exception as e:
+            logger.warning(f"패턴 ANN 검색 실패, 전체 검색으로 대체: {str(e)}")
+            return None
+
+    def _find_similar_patterns(self, pattern: Dict, candidate_ids: Optional[List[str]] = None) -> List[Dict]:
+        """유사한 패턴 검색
         
-        # 2. 효과 유사도
-        effect_similarity = 1.0 if pattern1["effect"] == pattern2["effect"] else 0.0
+        Args:
+            pattern: 비교할 패턴
+            candidate_ids: 비교 대상을 제한할 패턴 ID (None이면 전체 패턴)
+        """
+        pattern_type = pattern["type"]
+        index = self._indexes[pattern_type]
+        if not len(index):
+            return []
+            
+        if candidate_ids is None:
+            rows = np.arange(len(index))
+        else:
+            # 현재 메모리에 없는 (초기화 이전) 패턴 ID는 제외
+            rows = np.array([index.rows[i] for i in candidate_ids if i in index.rows], dtype=np.intp)
+            if not len(rows):
+                return []
+            
+        # 엔티티/효과 유사도는 대상 패턴 전체에 대해 한 번에 계산
+        entity_similarity = index.entity_similarity(pattern["entities_set"], rows)
+        effect_similarity = index.effect_similarity(pattern["effect"], rows)
         
-        # 3. 컨텍스트 유사도
-        context_similarity = self._calculate_context_similarity(
-            pattern1.get("context", {}),
-            pattern2.get("context", {})
+        # 컨텍스트 유사도를 최대(1.0)로 가정해도 임계값에 못 미치는 패턴은 먼저 제외
+        partial_scores = (
+            SIMILARITY_WEIGHTS["entity"] * entity_similarity +
+            SIMILARITY_WEIGHTS["effect"] * effect_similarity
         )
+        viable = partial_scores + SIMILARITY_WEIGHTS["context"] >= self.confidence_threshold
+        rows = rows[viable]
+        if not len(rows):
+            return []
         
-        # 가중치 적용
-        weights = {"entity": 0.4, "effect": 0.4, "context": 0.2}
-        final_similarity = (
-            weights["entity"] * entity_similarity +
-            weights["effect"] * effect_similarity +
-            weights["context"] * context_similarity
+        patterns = self.patterns[pattern_type]
+        context = pattern.get("context", {})
+        context_similarity = np.fromiter(
+            (self._calculate_context_similarity(context, patterns[index.ids[row]].get("context", {})) for row in rows),
+            dtype=float,
+            count=len(rows)
         )
         
-        return final_similarity
+        scores = partial_scores[viable] + SIMILARITY_WEIGHTS["context"] * context_similarity
+        similar_rows = rows[scores >= self.confidence_threshold]
+        
+        # 신뢰도 배열 기준 내림차순 정렬 (같은 신뢰도는 기존 순서 유지)
+        order = np.argsort(-index.confidences[similar_rows], kind="stable")
+        return [patterns[index.ids[row]] for row in similar_rows[order]]
 
     def _calculate_context_similarity(self, context1: Dict, context2: Dict) -> float:
-        """컨텍스트 유사도 계산"""
-        all_keys = set(context1.keys()) | set(context2.keys())
+        """컨텍스트 유사도 계산 (키 집합을 만들지 않고 작은 쪽만 순회)"""
+        if len(context1) > len(context2):
+            context1, context2 = context2, context1
+            
+        shared_keys = 0
+        matching_values = 0
+        for key, value in context1.items():
+            if key in context2:
+                shared_keys += 1
+                if context2[key] == value:
+                    matching_values += 1
+                    
+        all_keys = len(context1) + len(context2) - shared_keys
         if not all_keys:
             return 0.0
-            
-        matching_keys = set(context1.keys()) & set(context2.keys())
-        matching_values = sum(
-            1 for k in matching_keys if context1[k] == context2[k]
-        )
-        
-        return matching_values / len(all_keys)
+        return matching_values / all_keys
 
     def _merge_contexts(self, context1: Dict, context2: Dict) -> Dict:
         """컨텍스트 병합"""
@@ -162,11 +358,11 @@ class PatternService:
                 
         return merged
 
-    def _record_feedback(self, pattern: Dict):
+    def _record_feedback(self, pattern: Dict, timestamp: Optional[str] = None):
         """피드백 기록"""
         self.feedback_history.append({
             "pattern": pattern,
-            "timestamp": datetime.now().isoformat(),
+            "timestamp": timestamp or datetime.now().isoformat(),
             "action": "new" if pattern.get("is_new") else "strengthen"
         })
 
@@ -1,31 +1,147 @@
-from typing import Dict, List, Optional
+from typing import Any, ClassVar, Dict, FrozenSet, List, Optional, Tuple
+import asyncio
 import logging
-from datetime import datetime
 from utils.openai_client import OpenAIClient
 from core.services.pattern_service import PatternService
 from core.vector_db.vector_store_manager import ChromaManager
 import itertools
 from models.health_data import HealthData
+from models.supplement import PatternAnalysisResult
+from pydantic import TypeAdapter, ValidationError
 from config.config_loader import CONFIG
 from utils.logger_config import PrettyLogger
-import json
-import uuid
-from json import JSONEncoder
+from utils.uuid_pool import fast_uuid4
+import copy
+import hashlib
+from collections import OrderedDict
+from utils import json_utils
 
 logger = PrettyLogger('rag_service')
 
-class DateTimeEncoder(JSONEncoder):
-    def default(self, obj):
-        if isinstance(obj, datetime):
-            return obj.isoformat()
-        return super().default(obj)
+# 신뢰도 등급 -> 점수
+_CONFIDENCE_LEVEL_SCORES = {
+    'high': 1.0,
+    'medium': 0.8,
+    'low': 0.5
+}
+
+# 프롬프트 템플릿 (고정 부분은 모듈 로드 시 한 번만 구성, 요청마다 format_map으로 채움)
+_DETAILED_ANALYSIS_PROMPT = """
+        다음 건강 데이터와 검색 결과를 바탕으로 상세한 영양제 분석을 수행해주세요:
+
+        건강 데이터:
+        {health_json}
+
+        검색 결과:
+        {search_json}
+
+        다음 기준으로 분석해주세요:
+        1. 각 추천의 신뢰도와 근거 명시
+        2. 현재 복용 중인 영양제와의 상호작용
+        3. 사용자의 건강 상태를 고려한 주의사항
+        4. 데이터 부족 시 명확히 표시
+        """
+
+# 패턴 분석 응답 검증기 (필수 필드와 타입을 한 번에 검사)
+_PATTERN_RESULT_ADAPTER = TypeAdapter(PatternAnalysisResult)
+
+_PATTERN_ANALYSIS_SYSTEM_PROMPT = "당신은 건강 데이터를 분석하고 영양제 상호작용을 평가하는 전문가입니다. 반드시 순수한 JSON 형식으로만 응답해야 합니다. 마크다운 코드 블록이나 다른 포맷팅을 사용하지 마세요."
+
+_PATTERN_ANALYSIS_PROMPT = """
+            다음 건강 데이터와 컨텍스트를 바탕으로 상세 분석을 수행하여 정확한 JSON 형식으로 응답해주세요.
+            코드 블록이나 마커(```json 등)를 사용하지 말고 순수한 JSON 형식으로만 응답해주세요.
+
+            분석 쿼리: {query}
+
+            컨텍스트 정보:
+            {context_json}
+
+            다음 형식의 JSON으로 정확히 응답해주세요:
+            {{
+                "status": "success",
+                "description": "상세한 상호작용 설명",
+                "evidence": ["근거1", "근거2"],
+                "severity": "high/medium/low",
+                "confidence_score": 0.95
+            }}
+
+            응답은 반드시 위의 JSON 형식을 따라야 하며, 모든 필드가 포함되어야 합니다.
+            """
 
 class RAGService:
+    # 패턴 분석 응답 캐시 크기 (같은 쿼리/컨텍스트의 LLM 호출 생략)
+    RESPONSE_CACHE_SIZE = 512
+    # 분석 시각처럼 요청마다 바뀌는 컨텍스트 키 (캐시 키/프롬프트에서 제외)
+    _VOLATILE_CONTEXT_KEYS: ClassVar[FrozenSet[str]] = frozenset({'analysis_timestamp', 'timestamp'})
+    # 건강 데이터 필수 필드
+    _REQUIRED_FIELDS: ClassVar[FrozenSet[str]] = frozenset({
+        'basic_info',
+        'vital_signs',
+        'blood_test',
+        'lifestyle',
+        'medical_history'
+    })
+    # 복용 중인 영양제가 없을 때의 상호작용 검색 결과
+    _EMPTY_INTERACTION_RESULT: ClassVar[Dict] = {
+        "status": "success",
+        "supplements": [],
+        "description": "복용 중인 영양제가 없어 상호작용 검색을 생략했습니다.",
+        "evidence": []
+    }
+
     def __init__(self, chroma_manager: ChromaManager, openai_client: OpenAIClient):
         self.chroma_manager = chroma_manager
         self.openai_client = openai_client
-        self.pattern_service = PatternService()
+        self.pattern_service = PatternService(chroma_manager)
         self.MIN_CONFIDENCE_THRESHOLD = 0.7
+        # 정규화된 (쿼리, 컨텍스트) 해시 -> 분석 결과
+        self._response_cache: OrderedDict = OrderedDict()
+
+    async def _stream_json_object(self, messages: List[Dict[str, str]]) -> Tuple[Any, str]:
+        """스트리밍 응답에서 첫 JSON 객체가 닫히는 즉시 파싱하여 반환
+        
+        객체가 완성되면 나머지 토큰을 기다리지 않고 스트림을 닫습니다.
+        
+        Returns:
+            (파싱된 객체 또는 None, 수신한 응답 텍스트)
+        """
+        chunks = await self.openai_client.open_chat_stream(messages=messages)
+        parser = json_utils.ObjectParser()
+        content = []
+        try:
+            async for chunk in chunks:
+                content.append(chunk)
+                result = parser.feed(chunk)
+                if parser.done:
+                    return result, ''.join(content)
+        finally:
+            await chunks.aclose()
+        return None, ''.join(content)
+
+    @classmethod
+    def _stable_context(cls, value: Any) -> Any:
+        """요청마다 바뀌는 시각 키를 제거한 컨텍스트 사본 (같은 건강 데이터면 같은 값)"""
+        if isinstance(value, dict):
+            return {
+                key: cls._stable_context(item)
+                for key, item in value.items()
+                if key not in cls._VOLATILE_CONTEXT_KEYS
+            }
+        if isinstance(value, list):
+            return [cls._stable_context(item) for item in value]
+        return value
+
+    @classmethod
+    def _serialize_context(cls, query: str, context: dict) -> Tuple[bytes, str]:
+        """컨텍스트를 키 정렬 JSON으로 한 번만 직렬화하여 (캐시 키, 프롬프트용 JSON) 반환
+        
+        분석 시각 등 매번 바뀌는 키는 제외하여 같은 데이터의 반복 요청이 같은 키가 되도록 합니다.
+        """
+        context_json = json_utils.dumps(cls._stable_context(context), sort_keys=True)
+        digest = hashlib.blake2b(query.encode(), digest_size=16)
+        digest.update(b"\0")
+        digest.update(context_json.encode())
+        return digest.digest(), context_json
 
     async def analyze_health_data(self, health_data):
         try:
@@ -69,32 +185,30 @@ class RAGService:
 
     def _validate_health_data(self, health_data):
         """건강 데이터 유효성 검증"""
-        required_fields = {
-            'basic_info',
-            'vital_signs',
-            'blood_test',
-            'lifestyle',
-            'medical_history'
-        }
-        return all(field in health_data for field in required_fields)
+        return self._REQUIRED_FIELDS.issubset(health_data)
 
     def _validate_confidence(self, analysis_result):
         if 'data_quality' not in analysis_result:
             return False
             
-        confidence = analysis_result['data_quality'].get('confidence_level', 'low')
-        return {
-            'high': 1.0,
-            'medium': 0.8,
-            'low': 0.5
-        }.get(confidence, 0) >= self.MIN_CONFIDENCE_THRESHOLD
+        data_quality = analysis_result['data_quality']
+        confidence = data_quality.get('confidence_level', 'low')
+        return _CONFIDENCE_LEVEL_SCORES.get(confidence, 0) >= self.MIN_CONFIDENCE_THRESHOLD
 
     async def _perform_analysis(self, health_data, current_supplements):
-        # 벡터 스토어에서 관련 정보 검색
-        search_result = await self.chroma_manager.get_supplement_interaction(
-            health_data, 
-            current_supplements
-        )
+        if not current_supplements:
+            # 복용 중인 영양제가 없으면 상호작용 대상이 없으므로 벡터 검색/상호작용 분석 생략
+            search_result = self._EMPTY_INTERACTION_RESULT
+            health_json = json_utils.dumps(health_data)
+        else:
+            # 벡터 스토어 검색(네트워크 대기) 동안 프롬프트용 건강 데이터 직렬화를 스레드에서 동시 수행
+            search_result, health_json = await asyncio.gather(
+                self.chroma_manager.get_supplement_interaction(
+                    health_data, 
+                    current_supplements
+                ),
+                asyncio.to_thread(json_utils.dumps, health_data)
+            )
 
         if search_result['status'] != 'success':
             return search_result
@@ -103,12 +217,13 @@ class RAGService:
         try:
             detailed_analysis = await self._generate_detailed_analysis(
                 health_data,
-                search_result
+                search_result,
+                health_json=health_json
             )
             
             return {
                 "status": "success",
-                "analysis_id": str(uuid.uuid4()),
+                "analysis_id": fast_uuid4(),
                 "recommendations": detailed_analysis.get('recommendations', {}),
                 "data_quality": detailed_analysis.get('data_quality', {}),
                 "context": {
@@ -125,31 +240,23 @@ class RAGService:
                 "error_details": str(e)
             }
 
-    async def _generate_detailed_analysis(self, health_data, search_result):
-        prompt = f"""
-        다음 건강 데이터와 검색 결과를 바탕으로 상세한 영양제 분석을 수행해주세요:
-
-        건강 데이터:
-        {json.dumps(health_data, indent=2, ensure_ascii=False)}
-
-        검색 결과:
-        {json.dumps(search_result, indent=2, ensure_ascii=False)}
-
-        다음 기준으로 분석해주세요:
-        1. 각 추천의 신뢰도와 근거 명시
-        2. 현재 복용 중인 영양제와의 상호작용
-        3. 사용자의 건강 상태를 고려한 주의사항
-        4. 데이터 부족 시 명확히 표시
-        """
+    async def _generate_detailed_analysis(self, health_data, search_result, health_json: Optional[str] = None):
+        if health_json is None:
+            health_json = json_utils.dumps(health_data)
+        prompt = _DETAILED_ANALYSIS_PROMPT.format_map({
+            "health_json": health_json,
+            "search_json": await asyncio.to_thread(json_utils.dumps, search_result)
+        })
 
         try:
             logger.info("상세 분석 생성 시작", data={"health_data_keys": list(health_data.keys())}, step="분석_시작")
-            response = await self.openai_client.chat_completion(
+            result, content = await self._stream_json_object(
                 messages=[{"role": "user", "content": prompt}]
             )
             logger.info("상세 분석 응답 수신", step="응답_수신")
             
-            result = json.loads(response['content'])
+            if result is None:
+                raise ValueError(f"응답에서 JSON 객체를 찾을 수 없습니다: {content[:200]}")
             logger.info("상세 분석 완료", data=result, step="분석_완료")
             return result
             
@@ -170,69 +277,63 @@ class RAGService:
         """
         logger.info(f"[분석 시작] 패턴 기반 상세 분석 - 쿼리: {query[:50]}...")
         try:
+            # 큰 컨텍스트 직렬화는 워커 스레드에서 수행 (이벤트 루프 차단 방지)
+            cache_key, context_json = await asyncio.to_thread(self._serialize_context, query, context)
+            # 같은 쿼리/컨텍스트로 이미 성공한 분석이 있으면 재사용
+            cached = self._response_cache.get(cache_key)
+            if cached is not None:
+                self._response_cache.move_to_end(cache_key)
+                logger.info("[캐시 적중] 이전 분석 결과 재사용")
+                # 호출자가 결과를 수정해도 캐시 항목이 바뀌지 않도록 사본 반환
+                return copy.deepcopy(cached)
+                
             # 프롬프트 템플릿 구성
-            prompt = f"""
-            다음 건강 데이터와 컨텍스트를 바탕으로 상세 분석을 수행하여 정확한 JSON 형식으로 응답해주세요.
-            코드 블록이나 마커(```json 등)를 사용하지 말고 순수한 JSON 형식으로만 응답해주세요.
-
-            분석 쿼리: {query}
-
-            컨텍스트 정보:
-            {json.dumps(context, indent=2, ensure_ascii=False, cls=DateTimeEncoder)}
-
-            다음 형식의 JSON으로 정확히 응답해주세요:
-            {{
-                "status": "success",
-                "description": "상세한 상호작용 설명",
-                "evidence": ["근거1", "근거2"],
-                "severity": "high/medium/low",
-                "confidence_score": 0.95
-            }}
-
-            응답은 반드시 위의 JSON 형식을 따라야 하며, 모든 필드가 포함되어야 합니다.
-            """
-
-            logger.info("[API 요청] OpenAI API 호출 시작")
-            # OpenAI API 호출
-            response = await self.openai_client.chat_completion(
-                messages=[
-                    {
-                        "role": "system", 
-                        "content": "당신은 건강 데이터를 분석하고 영양제 상호작용을 평가하는 전문가입니다. 반드시 순수한 JSON 형식으로만 응답해야 합니다. 마크다운 코드 블록이나 다른 포맷팅을 사용하지 마세요."
-                    },
-                    {"role": "user", "content": prompt}
-                ]
-            )
-            logger.info("[API 응답] OpenAI API 응답 수신 완료")
-
-            # 응답 검증
-            if not response or 'content' not in response:
-                logger.error("[검증 실패] API 응답이 비어있거나 유효하지 않음")
-                return self._create_error_response("유효하지 않은 API 응답")
+            prompt = _PATTERN_ANALYSIS_PROMPT.format_map({
+                "query": query,
+                "context_json": context_json
+            })
 
+            logger.info("[API 요청] OpenAI API 스트리밍 호출 시작")
+            # OpenAI API 호출 (JSON 객체가 완성되는 즉시 파싱, 앞뒤 코드 블록 마커는 무시)
+            content = ""
             try:
-                logger.info("[응답 처리] JSON 파싱 및 검증 시작")
-                # 응답 정제
-                content = response['content']
-                # 코드 블록 마커 제거
-                content = content.replace('```json', '').replace('```', '').strip()
-                logger.debug(f"[응답 정제] 마커 제거 후 길이: {len(content)} 문자")
-                
-                # JSON 파싱 시도
-                result = json.loads(content)
+                result, content = await self._stream_json_object(
+                    messages=[
+                        {
+                            "role": "system", 
+                            "content": _PATTERN_ANALYSIS_SYSTEM_PROMPT
+                        },
+                        {"role": "user", "content": prompt}
+                    ]
+                )
+                logger.info("[API 응답] OpenAI API 응답 수신 완료")
+
+                # 응답 검증
+                if result is None:
+                    if not content.strip():
+                        logger.error("[검증 실패] API 응답이 비어있거나 유효하지 않음")
+                        return self._create_error_response("유효하지 않은 API 응답")
+                    raise json_utils.JSONDecodeError("JSON 객체가 완성되지 않았습니다", content, 0)
                 logger.info("[JSON 파싱] 성공")
                 
-                # 필수 필드 검증
-                required_fields = ['status', 'description', 'evidence', 'severity', 'confidence_score']
-                if not all(field in result for field in required_fields):
-                    missing_fields = [field for field in required_fields if field not in result]
-                    logger.error(f"[필드 검증 실패] 누락된 필드: {missing_fields}")
-                    return self._create_error_response(f"필수 필드 누락: {missing_fields}")
+                # 필수 필드/타입 검증
+                try:
+                    result = _PATTERN_RESULT_ADAPTER.validate_python(result)
+                except ValidationError as e:
+                    missing_fields = [err['loc'][0] for err in e.errors() if err['type'] == 'missing']
+                    if missing_fields:
+                        logger.error(f"[필드 검증 실패] 누락된 필드: {missing_fields}")
+                        return self._create_error_response(f"필수 필드 누락: {missing_fields}")
+                    logger.error(f"[필드 검증 실패] 형식 오류: {str(e)}")
+                    return self._create_error_response(f"응답 형식 오류: {e.error_count()}개 필드")
 
                 logger.info(f"[분석 완료] 상태: {result['status']}, 심각도: {result['severity']}")
+                self._response_cache[cache_key] = copy.deepcopy(result)
+                if len(self._response_cache) > self.RESPONSE_CACHE_SIZE:
+                    self._response_cache.popitem(last=False)
                 return result
 
-            except json.JSONDecodeError as e:
+            except json_utils.JSONDecodeError as e:
                 logger.error(f"[JSON 파싱 오류] 원인: {str(e)}")
                 logger.debug(f"[JSON 파싱 오류] 정제된 응답: {content[:200]}...")
                 return self._create_error_response("JSON 파싱 오류")
@@ -1,29 +1,202 @@
-import uuid
+import asyncio
+import os
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from contextlib import contextmanager
 from datetime import datetime
-from typing import Dict, Optional, List
+from typing import Callable, Dict, Iterator, Optional, List
 from models.session import Session, SessionStatus, Question, Answer, AnalysisResult
+from config.config_loader import CONFIG
 from utils.logger_config import setup_logger
+from utils.uuid_pool import fast_uuid4
 
 logger = setup_logger('session_manager')
 
 class SessionManager:
-    def __init__(self):
-        self._sessions: Dict[str, Session] = {}
+    """분석 세션 관리자
+    
+    세션은 SQLite 파일(service.session.db_path)에 저장하여 재시작 후에도 TTL 동안 복원하며,
+    같은 파일을 쓰는 다른 프로세스와도 공유합니다. 저장소를 사용하면 저장소가 유일한 기준이므로
+    저장소에 없는(만료/다른 워커가 삭제한) 세션은 메모리 사본이 있어도 없는 것으로 처리하고,
+    갱신은 한 트랜잭션 안에서 읽기-수정-쓰기를 수행하여 여러 워커의 동시 갱신이 유실되지 않게 합니다.
+    메모리 사본(TTL + 최대 MEMORY_MAX_SESSIONS개 LRU)은 저장소 미사용 시 또는 저장소 오류 시에만 사용됩니다.
+    """
+    
+    MEMORY_MAX_SESSIONS = 10000
+    
+    def __init__(self, db_path: Optional[str] = None, ttl: Optional[int] = None):
+        """세션 관리자 초기화
+        
+        Args:
+            db_path: 세션 저장 SQLite 파일 경로 (기본값: service.session.db_path, 빈 값이면 메모리만 사용)
+            ttl: 세션 유지 시간(초) (기본값: service.session.ttl)
+        """
+        settings = CONFIG.get_service_settings().get('session', {})
+        db_path = settings.get('db_path', 'cache/sessions.sqlite3') if db_path is None else db_path
+        if db_path and not os.path.isabs(db_path):
+            db_path = os.path.join(os.path.dirname(os.path.dirname(os.path.dirname(__file__))), db_path)
+        self.db_path = db_path or None
+        self.ttl = ttl or settings.get('ttl', 86400)
+        # 세션 ID -> (만료 시각, 세션), 사용 순서 유지 (앞쪽이 가장 오래 사용되지 않은 항목)
+        self._sessions: OrderedDict = OrderedDict()
+        self._db: Optional[sqlite3.Connection] = None
+        self._db_lock = threading.Lock()
+        
+    def _connect(self) -> sqlite3.Connection:
+        """세션 저장소 연결 (최초 사용 시 WAL 모드로 열고 테이블 생성, 트랜잭션은 직접 관리)"""
+        if self._db is None:
+            os.makedirs(os.path.dirname(self.db_path), exist_ok=True)
+            db = sqlite3.connect(self.db_path, check_same_thread=False, isolation_level=None)
+            db.execute("PRAGMA journal_mode=WAL")
+            db.execute("PRAGMA synchronous=NORMAL")
+            db.execute(
+                "CREATE TABLE IF NOT EXISTS sessions (id TEXT PRIMARY KEY, data TEXT NOT NULL, expires_at REAL NOT NULL)"
+            )
+            self._db = db
+        return self._db
+        
+    @contextmanager
+    def _transaction(self) -> Iterator[sqlite3.Connection]:
+        """쓰기 잠금을 먼저 잡는 트랜잭션 (다른 프로세스의 갱신과 직렬화)"""
+        with self._db_lock:
+            db = self._connect()
+            db.execute("BEGIN IMMEDIATE")
+            try:
+                yield db
+            except BaseException:
+                db.execute("ROLLBACK")
+                raise
+            db.execute("COMMIT")
+        
+    def _save_sync(self, session_id: str, data: str):
+        with self._transaction() as db:
+            db.execute(
+                "INSERT OR REPLACE INTO sessions (id, data, expires_at) VALUES (?, ?, ?)",
+                (session_id, data, time.time() + self.ttl)
+            )
+                
+    def _load_sync(self, session_id: str) -> Optional[str]:
+        with self._db_lock:
+            row = self._connect().execute(
+                "SELECT data FROM sessions WHERE id = ? AND expires_at > ?",
+                (session_id, time.time())
+            ).fetchone()
+        return row[0] if row else None
+        
+    def _update_sync(self, session_id: str, mutate: Callable[[Session], None]) -> Optional[Session]:
+        """저장소의 세션을 한 트랜잭션 안에서 읽고 수정하여 저장 (없거나 만료되었으면 None)"""
+        with self._transaction() as db:
+            row = db.execute(
+                "SELECT data FROM sessions WHERE id = ? AND expires_at > ?",
+                (session_id, time.time())
+            ).fetchone()
+            if row is None:
+                return None
+            session = Session.model_validate_json(row[0])
+            mutate(session)
+            db.execute(
+                "UPDATE sessions SET data = ?, expires_at = ? WHERE id = ?",
+                (session.model_dump_json(), time.time() + self.ttl, session_id)
+            )
+            return session
+        
+    def _delete_sync(self, session_id: str) -> bool:
+        with self._transaction() as db:
+            # 만료된 세션도 함께 정리
+            db.execute("DELETE FROM sessions WHERE expires_at <= ?", (time.time(),))
+            return db.execute("DELETE FROM sessions WHERE id = ?", (session_id,)).rowcount > 0
+            
+    def _remember(self, session_id: str, session: Session):
+        """메모리 사본 저장 (최대 MEMORY_MAX_SESSIONS개, 초과 시 가장 오래 사용되지 않은 세션 제거)"""
+        self._sessions[session_id] = (time.time() + self.ttl, session)
+        self._sessions.move_to_end(session_id)
+        while len(self._sessions) > self.MEMORY_MAX_SESSIONS:
+            self._sessions.popitem(last=False)
+            
+    def _recall(self, session_id: str) -> Optional[Session]:
+        """만료되지 않은 메모리 사본 조회 (만료된 사본은 제거)"""
+        entry = self._sessions.get(session_id)
+        if entry is None:
+            return None
+        if entry[0] <= time.time():
+            del self._sessions[session_id]
+            return None
+        self._sessions.move_to_end(session_id)
+        return entry[1]
+                
+    async def _save(self, session_id: str, session: Session):
+        """새 세션을 저장소와 메모리에 반영 (저장소 오류 시 메모리만 유지)"""
+        self._remember(session_id, session)
+        if not self.db_path:
+            return
+        try:
+            await asyncio.to_thread(self._save_sync, session_id, session.model_dump_json())
+        except Exception as e:
+            logger.warning(f"세션 저장 실패: {session_id}: {str(e)}")
+            
+    async def _update(self, session_id: str, mutate: Callable[[Session], None]) -> Optional[Session]:
+        """세션 수정 (저장소 사용 시 트랜잭션 안에서 최신 상태에 적용, 오류 시 메모리 사본에 적용)"""
+        if self.db_path:
+            try:
+                session = await asyncio.to_thread(self._update_sync, session_id, mutate)
+            except Exception as e:
+                logger.warning(f"세션 갱신 실패, 메모리 사본 사용: {session_id}: {str(e)}")
+            else:
+                if session is None:
+                    self._sessions.pop(session_id, None)
+                    logger.warning(f"세션을 찾을 수 없음: {session_id}")
+                    return None
+                self._remember(session_id, session)
+                return session
+                
+        session = self._recall(session_id)
+        if session is None:
+            logger.warning(f"세션을 찾을 수 없음: {session_id}")
+            return None
+        mutate(session)
+        self._remember(session_id, session)
+        return session
+            
+    def close(self):
+        """세션 저장소 연결 종료"""
+        with self._db_lock:
+            if self._db is not None:
+                self._db.close()
+                self._db = None
         
     async def create_session(self, health_data: Dict) -> Session:
         """새로운 분석 세션을 생성합니다."""
-        session_id = str(uuid.uuid4())
+        session_id = fast_uuid4()
         session = Session(
-            session_id=session_id,
+            id=session_id,
             health_data=health_data
         )
-        self._sessions[session_id] = session
+        await self._save(session_id, session)
         logger.info(f"새로운 세션 생성: {session_id}")
         return session
 
     async def get_session(self, session_id: str) -> Optional[Session]:
         """세션 ID로 세션을 조회합니다."""
-        session = self._sessions.get(session_id)
+        if self.db_path:
+            # 저장소가 기준 (다른 워커 프로세스의 변경/생성/삭제 반영, 키 조회 1회)
+            try:
+                data = await asyncio.to_thread(self._load_sync, session_id)
+            except Exception as e:
+                logger.warning(f"세션 복원 실패, 메모리 사본 사용: {session_id}: {str(e)}")
+            else:
+                if data is None:
+                    # 만료되었거나 다른 워커가 삭제한 세션은 메모리 사본도 폐기
+                    self._sessions.pop(session_id, None)
+                    logger.warning(f"세션을 찾을 수 없음: {session_id}")
+                    return None
+                session = Session.model_validate_json(data)
+                self._remember(session_id, session)
+                return session
+                
+        # 저장소 미사용/오류 시 이 프로세스의 메모리 사본 사용
+        session = self._recall(session_id)
         if not session:
             logger.warning(f"세션을 찾을 수 없음: {session_id}")
             return None
@@ -36,16 +209,15 @@ class SessionManager:
         step: Optional[str] = None
     ) -> Optional[Session]:
         """세션 상태를 업데이트합니다."""
-        session = await self.get_session(session_id)
-        if not session:
-            return None
-            
-        session.status = status
-        session.updated_at = datetime.now()
-        if step:
-            session.current_step = step
-            
-        logger.info(f"세션 상태 업데이트: {session_id} -> {status}")
+        def _mutate(session: Session):
+            session.status = status
+            session.updated_at = datetime.now()
+            if step:
+                session.current_step = step
+                
+        session = await self._update(session_id, _mutate)
+        if session:
+            logger.info(f"세션 상태 업데이트: {session_id} -> {status}")
         return session
 
     async def add_analysis_result(
@@ -54,13 +226,13 @@ class SessionManager:
         result: AnalysisResult
     ) -> Optional[Session]:
         """분석 결과를 세션에 추가합니다."""
-        session = await self.get_session(session_id)
-        if not session:
-            return None
+        def _mutate(session: Session):
+            session.analysis_results = result
+            session.updated_at = datetime.now()
             
-        session.analysis_results = result
-        session.updated_at = datetime.now()
-        logger.info(f"분석 결과 추가: {session_id}")
+        session = await self._update(session_id, _mutate)
+        if session:
+            logger.info(f"분석 결과 추가: {session_id}")
         return session
 
     async def add_questions(
@@ -69,14 +241,14 @@ class SessionManager:
         questions: List[Question]
     ) -> Optional[Session]:
         """질문 목록을 세션에 추가합니다."""
-        session = await self.get_session(session_id)
-        if not session:
-            return None
+        def _mutate(session: Session):
+            session.current_questions.extend(questions)
+            session.updated_at = datetime.now()
+            session.status = SessionStatus.WAITING_ANSWER
             
-        session.current_questions.extend(questions)
-        session.updated_at = datetime.now()
-        session.status = SessionStatus.WAITING_ANSWER
-        logger.info(f"질문 추가: {session_id}, {len(questions)}개")
+        session = await self._update(session_id, _mutate)
+        if session:
+            logger.info(f"질문 추가: {session_id}, {len(questions)}개")
         return session
 
     async def add_answer(
@@ -85,13 +257,13 @@ class SessionManager:
         answer: Answer
     ) -> Optional[Session]:
         """사용자 답변을 세션에 추가합니다."""
-        session = await self.get_session(session_id)
-        if not session:
-            return None
+        def _mutate(session: Session):
+            session.answers.append(answer)
+            session.updated_at = datetime.now()
             
-        session.answers.append(answer)
-        session.updated_at = datetime.now()
-        logger.info(f"답변 추가: {session_id}, question_id: {answer.question_id}")
+        session = await self._update(session_id, _mutate)
+        if session:
+            logger.info(f"답변 추가: {session_id}, question_id: {answer.question_id}")
         return session
 
     async def get_session_state(self, session_id: str) -> Dict:
@@ -111,8 +283,12 @@ class SessionManager:
 
     async def cleanup_session(self, session_id: str) -> bool:
         """세션을 정리합니다."""
-        if session_id in self._sessions:
-            del self._sessions[session_id]
+        removed = self._sessions.pop(session_id, None) is not None
+        if self.db_path:
+            try:
+                removed = await asyncio.to_thread(self._delete_sync, session_id) or removed
+            except Exception as e:
+                logger.warning(f"세션 삭제 실패: {session_id}: {str(e)}")
+        if removed:
             logger.info(f"세션 정리 완료: {session_id}")
-            return True
-        return False 
\ No newline at end of file
+        return removed 
\ No newline at end of file
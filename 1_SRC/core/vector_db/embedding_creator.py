@@ -1,20 +1,237 @@
 import numpy as np
-from typing import List, Dict, Any
+from typing import List, Dict, Any, Optional
 from utils.openai_client import OpenAIClient
 from utils.logger_config import setup_logger
+from config.config_loader import CONFIG
+from collections import OrderedDict
 import asyncio
+import hashlib
+import os
+import sqlite3
+import threading
 
 logger = setup_logger('embedding')
 
 class EmbeddingCreator:
-    """임베딩 생성기"""
+    """임베딩 생성기
     
-    def __init__(self):
-        """임베딩 생성기 초기화"""
-        self.client = OpenAIClient()
-        self._cache = {}
+    캐시된 임베딩은 float32 행렬 한 개에 행 단위로 저장하고 텍스트 -> 행 번호 인덱스로
+    조회합니다 (텍스트별 파이썬 float 리스트 대비 메모리 약 1/6, 조회는 행 참조).
+    항목 수가 max_entries를 넘으면 가장 오래 사용되지 않은 항목의 행을 재사용합니다.
+    quantize를 켜면 행을 int8 + 벡터별 스케일로 저장하고 조회 시 float32로 복원합니다
+    (메모리 1/4, 원소별 오차는 최대 절댓값의 1/254 이하).
+    메모리에 없는 텍스트는 API 요청 전에 SQLite 영구 캐시(cache_path)에서 먼저 찾습니다.
+    """
+    
+    EMBEDDING_DIM = 1536
+    INITIAL_CAPACITY = 1024
+    # SQLite IN 절 변수 수 제한 이하로 나눠 조회
+    PERSIST_QUERY_CHUNK = 500
+    
+    def __init__(
+        self,
+        client: Optional[OpenAIClient] = None,
+        max_entries: Optional[int] = None,
+        cache_path: Optional[str] = None,
+        quantize: Optional[bool] = None
+    ):
+        """임베딩 생성기 초기화
+        
+        Args:
+            client: 공유할 OpenAI 클라이언트 (없으면 새로 생성)
+            max_entries: 캐시 최대 항목 수 (기본값: service.openai.embedding.cache_max_entries)
+            cache_path: 영구 캐시 SQLite 파일 경로 (기본값: service.openai.embedding.cache_path)
+            quantize: 메모리 캐시 int8 양자화 여부 (기본값: service.openai.embedding.cache_quantize)
+        """
+        self.client = client or OpenAIClient()
+        embedding_settings = CONFIG.get_openai_settings()['embedding']
+        self.max_entries = max_entries or embedding_settings.get('cache_max_entries', 50000)
+        self.model = embedding_settings.get('model', '')
+        cache_path = embedding_settings.get('cache_path') if cache_path is None else cache_path
+        if cache_path and not os.path.isabs(cache_path):
+            cache_path = os.path.join(os.path.dirname(os.path.dirname(os.path.dirname(__file__))), cache_path)
+        self.cache_path = cache_path or None
+        self.quantize = embedding_settings.get('cache_quantize', False) if quantize is None else quantize
+        self._db: Optional[sqlite3.Connection] = None
+        self._db_lock = threading.Lock()
+        capacity = min(self.INITIAL_CAPACITY, self.max_entries)
+        self._vectors = np.empty(
+            (capacity, self.EMBEDDING_DIM), dtype=np.int8 if self.quantize else np.float32
+        )
+        # 양자화 시 행별 복원 스케일 (최대 절댓값 / 127)
+        self._scales = np.ones(capacity if self.quantize else 0, dtype=np.float32)
+        # 텍스트 -> 행 번호 (사용 순서 유지, 앞쪽이 가장 오래 사용되지 않은 항목)
+        self._rows: OrderedDict = OrderedDict()
         self.cache_hits = 0
         self.cache_misses = 0
+        self.cache_evictions = 0
+        self.persisted_hits = 0
+        
+    def _connect(self) -> sqlite3.Connection:
+        """영구 캐시 연결 (최초 사용 시 WAL 모드로 열고 테이블 생성)"""
+        if self._db is None:
+            os.makedirs(os.path.dirname(self.cache_path), exist_ok=True)
+            db = sqlite3.connect(self.cache_path, check_same_thread=False)
+            db.execute("PRAGMA journal_mode=WAL")
+            db.execute("PRAGMA synchronous=NORMAL")
+            db.execute("CREATE TABLE IF NOT EXISTS embeddings (hash BLOB PRIMARY KEY, vec BLOB NOT NULL)")
+            self._db = db
+        return self._db
+        
+    def _hash(self, text: str) -> bytes:
+        """영구 캐시 키 (모델이 바뀌면 다른 키가 되도록 모델명 포함)"""
+        return hashlib.sha256(f"{self.model}\n{text}".encode()).digest()
+        
+    def _load_persisted_sync(self, texts: List[str]) -> Dict[str, np.ndarray]:
+        keys = {self._hash(text): text for text in texts}
+        hashes = list(keys)
+        found = {}
+        with self._db_lock:
+            db = self._connect()
+            for i in range(0, len(hashes), self.PERSIST_QUERY_CHUNK):
+                chunk = hashes[i:i + self.PERSIST_QUERY_CHUNK]
+                rows = db.execute(
+                    f"SELECT hash, vec FROM embeddings WHERE hash IN ({','.join('?' * len(chunk))})",
+                    chunk
+                ).fetchall()
+                for key, vec in rows:
+                    found[keys[key]] = np.frombuffer(vec, dtype=np.float32)
+        return found
+        
+    def _persist_sync(self, items: Dict[str, List[float]]):
+        rows = [
+            (self._hash(text), np.asarray(embedding, dtype=np.float32).tobytes())
+            for text, embedding in items.items()
+        ]
+        with self._db_lock:
+            db = self._connect()
+            # 호출당 한 트랜잭션으로 일괄 저장
+            with db:
+                db.executemany("INSERT OR IGNORE INTO embeddings (hash, vec) VALUES (?, ?)", rows)
+                
+    async def _load_persisted(self, texts: List[str]) -> Dict[str, np.ndarray]:
+        """영구 캐시에서 임베딩 일괄 조회 (실패 시 빈 결과)"""
+        if not self.cache_path or not texts:
+            return {}
+        try:
+            return await asyncio.to_thread(self._load_persisted_sync, texts)
+        except Exception as e:
+            logger.warning(f"영구 임베딩 캐시 조회 실패: {str(e)}")
+            return {}
+            
+    async def _persist(self, items: Dict[str, List[float]]):
+        """새로 생성한 임베딩을 영구 캐시에 저장"""
+        if not self.cache_path or not items:
+            return
+        try:
+            await asyncio.to_thread(self._persist_sync, items)
+        except Exception as e:
+            logger.warning(f"영구 임베딩 캐시 저장 실패: {str(e)}")
+        
+    def get(self, text: str) -> Optional[np.ndarray]:
+        """캐시된 임베딩 조회 (float32 저장 시 복사 없는 행 뷰, 양자화 시 복원한 float32 벡터, 없으면 None)"""
+        row = self._rows.get(text)
+        if row is None:
+            return None
+        self._rows.move_to_end(text)
+        if self.quantize:
+            return self._vectors[row].astype(np.float32) * self._scales[row]
+        return self._vectors[row]
+        
+    def _grow(self, row: int):
+        """행 저장 공간을 max_entries까지 두 배로 확장"""
+        capacity = min(len(self._vectors) * 2, self.max_entries)
+        grown = np.empty((capacity, self.EMBEDDING_DIM), dtype=self._vectors.dtype)
+        grown[:row] = self._vectors[:row]
+        self._vectors = grown
+        if self.quantize:
+            scales = np.ones(capacity, dtype=np.float32)
+            scales[:row] = self._scales[:row]
+            self._scales = scales
+            
+    def _store(self, text: str, embedding: List[float]):
+        """임베딩을 다음 행에 저장 (용량이 차면 max_entries까지 두 배로 확장, 이후 LRU 행 재사용)"""
+        if text in self._rows:
+            # 동시 호출이 먼저 저장한 경우 같은 행을 갱신
+            row = self._rows[text]
+            self._rows.move_to_end(text)
+        elif len(self._rows) >= self.max_entries:
+            _, row = self._rows.popitem(last=False)
+            self.cache_evictions += 1
+        else:
+            row = len(self._rows)
+            if row >= len(self._vectors):
+                self._grow(row)
+        if self.quantize:
+            vector = np.asarray(embedding, dtype=np.float32)
+            scale = float(np.abs(vector).max()) / 127 or 1.0
+            self._vectors[row] = np.rint(vector / scale)
+            self._scales[row] = scale
+        else:
+            self._vectors[row] = embedding
+        self._rows[text] = row
+        
+    async def embed_matrix(self, texts: str | List[str], cache_in_memory: bool = True) -> np.ndarray:
+        """임베딩을 (텍스트 수, EMBEDDING_DIM) float32 행렬로 반환
+        
+        캐시에 없는 텍스트만 중복 없이 모아 한 번의 요청으로 생성하며,
+        반환 행렬은 캐시와 분리된 복사본입니다.
+        
+        Args:
+            texts: 임베딩할 텍스트 또는 텍스트 리스트
+            cache_in_memory: False이면 메모리 캐시에 넣지 않고 영구 캐시만 사용
+                (대량 적재 시 조회용 쿼리 임베딩이 밀려나지 않도록)
+        """
+        # 단일 텍스트인 경우 리스트로 변환
+        if isinstance(texts, str):
+            texts = [texts]
+            
+        missing = list(dict.fromkeys(text for text in texts if text not in self._rows))
+        self.cache_misses += len(missing)
+        self.cache_hits += len(texts) - len(missing)
+        
+        # 캐시 적중 행은 API 대기 전에 복사 (대기 중 다른 호출의 저장으로 제거될 수 있음)
+        result = np.zeros((len(texts), self.EMBEDDING_DIM), dtype=np.float32)
+        for i, text in enumerate(texts):
+            row = self.get(text)
+            if row is not None:
+                result[i] = row
+        
+        # 메모리에 없는 텍스트는 영구 캐시에서 먼저 조회
+        persisted = await self._load_persisted(missing)
+        if persisted:
+            self.persisted_hits += len(persisted)
+            for i, text in enumerate(texts):
+                embedding = persisted.get(text)
+                if embedding is not None:
+                    result[i] = embedding
+            if cache_in_memory:
+                for text, embedding in persisted.items():
+                    self._store(text, embedding)
+            missing = [text for text in missing if text not in persisted]
+        
+        if len(missing) == 1:
+            # 대화형 단건 조회는 단일 요청 경로 사용
+            new_embeddings = [await self.client.create_embedding(missing[0])]
+        elif missing:
+            new_embeddings = await self.client.create_embeddings(missing)
+        else:
+            new_embeddings = []
+            
+        fresh = dict(zip(missing, new_embeddings))
+        if fresh:
+            for i, text in enumerate(texts):
+                embedding = fresh.get(text)
+                if embedding is not None:
+                    result[i] = embedding
+                    
+        # 요청 실패로 받은 0 벡터는 캐시하지 않음
+        valid = {text: embedding for text, embedding in fresh.items() if any(embedding)}
+        if cache_in_memory:
+            for text, embedding in valid.items():
+                self._store(text, embedding)
+        await self._persist(valid)
+        return result
         
     async def __call__(self, texts: str | List[str]) -> List[List[float]]:
         """임베딩 생성
@@ -23,39 +240,33 @@ class EmbeddingCreator:
             texts: 임베딩할 텍스트 또는 텍스트 리스트
             
         Returns:
-            임베딩 벡터 리스트
+            임베딩 벡터 리스트 (Chroma 임베딩 함수 형식)
         """
         try:
-            # 단일 텍스트인 경우 리스트로 변환
-            if isinstance(texts, str):
-                texts = [texts]
-            
-            # 각 텍스트에 대해 임베딩 생성
-            embeddings = []
-            for text in texts:
-                # 캐시된 임베딩이 있으면 재사용
-                if text in self._cache:
-                    self.cache_hits += 1
-                    embeddings.append(self._cache[text])
-                    continue
-                    
-                # 새로운 임베딩 생성
-                self.cache_misses += 1
-                embedding = await self.client.create_embedding(text)
-                self._cache[text] = embedding
-                embeddings.append(embedding)
-            
-            return embeddings
+            return (await self.embed_matrix(texts)).tolist()
             
         except Exception as e:
             logger.error(f"임베딩 생성 실패: {str(e)}")
             # 에러 발생 시 0으로 채워진 임베딩 반환
-            return [[0.0] * 1536] * len(texts)
+            count = 1 if isinstance(texts, str) else len(texts)
+            return [[0.0] * self.EMBEDDING_DIM] * count
+        
+    def close(self):
+        """영구 캐시 연결 종료"""
+        with self._db_lock:
+            if self._db is not None:
+                self._db.close()
+                self._db = None
         
     def get_cache_stats(self) -> dict:
         """캐시 통계 반환"""
         return {
-            "cache_size": len(self._cache),
+            "cache_size": len(self._rows),
+            "cache_bytes": len(self._rows) * (self.EMBEDDING_DIM * self._vectors.itemsize + self._scales.itemsize * self.quantize),
+            "quantized": self.quantize,
             "cache_hits": self.cache_hits,
-            "cache_misses": self.cache_misses
+            "cache_misses": self.cache_misses,
+            "cache_evictions": self.cache_evictions,
+            "persisted_hits": self.persisted_hits,
+            "max_entries": self.max_entries
         }
@@ -1,25 +1,46 @@
 import argparse
 import asyncio
 import logging
-from typing import List, Dict, Set, Optional, Any
+from typing import List, Dict, Set, Optional, Any, Sequence
 from utils.logger_config import setup_logger
 from config.config_loader import CONFIG
 from core.vector_db.embedding_creator import EmbeddingCreator
 from datetime import datetime
-from utils.openai_client import OpenAIClient
+from utils.openai_client import OpenAIClient, close_http_client, retry_on_rate_limit
 from models.health_data import HealthData
 from core.data_source.data_source_manager import DataSourceManager, PubMedSource
 import os
 import chromadb
-import json
+from utils import json_utils
 from config.config_loader import ConfigLoader
 import uuid
+import hashlib
+import itertools
+import numpy as np
+from collections import OrderedDict
 
 logger = setup_logger('vector_store')
 
 class ChromaManager:
     """ChromaDB 관리자"""
     
+    QUERY_EMBEDDING_CACHE_SIZE = 4096
+    # 상호작용 분석 시 컬렉션별 검색 결과 수 (사전 계산 이웃 수와 동일해야 함)
+    SUPPLEMENT_RESULTS = 5
+    INTERACTION_RESULTS = 3
+    # 초기화/업데이트 시 collection.add 한 번에 묶을 논문 수
+    # (임베딩 요청은 OpenAIClient.EMBEDDING_BATCH_SIZE 단위로 나뉘어 동시에 전송됨)
+    PAPER_BATCH_SIZE = 500
+    # 저장 대기 중인 논문 묶음 최대 수 (초과 시 수집 작업이 저장을 기다림)
+    WRITE_QUEUE_SIZE = 32
+    # 논문 저장 시 메타데이터로 남길 필드 (처리용 필드 processed_text, author_names 등은 제외)
+    PAPER_METADATA_FIELDS = (
+        "pmid", "title", "abstract", "authors", "publication_date",
+        "journal", "category", "weight", "description", "llm_analysis"
+    )
+    # show_stats에서 메타데이터 필드 확인에 사용할 표본 행 수
+    STATS_SAMPLE_SIZE = 100
+    
     COLLECTIONS_STRUCTURE = {
         'supplements': {
             'description': '영양제 기본 정보',
@@ -70,25 +91,44 @@ class ChromaManager:
         }
     }
     
-    def __init__(self):
-        """ChromaManager 초기화"""
+    def __init__(self, lazy: bool = False):
+        """ChromaManager 초기화
+        
+        Args:
+            lazy: True이면 OpenAI 클라이언트와 임베딩 생성기를 만들지 않음
+                  (통계 조회처럼 임베딩이 필요 없는 작업용)
+        """
         self.client = None
         self.collections = {}
         self.embedding_creator = None
         self.openai_client = None
         self.config = ConfigLoader()
+        # 정규화된 키 -> 쿼리 임베딩 LRU 캐시
+        self._query_embedding_cache: OrderedDict = OrderedDict()
+        # 컬렉션 이름 -> {쿼리 텍스트: 사전 계산된 최근접 문서 ID 리스트}
+        self.neighbors_path = self._resolve_neighbors_path()
+        self._precomputed_neighbors = self._load_precomputed_neighbors(self.neighbors_path)
+        # 일괄 분석 시 동시 채팅 완료 요청 수 제한
+        self._llm_semaphore = asyncio.Semaphore(
+            CONFIG.get_openai_settings().get('llm_max_concurrency') or 4
+        )
         
         try:
             self.client = self._initialize_chroma_client()
-            self.embedding_creator = EmbeddingCreator()
-            self.openai_client = OpenAIClient()
+            if not lazy:
+                self.openai_client = OpenAIClient()
+                self.embedding_creator = EmbeddingCreator(client=self.openai_client)
             # 기존 컬렉션 로드
             self.collections = {
                 coll.name: coll 
                 for coll in self.client.list_collections()
             }
+            for name in self.COLLECTIONS_STRUCTURE:
+                if name in self.collections:
+                    self._check_space(self.collections[name])
             logger.info("ChromaManager 기본 초기화 완료")
-            logger.debug(f"임베딩 생성기 초기화 상태: {self.embedding_creator.get_cache_stats()}")
+            if self.embedding_creator is not None:
+                logger.debug(f"임베딩 생성기 초기화 상태: {self.embedding_creator.get_cache_stats()}")
         except chromadb.errors.ChromaError as e:
             logger.error(f"ChromaDB 초기화 실패: {str(e)}")
             raise
@@ -114,47 +154,102 @@ class ChromaManager:
             logger.error(f"ChromaDB 클라이언트 초기화 실패: {str(e)}")
             raise
 
+    @staticmethod
+    def _hnsw_metadata() -> Dict[str, Any]:
+        """컬렉션 생성 시 적용할 HNSW 인덱스 메타데이터 (service.chroma.hnsw 설정)"""
+        hnsw_settings = CONFIG.get_service_settings().get("chroma", {}).get("hnsw", {})
+        return {f"hnsw:{key}": value for key, value in hnsw_settings.items()}
+
+    @staticmethod
+    def _collection_space(collection) -> str:
+        """컬렉션 생성 시 적용된 거리 함수 (hnsw:space 없이 만든 컬렉션은 Chroma 기본값 l2)"""
+        return (collection.metadata or {}).get("hnsw:space", "l2")
+
+    @classmethod
+    def _check_space(cls, collection):
+        """컬렉션의 거리 함수가 설정(service.chroma.hnsw.space)과 다르면 경고 (space는 재초기화 전까지 바뀌지 않음)"""
+        configured = cls._hnsw_metadata().get("hnsw:space", "l2")
+        actual = cls._collection_space(collection)
+        if actual != configured:
+            logger.warning(
+                f"{collection.name} 컬렉션 거리 함수({actual})가 설정({configured})과 다릅니다. "
+                f"--action reinit으로 재생성해야 설정이 적용됩니다"
+            )
+
+    @staticmethod
+    def _similarity(distance: float, space: str) -> float:
+        """Chroma 거리를 코사인 유사도(클수록 유사)로 변환
+        
+        cosine/ip 거리는 1 - 유사도이고, l2는 제곱 거리이므로 정규화된 OpenAI 임베딩에서
+        1 - d/2가 코사인 유사도와 같습니다. 어느 space로 만든 컬렉션이든 같은 척도로 비교됩니다.
+        """
+        if space == "l2":
+            return 1.0 - float(distance) / 2
+        return 1.0 - float(distance)
+
+    @staticmethod
+    def _resolve_neighbors_path() -> Optional[str]:
+        """사전 계산 이웃 파일 경로 (service.chroma.precomputed_neighbors_path, 1_SRC 기준 상대 경로)"""
+        path = CONFIG.get_service_settings().get("chroma", {}).get("precomputed_neighbors_path")
+        if path and not os.path.isabs(path):
+            path = os.path.join(os.path.dirname(os.path.dirname(os.path.dirname(__file__))), path)
+        return path or None
+
+    @staticmethod
+    def _load_precomputed_neighbors(path: Optional[str]) -> Dict[str, Dict[str, List[str]]]:
+        """사전 계산 이웃 파일 로드 (없거나 읽을 수 없으면 빈 딕셔너리)"""
+        if not path or not os.path.exists(path):
+            return {}
+        try:
+            with open(path, 'rb') as f:
+                neighbors = json_utils.loads(f.read())
+            logger.info(f"사전 계산 이웃 로드 완료: { {name: len(table) for name, table in neighbors.items()} }")
+            return neighbors
+        except Exception as e:
+            logger.warning(f"사전 계산 이웃 로드 실패: {str(e)}")
+            return {}
+
     async def _initialize_collections(self):
         """컬렉션 초기화"""
         try:
             collections = {}
             
-            # 1. 기존 컬렉션 삭제
+            # 1. 기존 컬렉션 삭제 (컬렉션마다 HTTP 요청이므로 동시에 보냄)
             try:
-                current_collections = self.client.list_collections()
-                for collection in current_collections:
-                    try:
-                        logger.info(f"{collection.name} 컬렉션 삭제 중...")
-                        self.client.delete_collection(collection.name)
-                        logger.info(f"{collection.name} 컬렉션 삭제 완료")
-                    except Exception as e:
-                        logger.warning(f"{collection.name} 컬렉션 삭제 실패: {str(e)}")
+                current_collections = await asyncio.to_thread(self.client.list_collections)
+                # 목록에 없더라도 생성할 컬렉션 이름은 함께 삭제 시도 (없으면 실패해도 무시)
+                names = {collection.name for collection in current_collections} | set(self.COLLECTIONS_STRUCTURE)
+                logger.info(f"기존 컬렉션 삭제 중: {sorted(names)}")
+                results = await asyncio.gather(
+                    *[asyncio.to_thread(self.client.delete_collection, name) for name in names],
+                    return_exceptions=True
+                )
+                for name, result in zip(names, results):
+                    if isinstance(result, Exception) and name not in self.COLLECTIONS_STRUCTURE:
+                        logger.warning(f"{name} 컬렉션 삭제 실패: {str(result)}")
             except Exception as e:
                 logger.warning(f"기존 컬렉션 삭제 중 오류 발생: {str(e)}")
             
             # 2. 새 컬렉션 생성
-            for name, info in self.COLLECTIONS_STRUCTURE.items():
-                try:
-                    logger.info(f"{name} 컬렉션 생성 중... ({info['description']})")
-                    # 혹시 모를 기존 컬렉션 삭제 재시도
-                    try:
-                        self.client.delete_collection(name)
-                    except:
-                        pass
-                    
-                    # 임베딩 함수 설정
-                    embedding_function = self.embedding_creator
-                    logger.debug(f"{name} 컬렉션에 임베딩 함수 설정: {embedding_function}")
-                    
-                    collections[name] = self.client.create_collection(
-                        name=name,
-                        metadata={"description": info['description']},
-                        embedding_function=embedding_function
-                    )
-                    logger.info(f"{name} 컬렉션 생성 완료")
-                except Exception as e:
-                    logger.error(f"{name} 컬렉션 생성 실패: {str(e)}")
-                    raise
+            # 저장/검색은 항상 OpenAI 임베딩을 직접 전달하므로 임베딩 함수는 두지 않음
+            # (임베딩 누락 시 Chroma 기본 모델로 다시 임베딩하지 않고 오류가 나도록)
+            logger.info(f"컬렉션 생성 중: {list(self.COLLECTIONS_STRUCTURE)}")
+            created = await asyncio.gather(*[
+                asyncio.to_thread(
+                    self.client.create_collection,
+                    name=name,
+                    metadata={"description": info['description'], **self._hnsw_metadata()},
+                    embedding_function=None
+                )
+                for name, info in self.COLLECTIONS_STRUCTURE.items()
+            ], return_exceptions=True)
+            
+            for (name, info), result in zip(self.COLLECTIONS_STRUCTURE.items(), created):
+                if isinstance(result, Exception):
+                    logger.error(f"{name} 컬렉션 생성 실패: {str(result)}")
+                    raise result
+                collections[name] = result
+                logger.info(f"{name} 컬렉션 생성 완료 ({info['description']})")
             
             if not collections:
                 raise Exception("컬렉션 생성 실패: 생성된 컬렉션이 없습니다")
@@ -191,10 +286,16 @@ class ChromaManager:
             
             # 1. 기존 컬렉션 상태 확인 및 초기화
             self.collections = await self._initialize_collections()
+            # 이전 코퍼스 기준 이웃 ID는 더 이상 존재하지 않으므로 즉시 폐기
+            await self._clear_precomputed_neighbors()
             
             # 2. 데이터 초기화 및 임베딩
             await self.initialize_data()
             
+            # 3. 새 코퍼스 기준으로 사전 계산 이웃 재생성
+            if self.neighbors_path:
+                await self.precompute_neighbors()
+            
             logger.info("=== 데이터베이스 재초기화 완료 ===")
             return True
             
@@ -217,16 +318,21 @@ class ChromaManager:
             existing_pmids = set()
             pmid_stats = {}  # 컬렉션별 PMID 통계
             
-            for collection_name in self.COLLECTIONS_STRUCTURE.keys():
-                try:
-                    collection = self.client.get_collection(collection_name)
-                    pmids = set(collection.get()["ids"])
-                    existing_pmids.update(pmids)
-                    pmid_stats[collection_name] = len(pmids)
-                    logger.info(f"{collection_name} 컬렉션의 기존 PMID 수: {len(pmids)}")
-                except Exception as e:
-                    logger.error(f"{collection_name} 컬렉션 PMID 수집 실패: {str(e)}")
+            async def _collection_ids(collection_name: str) -> Set[str]:
+                # ID만 조회 (임베딩/문서/메타데이터는 가져오지 않음)
+                collection = await self._collection(collection_name)
+                return set((await asyncio.to_thread(collection.get, include=[]))["ids"])
+            
+            # 컬렉션별 조회는 서로 독립적이므로 동시에 요청
+            names = list(self.COLLECTIONS_STRUCTURE.keys())
+            results = await asyncio.gather(*[_collection_ids(name) for name in names], return_exceptions=True)
+            for collection_name, pmids in zip(names, results):
+                if isinstance(pmids, Exception):
+                    logger.error(f"{collection_name} 컬렉션 PMID 수집 실패: {str(pmids)}")
                     continue
+                existing_pmids.update(pmids)
+                pmid_stats[collection_name] = len(pmids)
+                logger.info(f"{collection_name} 컬렉션의 기존 PMID 수: {len(pmids)}")
             
             logger.info("=== PMID 현황 요약 ===")
             logger.info(f"전체 기존 PMID 수: {len(existing_pmids)}")
@@ -255,6 +361,10 @@ class ChromaManager:
             logger.info(f"새로 추가된 PMID 수: {update_stats['new']}")
             logger.info(f"처리 실패 PMID 수: {update_stats['failed']}")
             
+            # 4. 코퍼스가 바뀌었으므로 사전 계산 이웃 갱신
+            if self.neighbors_path:
+                await self.precompute_neighbors()
+            
             logger.info("=== 데이터베이스 업데이트 완료 ===")
             return True
             
@@ -314,6 +424,36 @@ class ChromaManager:
             pubmed_source = PubMedSource()
             logger.info("PubMed 소스 초기화 완료")
             
+            # 영양제별 PubMed 검색/논문 처리를 동시에 수행 (NCBI 요청 한도에 맞춰 제한)
+            supplement_semaphore = asyncio.Semaphore(
+                CONFIG.get_pubmed_settings().get('max_concurrency') or 3
+            )
+            
+            # 저장은 백그라운드 작업이 순서대로 수행하여 PubMed 검색/논문 처리와 겹치게 함
+            write_queue: asyncio.Queue = asyncio.Queue(maxsize=self.WRITE_QUEUE_SIZE)
+            
+            async def _flush(collection_name: str, buffer: List[Dict]):
+                """버퍼의 논문을 저장 대기열로 넘김 (대기열이 가득 찬 경우에만 대기)"""
+                if not buffer:
+                    return
+                # 대기 중 다른 영양제 작업이 버퍼에 추가할 수 있으므로 먼저 비움
+                batch = buffer[:]
+                buffer.clear()
+                await write_queue.put((collection_name, batch))
+            
+            def _limit_reached(collection_name: str, limit: Optional[int]) -> bool:
+                """컬렉션의 모든 카테고리가 제한에 도달했는지 확인 (대기 중인 영양제 작업의 검색 생략용)
+                
+                저장 실패 시 카테고리 수가 다시 줄어들 수 있으므로 매번 현재 값으로 판단
+                """
+                return limit is not None and all(
+                    count >= limit for count in collection_categories[collection_name].values()
+                )
+            
+            writer_task = asyncio.create_task(
+                self._write_batches(write_queue, collection_categories, update_stats)
+            )
+            
             try:
                 # 1. Supplements 처리
                 supplements = CONFIG.get_supplements()
@@ -329,56 +469,74 @@ class ChromaManager:
                     logger.info("supplements 컬렉션 처리 건너뜀 (제한: 0)")
                 
                 if should_process_supplements:
-                    for ko_name, en_name in supplements.items():
-                        try:
-                            logger.info(f"\n=== 영양제 처리 시작: {ko_name} (영문: {en_name}) ===")
+                    buffer = []
+                    # 이번 실행에서 이미 저장 대기열에 넣은 PMID (여러 영양제 검색에 같은 논문이 걸리는 경우)
+                    seen_pmids: Set[str] = set()
+                    
+                    async def _process_supplement(ko_name: str, en_name: str):
+                        async with supplement_semaphore:
+                            if _limit_reached('supplements', supplements_limit):
+                                return
+                            try:
+                                logger.info(f"\n=== 영양제 처리 시작: {ko_name} (영문: {en_name}) ===")
                             
-                            # 각 카테고리별로 검색 및 처리
-                            for category in collection_categories['supplements'].keys():
-                                if collection_categories['supplements'][category] >= supplements_limit:
-                                    continue
+                                # 각 카테고리별로 검색 및 처리
+                                for category in collection_categories['supplements'].keys():
+                                    if collection_categories['supplements'][category] >= supplements_limit:
+                                        continue
                                     
-                                search_query = f"{en_name} {CONFIG.get_pubmed_categories()[category]['search_term']}"
-                                async for paper_data in pubmed_source.search_supplement(ko_name, category=category, query=search_query):
-                                    try:
-                                        if update_stats is not None:
-                                            update_stats['total_checked'] += 1
-                                        
-                                        pmid = paper_data.get('pmid')
-                                        if is_update and pmid in existing_pmids:
-                                            logger.info(f"기존 PMID 스킵: {pmid}")
+                                    search_query = f"{en_name} {CONFIG.get_pubmed_categories()[category]['search_term']}"
+                                    async for paper_data in pubmed_source.search_supplement(ko_name, category=category, query=search_query):
+                                        try:
                                             if update_stats is not None:
-                                                update_stats['existing'] += 1
-                                            continue
+                                                update_stats['total_checked'] += 1
                                         
-                                        if collection_categories['supplements'][category] >= supplements_limit:
-                                            break
+                                            pmid = paper_data.get('pmid')
+                                            if is_update and pmid in existing_pmids:
+                                                logger.debug("기존 PMID 스킵: %s", pmid)
+                                                if update_stats is not None:
+                                                    update_stats['existing'] += 1
+                                                continue
                                         
-                                        logger.info(f"새로운 PMID 처리 시작: {pmid} (카테고리: {category})")
-                                        paper_data['category'] = category
-                                        success = await self._add_paper_to_collection("supplements", paper_data)
+                                            if collection_categories['supplements'][category] >= supplements_limit:
+                                                break
+                                            
+                                            if pmid in seen_pmids:
+                                                logger.debug("중복 PMID 스킵: %s", pmid)
+                                                continue
+                                            seen_pmids.add(pmid)
                                         
-                                        if success:
-                                            logger.info(f"새로운 PMID 처리 완료: {pmid}")
-                                            if update_stats is not None:
-                                                update_stats['new'] += 1
+                                            logger.debug("새로운 PMID 처리 시작: %s (카테고리: %s)", pmid, category)
+                                            paper_data['category'] = category
+                                            invalid = self._invalid_paper_fields(paper_data)
+                                            if invalid:
+                                                logger.warning(f"논문 필드 누락/형식 오류로 제외 - PMID: {pmid}: {', '.join(invalid)}")
+                                                if update_stats is not None:
+                                                    update_stats['failed'] += 1
+                                                continue
+                                            # 저장 대기 중인 논문도 카테고리 제한에 포함
+                                            buffer.append(paper_data)
                                             collection_categories['supplements'][category] += 1
-                                        else:
-                                            logger.warning(f"새로운 PMID 처리 실패: {pmid}")
+                                            if len(buffer) >= self.PAPER_BATCH_SIZE:
+                                                await _flush("supplements", buffer)
+                                                
+                                        except Exception as e:
+                                            logger.error(f"논문 처리 실패 - PMID: {paper_data.get('pmid', 'unknown')}: {str(e)}")
                                             if update_stats is not None:
                                                 update_stats['failed'] += 1
-                                                
-                                    except Exception as e:
-                                        logger.error(f"논문 처리 실패 - PMID: {paper_data.get('pmid', 'unknown')}: {str(e)}")
-                                        if update_stats is not None:
-                                            update_stats['failed'] += 1
-                                        continue
+                                            continue
                                 
-                                logger.info(f"{category} 카테고리 처리 완료: {collection_categories['supplements'][category]}/{supplements_limit}")
+                                    logger.info(f"{category} 카테고리 처리 완료: {collection_categories['supplements'][category]}/{supplements_limit}")
                                 
-                        except Exception as e:
-                            logger.error(f"영양제 처리 실패 ({ko_name}): {str(e)}")
-                            continue
+                            except Exception as e:
+                                logger.error(f"영양제 처리 실패 ({ko_name}): {str(e)}")
+                    
+                    await asyncio.gather(*[
+                        _process_supplement(ko_name, en_name) for ko_name, en_name in supplements.items()
+                    ])
+                    await _flush("supplements", buffer)
+                    # 수집 현황 집계 전에 남은 저장 완료 대기
+                    await write_queue.join()
                             
                     logger.info("\n=== Supplements 컬렉션 카테고리별 수집 현황 ===")
                     for category, count in collection_categories['supplements'].items():
@@ -394,53 +552,71 @@ class ChromaManager:
                 
                 if should_process_interactions:
                     logger.info(f"\n=== 상호작용 데이터 {mode} 시작 ===")
-                    for ko_name, en_name in supplements.items():
-                        try:
-                            for category in collection_categories['interactions'].keys():
-                                if collection_categories['interactions'][category] >= interactions_limit:
-                                    continue
+                    buffer = []
+                    # 이번 실행에서 이미 저장 대기열에 넣은 PMID (여러 영양제 검색에 같은 논문이 걸리는 경우)
+                    seen_pmids: Set[str] = set()
+                    
+                    async def _process_interactions(ko_name: str, en_name: str):
+                        async with supplement_semaphore:
+                            if _limit_reached('interactions', interactions_limit):
+                                return
+                            try:
+                                for category in collection_categories['interactions'].keys():
+                                    if collection_categories['interactions'][category] >= interactions_limit:
+                                        continue
                                     
-                                search_query = f"{en_name} {category.replace('_', ' ')}"
-                                async for paper_data in pubmed_source.search_interactions(ko_name, category=category, query=search_query):
-                                    try:
-                                        if update_stats is not None:
-                                            update_stats['total_checked'] += 1
-                                        
-                                        pmid = paper_data.get('pmid')
-                                        if is_update and pmid in existing_pmids:
-                                            logger.info(f"기존 PMID 스킵: {pmid}")
+                                    search_query = f"{en_name} {category.replace('_', ' ')}"
+                                    async for paper_data in pubmed_source.search_interactions(ko_name, category=category, query=search_query):
+                                        try:
                                             if update_stats is not None:
-                                                update_stats['existing'] += 1
-                                            continue
+                                                update_stats['total_checked'] += 1
                                         
-                                        if collection_categories['interactions'][category] >= interactions_limit:
-                                            break
+                                            pmid = paper_data.get('pmid')
+                                            if is_update and pmid in existing_pmids:
+                                                logger.debug("기존 PMID 스킵: %s", pmid)
+                                                if update_stats is not None:
+                                                    update_stats['existing'] += 1
+                                                continue
                                         
-                                        logger.info(f"새로운 PMID 처리 시작: {pmid} (카테고리: {category})")
-                                        paper_data['category'] = category
-                                        success = await self._add_paper_to_collection("interactions", paper_data)
+                                            if collection_categories['interactions'][category] >= interactions_limit:
+                                                break
+                                            
+                                            if pmid in seen_pmids:
+                                                logger.debug("중복 PMID 스킵: %s", pmid)
+                                                continue
+                                            seen_pmids.add(pmid)
                                         
-                                        if success:
-                                            logger.info(f"새로운 PMID 처리 완료: {pmid}")
-                                            if update_stats is not None:
-                                                update_stats['new'] += 1
+                                            logger.debug("새로운 PMID 처리 시작: %s (카테고리: %s)", pmid, category)
+                                            paper_data['category'] = category
+                                            invalid = self._invalid_paper_fields(paper_data)
+                                            if invalid:
+                                                logger.warning(f"논문 필드 누락/형식 오류로 제외 - PMID: {pmid}: {', '.join(invalid)}")
+                                                if update_stats is not None:
+                                                    update_stats['failed'] += 1
+                                                continue
+                                            # 저장 대기 중인 논문도 카테고리 제한에 포함
+                                            buffer.append(paper_data)
                                             collection_categories['interactions'][category] += 1
-                                        else:
-                                            logger.warning(f"새로운 PMID 처리 실패: {pmid}")
+                                            if len(buffer) >= self.PAPER_BATCH_SIZE:
+                                                await _flush("interactions", buffer)
+                                                
+                                        except Exception as e:
+                                            logger.error(f"논문 처리 실패 - PMID: {paper_data.get('pmid', 'unknown')}: {str(e)}")
                                             if update_stats is not None:
                                                 update_stats['failed'] += 1
-                                                
-                                    except Exception as e:
-                                        logger.error(f"논문 처리 실패 - PMID: {paper_data.get('pmid', 'unknown')}: {str(e)}")
-                                        if update_stats is not None:
-                                            update_stats['failed'] += 1
-                                        continue
+                                            continue
                                 
-                                logger.info(f"{category} 카테고리 처리 완료: {collection_categories['interactions'][category]}/{interactions_limit}")
+                                    logger.info(f"{category} 카테고리 처리 완료: {collection_categories['interactions'][category]}/{interactions_limit}")
                                 
-                        except Exception as e:
-                            logger.error(f"상호작용 처리 실패 ({ko_name}): {str(e)}")
-                            continue
+                            except Exception as e:
+                                logger.error(f"상호작용 처리 실패 ({ko_name}): {str(e)}")
+                    
+                    await asyncio.gather(*[
+                        _process_interactions(ko_name, en_name) for ko_name, en_name in supplements.items()
+                    ])
+                    await _flush("interactions", buffer)
+                    # 수집 현황 집계 전에 남은 저장 완료 대기
+                    await write_queue.join()
                             
                     logger.info("\n=== Interactions 컬렉션 카테고리별 수집 현황 ===")
                     for category, count in collection_categories['interactions'].items():
@@ -456,59 +632,81 @@ class ChromaManager:
                 
                 if should_process_health_data:
                     logger.info(f"\n=== 건강 데이터 {mode} 시작 ===")
-                    for ko_name, en_name in supplements.items():
-                        try:
-                            for category in collection_categories['health_data'].keys():
-                                if collection_categories['health_data'][category] >= health_data_limit:
-                                    continue
+                    buffer = []
+                    # 이번 실행에서 이미 저장 대기열에 넣은 PMID (여러 영양제 검색에 같은 논문이 걸리는 경우)
+                    seen_pmids: Set[str] = set()
+                    
+                    async def _process_health_data(ko_name: str, en_name: str):
+                        async with supplement_semaphore:
+                            if _limit_reached('health_data', health_data_limit):
+                                return
+                            try:
+                                for category in collection_categories['health_data'].keys():
+                                    if collection_categories['health_data'][category] >= health_data_limit:
+                                        continue
                                     
-                                search_query = f"{en_name} {category}"
-                                async for paper_data in pubmed_source.search_health_data(ko_name, category=category, query=search_query):
-                                    try:
-                                        if update_stats is not None:
-                                            update_stats['total_checked'] += 1
-                                        
-                                        pmid = paper_data.get('pmid')
-                                        if is_update and pmid in existing_pmids:
-                                            logger.info(f"기존 PMID 스킵: {pmid}")
+                                    search_query = f"{en_name} {category}"
+                                    async for paper_data in pubmed_source.search_health_data(ko_name, category=category, query=search_query):
+                                        try:
                                             if update_stats is not None:
-                                                update_stats['existing'] += 1
-                                            continue
+                                                update_stats['total_checked'] += 1
                                         
-                                        if collection_categories['health_data'][category] >= health_data_limit:
-                                            break
+                                            pmid = paper_data.get('pmid')
+                                            if is_update and pmid in existing_pmids:
+                                                logger.debug("기존 PMID 스킵: %s", pmid)
+                                                if update_stats is not None:
+                                                    update_stats['existing'] += 1
+                                                continue
                                         
-                                        logger.info(f"새로운 PMID 처리 시작: {pmid} (카테고리: {category})")
-                                        paper_data['category'] = category
-                                        success = await self._add_paper_to_collection("health_data", paper_data)
+                                            if collection_categories['health_data'][category] >= health_data_limit:
+                                                break
+                                            
+                                            if pmid in seen_pmids:
+                                                logger.debug("중복 PMID 스킵: %s", pmid)
+                                                continue
+                                            seen_pmids.add(pmid)
                                         
-                                        if success:
-                                            logger.info(f"새로운 PMID 처리 완료: {pmid}")
-                                            if update_stats is not None:
-                                                update_stats['new'] += 1
+                                            logger.debug("새로운 PMID 처리 시작: %s (카테고리: %s)", pmid, category)
+                                            paper_data['category'] = category
+                                            invalid = self._invalid_paper_fields(paper_data)
+                                            if invalid:
+                                                logger.warning(f"논문 필드 누락/형식 오류로 제외 - PMID: {pmid}: {', '.join(invalid)}")
+                                                if update_stats is not None:
+                                                    update_stats['failed'] += 1
+                                                continue
+                                            # 저장 대기 중인 논문도 카테고리 제한에 포함
+                                            buffer.append(paper_data)
                                             collection_categories['health_data'][category] += 1
-                                        else:
-                                            logger.warning(f"새로운 PMID 처리 실패: {pmid}")
+                                            if len(buffer) >= self.PAPER_BATCH_SIZE:
+                                                await _flush("health_data", buffer)
+                                                
+                                        except Exception as e:
+                                            logger.error(f"논문 처리 실패 - PMID: {paper_data.get('pmid', 'unknown')}: {str(e)}")
                                             if update_stats is not None:
                                                 update_stats['failed'] += 1
-                                                
-                                    except Exception as e:
-                                        logger.error(f"논문 처리 실패 - PMID: {paper_data.get('pmid', 'unknown')}: {str(e)}")
-                                        if update_stats is not None:
-                                            update_stats['failed'] += 1
-                                        continue
+                                            continue
                                 
-                                logger.info(f"{category} 카테고리 처리 완료: {collection_categories['health_data'][category]}/{health_data_limit}")
+                                    logger.info(f"{category} 카테고리 처리 완료: {collection_categories['health_data'][category]}/{health_data_limit}")
                                 
-                        except Exception as e:
-                            logger.error(f"건강 데이터 처리 실패 ({ko_name}): {str(e)}")
-                            continue
+                            except Exception as e:
+                                logger.error(f"건강 데이터 처리 실패 ({ko_name}): {str(e)}")
+                    
+                    await asyncio.gather(*[
+                        _process_health_data(ko_name, en_name) for ko_name, en_name in supplements.items()
+                    ])
+                    await _flush("health_data", buffer)
+                    # 수집 현황 집계 전에 남은 저장 완료 대기
+                    await write_queue.join()
                             
                     logger.info("\n=== Health Data 컬렉션 카테고리별 수집 현황 ===")
                     for category, count in collection_categories['health_data'].items():
                         logger.info(f"- {category}: {count}/{health_data_limit}")
                 
             finally:
+                # 취소된 저장 작업이 실제로 끝날 때까지 기다려 진행 중인 collection.add와
+                # 이후 재초기화/종료 처리가 겹치지 않도록 함
+                writer_task.cancel()
+                await asyncio.gather(writer_task, return_exceptions=True)
                 await pubmed_source.close()
             
             # 최종 처리 결과 로깅
@@ -528,96 +726,155 @@ class ChromaManager:
             logger.error(f"에러 발생 라인: {e.__traceback__.tb_lineno}")
             raise
 
-    async def _add_paper_to_collection(self, collection_name: str, paper: Dict) -> bool:
-        """논문 데이터를 컬렉션에 추가"""
+    @classmethod
+    def _invalid_paper_fields(cls, paper: Dict) -> List[str]:
+        """저장할 수 없는 논문 필드 목록 반환 (비어 있으면 저장 가능)
+        
+        메타데이터 필드는 모두 있어야 하고 Chroma가 허용하는 스칼라(str/int/float/bool)여야 하며,
+        임베딩할 processed_text는 문자열이어야 합니다. 한 논문 때문에 묶음 전체의
+        collection.add가 실패하지 않도록 대기열에 넣기 전에 확인합니다.
+        """
+        invalid = [
+            key for key in cls.PAPER_METADATA_FIELDS
+            if not isinstance(paper.get(key), (str, int, float, bool))
+        ]
+        if not isinstance(paper.get("processed_text"), str):
+            invalid.append("processed_text")
+        return invalid
+
+    @classmethod
+    def _paper_metadata(cls, paper: Dict) -> Dict:
+        """논문 데이터를 컬렉션 메타데이터로 변환 (authors는 PubMedSource에서 문자열로 변환됨)"""
+        return {key: paper[key] for key in cls.PAPER_METADATA_FIELDS}
+
+    async def _flush_batch(self, collection_name: str, papers: List[Dict]) -> Set[str]:
+        """논문 묶음을 일괄 임베딩 요청과 collection.add 한 번으로 저장
+        
+        Args:
+            collection_name: 저장할 컬렉션 이름
+            papers: 논문 데이터 리스트
+            
+        Returns:
+            저장된 PMID 집합 (같은 묶음 안의 중복 PMID는 한 번만 저장)
+        """
+        # 같은 논문이 여러 카테고리 검색에 걸린 경우 첫 항목만 저장 (한 번의 add에 중복 ID 불가)
+        first_by_pmid = {}
+        for paper in papers:
+            first_by_pmid.setdefault(paper["pmid"], paper)
+        unique = list(first_by_pmid.values())
         try:
-            collection = self.client.get_collection(collection_name)
+            collection = await self._collection(collection_name)
+            # 재초기화 시 같은 본문은 영구 임베딩 캐시(SHA-256 키)에서 재사용하여 API 호출 생략
+            embeddings = await self.embedding_creator.embed_matrix(
+                [paper["processed_text"] for paper in unique],
+                cache_in_memory=False
+            )
             
-            # 임베딩 생성
-            embeddings = await self.openai_client.get_embeddings(paper["processed_text"])
-            if not embeddings:
+            # 임베딩 요청이 실패해 0 벡터로 채워진 논문은 제외
+            # (embed_matrix 결과는 이미 float32 행렬이므로 모두 유효하면 복사 없이 그대로 전달)
+            mask = embeddings.any(axis=1)
+            for paper in itertools.compress(unique, ~mask):
                 logger.error(f"임베딩 생성 실패 - PMID: {paper.get('pmid')}")
-                return False
+            valid = unique if mask.all() else list(itertools.compress(unique, mask))
+            if not valid:
+                return set()
                 
-            # numpy 배열로 변환
-            import numpy as np
-            embeddings_array = np.array(embeddings)
-            
-            # 저자 정보를 문자열로 변환
-            if isinstance(paper["authors"], list):
-                if len(paper["authors"]) > 0:
-                    if isinstance(paper["authors"][0], dict):
-                        authors_str = ", ".join([author.get("name", "") for author in paper["authors"]])
-                    else:
-                        authors_str = ", ".join(map(str, paper["authors"]))
-                else:
-                    authors_str = ""
-            else:
-                authors_str = str(paper["authors"])
-            
-            # 메타데이터 준비
-            metadata = {
-                "pmid": paper["pmid"],
-                "title": paper["title"],
-                "abstract": paper["abstract"],
-                "authors": authors_str,
-                "publication_date": paper["publication_date"],
-                "journal": paper["journal"],
-                "category": paper["category"],
-                "weight": paper["weight"],
-                "description": paper["description"],
-                "llm_analysis": paper["llm_analysis"]
-            }
-            
-            # 데이터 추가
-            collection.add(
-                embeddings=embeddings_array,
-                documents=[paper["processed_text"]],
-                metadatas=[metadata],
-                ids=[paper["pmid"]]
+            await asyncio.to_thread(
+                collection.add,
+                embeddings=embeddings if len(valid) == len(unique) else embeddings[mask],
+                documents=[paper["processed_text"] for paper in valid],
+                metadatas=[self._paper_metadata(paper) for paper in valid],
+                ids=[paper["pmid"] for paper in valid]
             )
             
-            logger.info(f"논문 데이터 저장 완료료 - PMID: {paper['pmid']}")
-            return True
+            logger.debug("논문 데이터 일괄 저장 완료 - %s: %d건", collection_name, len(valid))
+            return {paper["pmid"] for paper in valid}
             
         except Exception as e:
-            logger.error(f"논문 저장 실패 - PMID: {paper.get('pmid')}: {str(e)}")
-            logger.error("저장 실패한 데이터 구조: " + json.dumps({
-                "pmid": "str",
-                "title": "str",
-                "abstract": "str",
-                "authors": "list",
-                "publication_date": "str",
-                "journal": "str",
-                "category": "str",
-                "weight": "float",
-                "description": "str",
-                "processed_text": "str",
-                "llm_analysis": "str",
-                "author_names": "list"
-            }, indent=2))
-            return False
+            logger.error(f"논문 일괄 저장 실패 - {collection_name} ({len(unique)}건): {str(e)}")
+            return set()
+
+    async def _write_batches(
+        self,
+        write_queue: asyncio.Queue,
+        collection_categories: Dict[str, Dict[str, int]],
+        update_stats: Optional[Dict[str, int]] = None
+    ):
+        """대기열의 (컬렉션 이름, 논문 묶음)을 저장하고 결과를 통계에 반영 (취소될 때까지 실행)
+        
+        저장에 실패한 논문은 failed로 집계하고 카테고리 수에서 차감합니다. 어떤 오류가 나도
+        묶음마다 task_done()을 호출하므로 대기열의 join()은 항상 끝납니다.
+        """
+        while True:
+            collection_name, batch = await write_queue.get()
+            try:
+                try:
+                    added = await self._flush_batch(collection_name, batch)
+                except Exception as e:
+                    logger.error(f"{collection_name} 묶음 저장 실패 ({len(batch)}건): {str(e)}")
+                    added = set()
+                # 논문별 로그는 debug로 두고 묶음 단위로 요약 (대량 적재 시 로그 I/O 감소)
+                logger.info(f"{collection_name} 묶음 처리: 저장 {len(added)}건 / 대기 {len(batch)}건")
+                for paper in batch:
+                    if paper['pmid'] in added:
+                        logger.debug("새로운 PMID 처리 완료: %s", paper['pmid'])
+                        if update_stats is not None:
+                            update_stats['new'] += 1
+                    else:
+                        logger.warning(f"새로운 PMID 처리 실패: {paper['pmid']}")
+                        if update_stats is not None:
+                            update_stats['failed'] += 1
+                        collection_categories[collection_name][paper['category']] -= 1
+            except Exception as e:
+                # 저장 작업이 멈추면 join()이 끝나지 않으므로 묶음 단위로 실패 처리 후 계속
+                logger.error(f"{collection_name} 묶음 저장 결과 처리 실패: {str(e)}")
+            finally:
+                write_queue.task_done()
+
+    async def _add_paper_to_collection(self, collection_name: str, paper: Dict) -> bool:
+        """논문 데이터를 컬렉션에 추가"""
+        return bool(await self._flush_batch(collection_name, [paper]))
 
     async def show_stats(self) -> Dict:
         """컬렉션 통계 조회"""
         try:
-            stats = {}
-            for name, collection in self.collections.items():
-                result = collection.get()
-                stats[name] = {
-                    "count": len(result['ids']) if result['ids'] else 0,
-                    "metadata_fields": list(set().union(*[set(m.keys()) for m in result['metadatas']])) if result['metadatas'] else [],
-                    "last_updated": datetime.now().isoformat()
+            last_updated = datetime.now().isoformat()
+            
+            def _collection_stats(collection) -> Dict:
+                # 전체 행을 가져오지 않고 개수는 count(), 메타데이터 필드는 앞쪽 일부 행으로 확인
+                # (peek()는 임베딩까지 전송하므로 메타데이터만 요청하고, 차원은 한 행으로 확인)
+                sample = collection.get(limit=self.STATS_SAMPLE_SIZE, include=["metadatas"])
+                metadata_fields = set()
+                for metadata in sample['metadatas'] or []:
+                    metadata_fields.update(metadata or ())
+                first = collection.get(limit=1, include=["embeddings"])['embeddings']
+                return {
+                    "count": collection.count(),
+                    "metadata_fields": list(metadata_fields),
+                    "embedding_dim": len(first[0]) if first is not None and len(first) else 0,
+                    "last_updated": last_updated
                 }
-            return stats
+            
+            names = list(self.collections)
+            results = await asyncio.gather(*[
+                asyncio.to_thread(_collection_stats, self.collections[name]) for name in names
+            ])
+            return dict(zip(names, results))
         except Exception as e:
             logger.error(f"통계 조회 실패: {str(e)}")
             raise
 
+    async def close(self):
+        """공유 HTTP 연결 풀 및 영구 임베딩 캐시 종료"""
+        if self.embedding_creator is not None:
+            self.embedding_creator.close()
+        await close_http_client()
+        logger.info("ChromaManager 연결 종료")
+
     @classmethod
-    async def create(cls):
+    async def create(cls, lazy: bool = False):
         """비동기 팩토리 메소드"""
-        self = cls()
+        self = cls(lazy=lazy)
         try:
             logger.info("ChromaManager 초기화 시작")
             return self
@@ -629,7 +886,7 @@ class ChromaManager:
     async def main():
         """인 함수"""
         parser = argparse.ArgumentParser(description='Vector Store Manager')
-        parser.add_argument('--action', choices=['stats', 'update', 'reinit'], help='실행할 작업')
+        parser.add_argument('--action', choices=['stats', 'update', 'reinit', 'precompute'], help='실행할 작업')
         parser.add_argument('--debug', action='store_true', help='디버그 모드 활성화')
         parser.add_argument('--force', action='store_true', help='강제 실행')
         parser.add_argument('--supplements-limit', type=int, help='영양제 데이터 제한')
@@ -639,19 +896,23 @@ class ChromaManager:
         parser.add_argument('--medical-terms-limit', type=int, help='의학 용어 제한')
         args = parser.parse_args()
         
-        # Vector Store Manager 초기화
-        manager = ChromaManager()
+        # Vector Store Manager 초기화 (통계 조회는 임베딩 스택 없이)
+        manager = await ChromaManager.create(lazy=args.action == 'stats')
         
         try:
             if args.action == 'stats':
                 # 통계 조회
                 stats = await manager.show_stats()
-                logger.info(f"\n=== Vector Store 상태 ===\n{json.dumps(stats, indent=2, ensure_ascii=False)}")
+                logger.info(f"\n=== Vector Store 상태 ===\n{json_utils.dumps(stats, indent=True)}")
                 return
             elif args.action == 'reinit':
                 # 데이터베이스 재초기화
                 await manager.reinitialize_database(force=args.force)
                 return
+            elif args.action == 'precompute':
+                # 영양제 이름/조합별 최근접 문서 사전 계산
+                await manager.precompute_neighbors()
+                return
             elif args.action == 'update':
                 # 컬렉션별 제한 설정
                 collection_limits = {
@@ -670,38 +931,196 @@ class ChromaManager:
             logger.error(f"Vector Store 작업 중 오류 발생: {str(e)}")
             raise
 
+    async def _collection(self, name: str):
+        """이름으로 컬렉션 핸들 조회 (처음 한 번만 서버에 요청하고 이후 self.collections 재사용)"""
+        collection = self.collections.get(name)
+        if collection is None:
+            collection = await asyncio.to_thread(self.client.get_collection, name, embedding_function=None)
+            self._check_space(collection)
+            self.collections[name] = collection
+        return collection
+
+    @staticmethod
+    async def _query(collection, **kwargs) -> Dict:
+        """동기 HttpClient 컬렉션 쿼리를 워커 스레드에서 실행 (이벤트 루프 차단 방지)"""
+        return await asyncio.to_thread(collection.query, **kwargs)
+
+    @staticmethod
+    def _pair_key(group: Sequence[str]) -> str:
+        """조합 이웃 테이블 키 (순서와 무관하게 같은 키가 되도록 이름 정렬)"""
+        return " ".join(sorted(group))
+
+    async def _clear_precomputed_neighbors(self):
+        """사전 계산 이웃 파일과 메모리 테이블 삭제"""
+        self._precomputed_neighbors = {}
+        if self.neighbors_path and os.path.exists(self.neighbors_path):
+            try:
+                await asyncio.to_thread(os.remove, self.neighbors_path)
+                logger.info("사전 계산 이웃 파일 삭제 완료")
+            except OSError as e:
+                logger.warning(f"사전 계산 이웃 파일 삭제 실패: {str(e)}")
+
+    async def precompute_neighbors(self) -> Dict[str, int]:
+        """알려진 영양제 이름과 두 개 조합의 최근접 문서 ID를 미리 계산하여 파일로 저장
+        
+        코퍼스는 update 시에만 바뀌므로, 분석 요청 시에는 HNSW 검색 대신
+        저장된 ID로 문서를 바로 조회할 수 있습니다.
+        
+        Returns:
+            컬렉션별 사전 계산된 쿼리 수
+        """
+        if not self.neighbors_path:
+            logger.warning("service.chroma.precomputed_neighbors_path가 설정되지 않아 사전 계산을 건너뜁니다")
+            return {}
+            
+        names = list(CONFIG.get_supplements().keys())
+        queries = {
+            'supplements': (names, self.SUPPLEMENT_RESULTS),
+            # 조합은 순서 없이 한 번만 계산하고 조회 시 _pair_key로 정규화
+            'interactions': (
+                names + [self._pair_key(pair) for pair in itertools.combinations(names, 2)],
+                self.INTERACTION_RESULTS
+            )
+        }
+        
+        neighbors = {}
+        for collection_name, (texts, n_results) in queries.items():
+            # 일회성 대량 쿼리이므로 메모리 임베딩 캐시에 넣지 않음
+            embeddings = await self.embedding_creator.embed_matrix(texts, cache_in_memory=False)
+            # 임베딩 생성에 실패한 (0 벡터) 쿼리는 이웃을 저장하지 않음 (조회 시 벡터 검색으로 대체)
+            mask = embeddings.any(axis=1)
+            texts = list(itertools.compress(texts, mask))
+            if not texts:
+                neighbors[collection_name] = {}
+                continue
+            results = await self._query(
+                await self._collection(collection_name),
+                query_embeddings=embeddings if mask.all() else embeddings[mask],
+                n_results=n_results,
+                include=["distances"]
+            )
+            neighbors[collection_name] = dict(zip(texts, results.get('ids') or []))
+            logger.info(f"{collection_name} 컬렉션 이웃 사전 계산 완료: {len(texts)}개 쿼리 (제외 {int((~mask).sum())}개)")
+            
+        def _write():
+            os.makedirs(os.path.dirname(self.neighbors_path), exist_ok=True)
+            tmp_path = f"{self.neighbors_path}.tmp"
+            with open(tmp_path, 'w', encoding='utf-8') as f:
+                f.write(json_utils.dumps(neighbors))
+            os.replace(tmp_path, self.neighbors_path)
+            
+        await asyncio.to_thread(_write)
+        self._precomputed_neighbors = neighbors
+        return {name: len(table) for name, table in neighbors.items()}
+
+    async def _query_documents(
+        self,
+        collection_name: str,
+        texts: List[str],
+        n_results: int,
+        keys: Optional[List[str]] = None
+    ) -> List[List[str]]:
+        """쿼리 텍스트별 최근접 문서 조회
+        
+        모든 텍스트의 이웃이 사전 계산되어 있으면 ID로 한 번에 가져오고(ANN 검색 없음),
+        하나라도 없거나 저장된 ID 중 일부가 더 이상 존재하지 않으면 벡터 검색을 수행합니다.
+        
+        Args:
+            keys: 이웃 테이블 조회 키 (기본값: texts, 조합은 _pair_key로 정규화한 값)
+        """
+        collection = await self._collection(collection_name)
+        table = self._precomputed_neighbors.get(collection_name, {})
+        keys = texts if keys is None else keys
+        if all(key in table for key in keys):
+            ids = list(dict.fromkeys(doc_id for key in keys for doc_id in table[key][:n_results]))
+            results = await asyncio.to_thread(collection.get, ids=ids, include=["documents"])
+            documents = dict(zip(results.get('ids') or [], results.get('documents') or []))
+            if len(documents) == len(ids):
+                return [[documents[doc_id] for doc_id in table[key][:n_results]] for key in keys]
+            logger.warning(
+                f"{collection_name} 사전 계산 이웃 중 {len(ids) - len(documents)}개 문서가 없어 벡터 검색으로 대체합니다"
+            )
+            
+        results = await self._query(
+            collection,
+            query_embeddings=await self.embedding_creator.embed_matrix(texts),
+            n_results=n_results
+        )
+        return results.get('documents') or []
+
     async def get_supplement_interaction(self, health_data: Dict, current_supplements: List[str]) -> Dict:
         """영양제 간 상호작용 분석"""
+        results = await self.get_supplement_interactions_batch(health_data, [current_supplements])
+        return results[0]
+
+    async def get_supplement_interactions_batch(
+        self,
+        health_data: Dict,
+        supplement_groups: List[Sequence[str]],
+        llm_semaphore: Optional[asyncio.Semaphore] = None
+    ) -> List[Dict]:
+        """여러 영양제 조합의 상호작용 일괄 분석
+        
+        조합에 포함된 영양제 정보와 조합별 상호작용 정보를 각각 Chroma 다중 쿼리
+        한 번으로 검색한 뒤, 조합별 GPT 분석을 동시에 수행합니다.
+        
+        Args:
+            health_data: 건강 데이터
+            supplement_groups: 영양제 이름 조합 리스트 (예: [("비타민D", "칼슘"), ...])
+            llm_semaphore: 채팅 완료 요청 동시 실행 제한 (호출 측 LLM 한도와 공유할 때 전달,
+                없으면 ChromaManager 자체 세마포어 사용)
+            
+        Returns:
+            조합 순서와 동일한 상호작용 분석 결과 리스트
+        """
+        if not supplement_groups:
+            return []
+            
         try:
-            # 1. 영양제 관련 정보 검색
-            supplements_info = []
-            for supp in current_supplements:
-                results = self.collections['supplements'].query(
-                    query_texts=[supp],
-                    n_results=5
+            # 1. 영양제 관련 정보 일괄 검색 (중복 이름은 한 번만 조회)
+            names = list(dict.fromkeys(supp for group in supplement_groups for supp in group))
+            # 2. 상호작용 정보 일괄 검색 (두 검색은 서로 독립적이므로 동시에 실행)
+            #    (사전 계산된 이웃이 있으면 벡터 검색 없이 ID로 조회)
+            supplement_results, interaction_docs = await asyncio.gather(
+                self._query_documents('supplements', names, self.SUPPLEMENT_RESULTS),
+                self._query_documents(
+                    'interactions',
+                    [" ".join(group) for group in supplement_groups],
+                    self.INTERACTION_RESULTS,
+                    keys=[
+                        self._pair_key(group) if len(group) == 2 else " ".join(group)
+                        for group in supplement_groups
+                    ]
                 )
-                if results and results['documents']:
-                    supplements_info.extend(results['documents'][0])
-
-            # 2. 상호작용 정보 검색
-            interaction_results = self.collections['interactions'].query(
-                query_texts=[" ".join(current_supplements)],
-                n_results=3
             )
+            supplement_docs = dict(zip(names, supplement_results))
+        except Exception as e:
+            logger.error(f"영양제 상호작용 분석 중 오류: {str(e)}")
+            return [{"status": "error", "error": str(e)} for _ in supplement_groups]
+
+        health_context = json_utils.dumps(health_data)
 
-            # 3. GPT를 통한 분석
-            analysis_prompt = f"""
+        async def _analyze_group(index: int, group: Sequence[str]) -> Dict:
+            try:
+                supplements_info = []
+                for supp in group:
+                    supplements_info.extend(supplement_docs.get(supp) or [])
+                # 단일 조합 조회 시와 동일하게 쿼리 차원을 유지한 상호작용 문서
+                evidence = [interaction_docs[index]] if index < len(interaction_docs) else []
+
+                # 3. GPT를 통한 분석
+                analysis_prompt = f"""
             다음 영양제들의 상호작용을 분석해주세요:
-            영양제: {', '.join(current_supplements)}
+            영양제: {', '.join(group)}
             
             영양제 정보:
             {supplements_info}
             
             상호작용 정보:
-            {interaction_results['documents'] if interaction_results['documents'] else '관련 정보 없음'}
+            {evidence if evidence else '관련 정보 없음'}
             
             건강 데이터:
-            {json.dumps(health_data, ensure_ascii=False)}
+            {health_context}
             
             다음 형식으로 응답해주세요:
             1. 상호작용 여부
@@ -710,264 +1129,199 @@ class ChromaManager:
             4. 근거 자료
             """
 
-            analysis = await self.openai_client.chat_completion(
-                messages=[{"role": "user", "content": analysis_prompt}]
-            )
+                analysis = await retry_on_rate_limit(
+                    lambda: self.openai_client.chat_completion(
+                        messages=[{"role": "user", "content": analysis_prompt}]
+                    ),
+                    semaphore=llm_semaphore or self._llm_semaphore
+                )
 
-            # 4. 결과 반환
-            return {
-                "status": "success",
-                "supplements": current_supplements,
-                "description": analysis['content'],
-                "evidence": interaction_results['documents'] if interaction_results['documents'] else []
-            }
+                # 4. 결과 반환
+                return {
+                    "status": "success",
+                    "supplements": list(group),
+                    "description": analysis['content'],
+                    "evidence": evidence
+                }
 
-        except Exception as e:
-            logger.error(f"영양제 상호작용 분석 중 오류: {str(e)}")
-            return {
-                "status": "error",
-                "error": str(e)
-            }
+            except Exception as e:
+                logger.error(f"영양제 상호작용 분석 중 오류: {str(e)}")
+                return {
+                    "status": "error",
+                    "error": str(e)
+                }
+
+        return list(await asyncio.gather(
+            *[_analyze_group(i, group) for i, group in enumerate(supplement_groups)]
+        ))
 
     async def get_health_impacts(self, supplement: str, health_data: Dict) -> List[Dict]:
         """영양제가 건강 상태에 미치는 영향 조회"""
-        try:
-            # health_data 컬렉션에서 검색
-            collection = self.client.get_collection("health_data")
-            query = f"{supplement} health effects"
+        results = await self.get_health_impacts_batch([supplement], health_data)
+        return results[0]
+
+    async def get_health_impacts_batch(self, supplements: List[str], health_data: Dict) -> List[List[Dict]]:
+        """여러 영양제가 건강 상태에 미치는 영향 일괄 조회
+        
+        Args:
+            supplements: 영양제 이름 리스트
+            health_data: 건강 데이터
             
-            results = collection.query(
-                query_texts=[query],
+        Returns:
+            영양제 순서와 동일한 건강 영향 리스트
+        """
+        if not supplements:
+            return []
+            
+        try:
+            # health_data 컬렉션에서 다중 쿼리 한 번으로 검색
+            collection = await self._collection("health_data")
+            results = await self._query(
+                collection,
+                query_embeddings=await self.embedding_creator.embed_matrix(
+                    [f"{supplement} health effects" for supplement in supplements]
+                ),
                 n_results=3
             )
             
-            impacts = []
-            for i, doc in enumerate(results['documents']):
-                if doc:
-                    impacts.append({
-                        "supplement": supplement,
-                        "health_aspect": results['metadatas'][i].get('category', 'general'),
-                        "impact": doc,
-                        "evidence": {
-                            "source": "PubMed",
-                            "pmid": results['ids'][i],
-                            "summary": doc
-                        }
-                    })
+            all_impacts = []
+            for supplement, docs, metadatas, ids in zip(
+                supplements,
+                results['documents'],
+                results['metadatas'],
+                results['ids']
+            ):
+                impacts = []
+                for doc, metadata, pmid in zip(docs, metadatas, ids):
+                    if doc:
+                        impacts.append({
+                            "supplement": supplement,
+                            "health_aspect": (metadata or {}).get('category', 'general'),
+                            "impact": doc,
+                            "evidence": {
+                                "source": "PubMed",
+                                "pmid": pmid,
+                                "summary": doc
+                            }
+                        })
+                all_impacts.append(impacts)
             
-            return impacts
+            return all_impacts
             
         except Exception as e:
-            logger.error(f"건강 영향 검색 실패 ({supplement}): {str(e)}")
-            return []
+            logger.error(f"건강 영향 검색 실패 ({', '.join(supplements)}): {str(e)}")
+            return [[] for _ in supplements]
 
-    async def update_supplements(self, limit: int = None):
-        """영양제 데이터 업데이트"""
-        logger.info("영양제 데이터 업데이트 시작")
-        
-        # 카테고리별 카운터 초기화
-        category_counts = {
-            'mechanism': 0,
-            'interaction': 0,
-            'bioavailability': 0,
-            'safety': 0,
-            'clinical': 0
-        }
-        
-        # 각 영양제별로 처리
-        for supplement_name in self.data_source.supplements.keys():
-            # 각 카테고리별로 처리
-            for category in category_counts.keys():
-                # 카테고리 제한 확인
-                if limit and category_counts[category] >= limit:
-                    logger.info(f"{category} 카테고리 제한({limit})에 도달")
-                    continue
-                    
-                try:
-                    # 카테고리별 검색 수행
-                    async for paper in self.data_source.search_supplement(supplement_name, category):
-                        try:
-                            # 벡터 저장소에 추가
-                            await self.supplements_collection.add(
-                                documents=[paper['abstract']],
-                                metadatas=[{
-                                    'pmid': paper['pmid'],
-                                    'title': paper['title'],
-                                    'category': paper['category'],
-                                    'weight': paper['weight'],
-                                    'description': paper['description']
-                                }],
-                                ids=[f"supp_{paper['pmid']}"]
-                            )
-                            
-                            # 카운터 증가
-                            category_counts[category] += 1
-                            logger.info(f"영양제 {supplement_name} - {category} 카테고리 문서 추가 완료 (현재: {category_counts[category]})")
-                            
-                        except Exception as e:
-                            logger.error(f"벡터 저장소 추가 중 오류 발생: {str(e)}")
-                            continue
-                            
-                except Exception as e:
-                    logger.error(f"영양제 {supplement_name} 검색 중 오류 발생: {str(e)}")
-                    continue
-                    
-        logger.info("영양제 데이터 업데이트 완료")
-        logger.info(f"카테고리별 문서 수: {category_counts}")
+    async def get_supplement_embeddings(self, supplements: List[str]) -> np.ndarray:
+        """영양제 이름의 임베딩 행렬 조회 (임베딩 캐시 사용, 행 순서는 입력 순서)"""
+        return await self.embedding_creator.embed_matrix(supplements)
 
-    async def update_interactions(self, limit: int = None):
-        """상호작용 데이터 업데이트"""
-        logger.info("상호작용 데이터 업데이트 시작")
-        
-        # 카테고리별 카운터 초기화
-        category_counts = {
-            'drug_interaction': 0,
-            'absorption': 0,
-            'synergy': 0,
-            'metabolism': 0
-        }
-        
-        # 각 영양제별로 처리
-        for supplement_name in self.data_source.supplements.keys():
-            # 각 카테고리별로 처리
-            for category in category_counts.keys():
-                # 카테고리 제한 확인
-                if limit and category_counts[category] >= limit:
-                    logger.info(f"{category} 카테고리 제한({limit})에 도달")
-                    continue
-                    
-                try:
-                    # 카테고리별 검색 수행
-                    async for paper in self.data_source.search_interactions(supplement_name, category):
-                        try:
-                            # 벡터 저장소에 추가
-                            await self.interactions_collection.add(
-                                documents=[paper['abstract']],
-                                metadatas=[{
-                                    'pmid': paper['pmid'],
-                                    'title': paper['title'],
-                                    'category': paper['category'],
-                                    'weight': paper['weight'],
-                                    'description': paper['description']
-                                }],
-                                ids=[f"int_{paper['pmid']}"]
-                            )
-                            
-                            # 카운터 증가
-                            category_counts[category] += 1
-                            logger.info(f"영양제 {supplement_name} - {category} 카테고리 문서 추가 완료 (현재: {category_counts[category]})")
-                            
-                        except Exception as e:
-                            logger.error(f"벡터 저장소 추가 중 오류 발생: {str(e)}")
-                            continue
-                            
-                except Exception as e:
-                    logger.error(f"영양제 {supplement_name} 검색 중 오류 발생: {str(e)}")
-                    continue
-                    
-        logger.info("상호작용 데이터 업데이트 완료")
-        logger.info(f"카테고리별 문서 수: {category_counts}")
+    async def search_supplements_for_condition(self, condition: str, n_results: int = 3) -> List[Dict]:
+        """건강 상태에 따른 영양제 검색"""
+        results = await self.search_supplements_for_conditions([condition], n_results=n_results)
+        return results[0] if results else []
 
-    async def update_health_data(self, limit: int = None):
-        """건강 데이터 업데이트"""
-        logger.info("건강 데이터 업데이트 시작")
+    async def search_supplements_for_conditions(self, conditions: List[str], n_results: int = 3) -> List[List[Dict]]:
+        """여러 건강 상태에 대한 영양제 일괄 검색
         
-        # 카테고리별 카운터 초기화
-        category_counts = {
-            'pathophysiology': 0,
-            'diagnosis': 0,
-            'treatment': 0,
-            'prevention': 0,
-            'nutrition': 0
-        }
+        조건별 쿼리 임베딩은 임베딩 캐시(메모리/영구)에서 먼저 찾고 없는 것만 한 번의
+        OpenAI 요청으로 생성하며, Chroma 다중 쿼리 한 번으로 검색합니다.
         
-        # 각 영양제별로 처리
-        for supplement_name in self.data_source.supplements.keys():
-            # 각 카테고리별로 처리
-            for category in category_counts.keys():
-                # 카테고리 제한 확인
-                if limit and category_counts[category] >= limit:
-                    logger.info(f"{category} 카테고리 제한({limit})에 도달")
-                    continue
-                    
-                try:
-                    # 카테고리별 검색 수행
-                    async for paper in self.data_source.search_health_data(supplement_name, category):
-                        try:
-                            # 벡터 저장소에 추가
-                            await self.health_data_collection.add(
-                                documents=[paper['abstract']],
-                                metadatas=[{
-                                    'pmid': paper['pmid'],
-                                    'title': paper['title'],
-                                    'category': paper['category'],
-                                    'weight': paper['weight'],
-                                    'description': paper['description']
-                                }],
-                                ids=[f"health_{paper['pmid']}"]
-                            )
-                            
-                            # 카운터 증가
-                            category_counts[category] += 1
-                            logger.info(f"영양제 {supplement_name} - {category} 카테고리 문서 추가 완료 (현재: {category_counts[category]})")
-                            
-                        except Exception as e:
-                            logger.error(f"벡터 저장소 추가 중 오류 발생: {str(e)}")
-                            continue
-                            
-                except Exception as e:
-                    logger.error(f"영양제 {supplement_name} 검색 중 오류 발생: {str(e)}")
-                    continue
-                    
-        logger.info("건강 데이터 업데이트 완료")
-        logger.info(f"카테고리별 문서 수: {category_counts}")
-
-    async def search_supplements_for_condition(self, condition: str, n_results: int = 3) -> List[Dict]:
-        """건강 상태에 따른 영양제 검색"""
+        Args:
+            conditions: 건강 상태 리스트
+            n_results: 조건별 검색 결과 수
+            
+        Returns:
+            조건 순서와 동일한 영양제 검색 결과 리스트
+        """
+        if not conditions:
+            return []
+            
         try:
             # 검색 쿼리 구성
-            query = f"건강 상태 '{condition}'에 도움이 되는 영양제 추천"
+            queries = [f"건강 상태 '{condition}'에 도움이 되는 영양제 추천" for condition in conditions]
             
-            # supplements 컬렉션에서 검색
-            collection = self.client.get_collection("supplements")
-            query_embedding = await self.embedding_creator(query)
+            # supplements 컬렉션에서 일괄 검색 (쿼리는 조건명만 바뀌는 고정 형식이라 캐시 적중률이 높음)
+            collection, query_embeddings = await asyncio.gather(
+                self._collection("supplements"),
+                self.embedding_creator.embed_matrix(queries)
+            )
             
-            results = collection.query(
-                query_embeddings=[query_embedding[0]],
+            results = await self._query(
+                collection,
+                query_embeddings=query_embeddings,
                 n_results=n_results
             )
             
-            # 결과 포맷팅
-            supplements = []
-            for i, (doc, metadata, distance) in enumerate(zip(
+            # 결과 포맷팅 (쿼리별, confidence는 거리 함수와 무관한 코사인 유사도)
+            space = self._collection_space(collection)
+            all_supplements = []
+            for docs, metadatas, distances in zip(
                 results["documents"],
                 results["metadatas"],
                 results["distances"]
-            )):
-                supplements.append({
-                    "name": metadata.get("name", f"supplement_{i}"),
-                    "description": doc,
-                    "confidence": float(distance),
-                    "evidence": metadata.get("evidence", []),
-                    "related": metadata.get("related_supplements", [])
-                })
+            ):
+                supplements = []
+                for i, (doc, metadata, distance) in enumerate(zip(docs, metadatas, distances)):
+                    metadata = metadata or {}
+                    supplements.append({
+                        "name": metadata.get("name", f"supplement_{i}"),
+                        "description": doc,
+                        "confidence": self._similarity(distance, space),
+                        "evidence": metadata.get("evidence", []),
+                        "related": metadata.get("related_supplements", [])
+                    })
+                all_supplements.append(supplements)
             
-            return supplements
+            return all_supplements
             
         except Exception as e:
-            logger.error(f"영양제 검색 중 오류: {str(e)}")
-            return []
+            logger.error(f"영양제 일괄 검색 중 오류: {str(e)}")
+            return [[] for _ in conditions]
 
-    async def search_supplements(self, query: str, n_results: int = 5) -> List[Dict]:
-        """영양제 검색"""
+    async def _cached_embed(self, key: Optional[str], text: str) -> List[float]:
+        """정규화된 캐시 키 기반 쿼리 임베딩 조회
+        
+        텍스트가 달라도 같은 키(예: 구간화된 건강 데이터)면 저장된 임베딩을 재사용합니다.
+        
+        Args:
+            key: 정규화된 캐시 키 (None이면 캐시 없이 생성)
+            text: 임베딩할 텍스트
+        """
+        if key is None:
+            return (await self.embedding_creator(text))[0]
+            
+        digest = hashlib.blake2b(key.encode(), digest_size=16).digest()
+        cache = self._query_embedding_cache
+        if digest in cache:
+            cache.move_to_end(digest)
+            return cache[digest]
+            
+        embedding = (await self.embedding_creator(text))[0]
+        # 실패 시 반환되는 0 벡터는 캐시하지 않음
+        if any(embedding):
+            cache[digest] = embedding
+            if len(cache) > self.QUERY_EMBEDDING_CACHE_SIZE:
+                cache.popitem(last=False)
+        return embedding
+
+    async def search_supplements(self, query: str, n_results: int = 5, cache_key: Optional[str] = None) -> List[Dict]:
+        """영양제 검색
+        
+        Args:
+            query: 검색 쿼리
+            n_results: 검색 결과 수
+            cache_key: 쿼리 임베딩 캐시 키 (의미상 같은 쿼리를 묶는 정규화된 값)
+        """
         try:
-            # 1. 임베딩 생성
-            query_embedding = await self.embedding_creator(query)
+            # 1. 임베딩 생성 (캐시 키가 같으면 재사용)
+            query_embedding = await self._cached_embed(cache_key, query)
             
             # 2. supplements 컬렉션 검색
-            supplements_collection = self.client.get_collection("supplements")
-            results = supplements_collection.query(
-                query_embeddings=[query_embedding[0]],
+            supplements_collection = await self._collection("supplements")
+            results = await self._query(
+                supplements_collection,
+                query_embeddings=[query_embedding],
                 n_results=n_results
             )
             
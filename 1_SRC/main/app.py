@@ -1,4 +1,6 @@
 import logging
+import asyncio
+import itertools
 from fastapi import FastAPI, HTTPException, Request, BackgroundTasks
 from fastapi.security import OAuth2PasswordRequestForm
 from core.vector_db.vector_store_manager import ChromaManager
@@ -413,6 +415,32 @@ class MemoryMonitor:
             logger.warning(f"Memory usage ({current_usage / 1024 / 1024:.2f} MB) exceeds threshold ({self.threshold / 1024 / 1024:.2f} MB)")
             gc.collect()  # 가비지 컬렉션 실행
 
+async def _add_medical_terms(chroma_manager: ChromaManager, collection, terms: List[tuple]) -> None:
+    """의학 용어 (한글, 영문, 카테고리) 목록을 한 번의 임베딩 요청과 collection.add로 저장"""
+    if not terms:
+        return
+    embeddings = await chroma_manager.embedding_creator.embed_matrix(
+        [f"{kr_term} {en_term}" for kr_term, en_term, _ in terms]
+    )
+    # 임베딩 생성에 실패한 (0 벡터) 용어는 저장하지 않음
+    mask = embeddings.any(axis=1)
+    for kr_term, en_term, _ in itertools.compress(terms, ~mask):
+        logger.error(f"의학 용어 임베딩 생성 실패: {kr_term} ({en_term})")
+    terms = list(itertools.compress(terms, mask))
+    if not terms:
+        return
+    await asyncio.to_thread(
+        collection.add,
+        embeddings=embeddings[mask],
+        documents=[f"{kr_term} ({en_term})" for kr_term, en_term, _ in terms],
+        metadatas=[{
+            "term_ko": kr_term,
+            "term_en": en_term,
+            "category": category_id
+        } for kr_term, en_term, category_id in terms],
+        ids=[f"term_{uuid.uuid4()}" for _ in terms]
+    )
+
 async def manage_chroma_database(
     action: str = "update",
     force: bool = False,
@@ -436,22 +464,12 @@ async def manage_chroma_database(
             health_keywords = config.get_health_keywords()
             
             # 각 키워드를 ChromaDB에 저장
-            for category_id, category_info in health_keywords.items():
-                if 'medical_terms' in category_info:
-                    for kr_term, en_term in category_info['medical_terms'].items():
-                        # 임베딩 생성
-                        embedding = chroma_manager.embedding_creator.create_embedding(f"{kr_term} {en_term}")
-                        # ChromaDB에 저장
-                        collection.add(
-                            embeddings=[embedding],
-                            documents=[f"{kr_term} ({en_term})"],
-                            metadatas=[{
-                                "term_ko": kr_term,
-                                "term_en": en_term,
-                                "category": category_id
-                            }],
-                            ids=[f"term_{uuid.uuid4()}"]
-                        )
+            terms = [
+                (kr_term, en_term, category_id)
+                for category_id, category_info in health_keywords.items()
+                for kr_term, en_term in category_info.get('medical_terms', {}).items()
+            ]
+            await _add_medical_terms(chroma_manager, collection, terms)
             
             logger.info("의학 용어 초기화 완료")
             
@@ -461,8 +479,8 @@ async def manage_chroma_database(
             collection = chroma_manager.client.get_collection("medical_terms")
             existing_terms = set()
             
-            # 기존 용어 수집
-            results = collection.get()
+            # 기존 용어 수집 (메타데이터만 조회)
+            results = collection.get(include=["metadatas"])
             for metadata in results["metadatas"]:
                 existing_terms.add(metadata["term_ko"])
             
@@ -470,28 +488,20 @@ async def manage_chroma_database(
             config = ConfigLoader()
             health_keywords = config.get_health_keywords()
             
-            for category_id, category_info in health_keywords.items():
-                if 'medical_terms' in category_info:
-                    for kr_term, en_term in category_info['medical_terms'].items():
-                        if kr_term not in existing_terms:
-                            embedding = chroma_manager.embedding_creator.create_embedding(f"{kr_term} {en_term}")
-                            collection.add(
-                                embeddings=[embedding],
-                                documents=[f"{kr_term} ({en_term})"],
-                                metadatas=[{
-                                    "term_ko": kr_term,
-                                    "term_en": en_term,
-                                    "category": category_id
-                                }],
-                                ids=[f"term_{uuid.uuid4()}"]
-                            )
+            terms = [
+                (kr_term, en_term, category_id)
+                for category_id, category_info in health_keywords.items()
+                for kr_term, en_term in category_info.get('medical_terms', {}).items()
+                if kr_term not in existing_terms
+            ]
+            await _add_medical_terms(chroma_manager, collection, terms)
             
             logger.info("의학 용어 업데이트 완료")
         
         if debug:
             logger.info("디버그 모드로 실행됨")
             collection = chroma_manager.client.get_collection("medical_terms")
-            count = len(collection.get()["ids"])
+            count = collection.count()
             logger.info(f"현재 저장된 의학 용어 수: {count}")
             
         if test_mode:
@@ -1,8 +1,16 @@
 from typing import Dict, List, Optional
 from pydantic import BaseModel, Field
+from enum import Enum
 import uuid
 from datetime import datetime
 
+class SessionStatus(str, Enum):
+    CREATED = "created"
+    ANALYZING = "analyzing"
+    WAITING_ANSWER = "waiting_answer"
+    COMPLETED = "completed"
+    ERROR = "error"
+
 class Question(BaseModel):
     id: str
     text: str
@@ -1,6 +1,7 @@
-from typing import List, Dict, Optional
+from typing import List, Dict, Literal, Optional
 from datetime import datetime
 from pydantic import BaseModel
+from typing_extensions import TypedDict
 
 class Evidence(BaseModel):
     pubmed_id: str
@@ -33,4 +34,17 @@ class Supplement(BaseModel):
     interactions: List[Interaction]
     evidence: List[Evidence]
     created_at: datetime
-    updated_at: datetime 
\ No newline at end of file
+    updated_at: datetime 
+
+class PrimaryRecommendation(TypedDict):
+    """1차 추천 LLM 응답 항목 (dict 형태 유지, TypeAdapter로 검증)"""
+    name: str
+    reason: str
+
+class PatternAnalysisResult(TypedDict):
+    """패턴 기반 상세 분석 LLM 응답 (dict 형태 유지, TypeAdapter로 검증)"""
+    status: str
+    description: str
+    evidence: List[str]
+    severity: Literal["high", "medium", "low"]
+    confidence_score: float
@@ -64,7 +64,7 @@ async def test_add_paper_to_collection(chroma_manager):
         "pmid": "test123",
         "title": "Test Paper",
         "abstract": "This is a test abstract",
-        "authors": ["Test Author"],
+        "authors": "Test Author",
         "publication_date": "2024-01-01",
         "journal": "Test Journal",
         "category": "test_category",
@@ -0,0 +1,90 @@
+import asyncio
+
+import numpy as np
+
+from core.vector_db.embedding_creator import EmbeddingCreator
+
+DIM = EmbeddingCreator.EMBEDDING_DIM
+
+class FakeEmbeddingClient:
+    """텍스트별 고정 난수 벡터를 반환하는 OpenAIClient 대체 (zero_texts는 실패로 0 벡터 반환)"""
+    
+    def __init__(self, zero_texts=()):
+        self.zero_texts = set(zero_texts)
+        self.requested = []
+        
+    def vector(self, text):
+        if text in self.zero_texts:
+            return [0.0] * DIM
+        rng = np.random.default_rng(abs(hash(text)) % (2 ** 32))
+        return rng.normal(0, 0.05, DIM).tolist()
+        
+    async def create_embedding(self, text):
+        self.requested.append(text)
+        return self.vector(text)
+        
+    async def create_embeddings(self, texts):
+        self.requested.extend(texts)
+        return [self.vector(text) for text in texts]
+
+def _creator(client, **kwargs):
+    kwargs.setdefault("cache_path", "")
+    kwargs.setdefault("quantize", False)
+    return EmbeddingCreator(client=client, **kwargs)
+
+def test_lru_eviction_order():
+    creator = _creator(FakeEmbeddingClient(), max_entries=2)
+    asyncio.run(creator.embed_matrix(["a", "b"]))
+    # a를 다시 사용하면 가장 오래 사용되지 않은 항목은 b
+    assert creator.get("a") is not None
+    asyncio.run(creator.embed_matrix(["c"]))
+    
+    assert creator.get("b") is None
+    assert creator.get("a") is not None
+    assert creator.get("c") is not None
+    assert creator.get_cache_stats()["cache_evictions"] == 1
+
+def test_quantize_round_trip_tolerance():
+    client = FakeEmbeddingClient()
+    creator = _creator(client, quantize=True)
+    asyncio.run(creator.embed_matrix(["vitamin d"]))
+    
+    original = np.asarray(client.vector("vitamin d"), dtype=np.float32)
+    restored = creator.get("vitamin d")
+    
+    assert restored.dtype == np.float32
+    assert np.abs(restored - original).max() <= np.abs(original).max() / 254 + 1e-7
+
+def test_persisted_cache_survives_restart(tmp_path):
+    cache_path = str(tmp_path / "embeddings.sqlite3")
+    first = _creator(FakeEmbeddingClient(), cache_path=cache_path)
+    expected = asyncio.run(first.embed_matrix(["a", "b"]))
+    first.close()
+    
+    client = FakeEmbeddingClient()
+    second = _creator(client, cache_path=cache_path)
+    result = asyncio.run(second.embed_matrix(["a", "b"]))
+    second.close()
+    
+    assert client.requested == []
+    assert second.get_cache_stats()["persisted_hits"] == 2
+    np.testing.assert_array_equal(result, expected)
+
+def test_zero_vectors_are_not_cached(tmp_path):
+    cache_path = str(tmp_path / "embeddings.sqlite3")
+    client = FakeEmbeddingClient(zero_texts={"bad"})
+    creator = _creator(client, cache_path=cache_path)
+    result = asyncio.run(creator.embed_matrix(["bad", "good"]))
+    creator.close()
+    
+    assert not result[0].any()
+    assert creator.get("bad") is None
+    assert creator.get("good") is not None
+    
+    # 재시작 후에도 실패한 텍스트는 다시 요청
+    retry_client = FakeEmbeddingClient()
+    restarted = _creator(retry_client, cache_path=cache_path)
+    asyncio.run(restarted.embed_matrix(["bad", "good"]))
+    restarted.close()
+    
+    assert retry_client.requested == ["bad"]
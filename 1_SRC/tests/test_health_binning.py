@@ -0,0 +1,59 @@
+import pytest
+from utils.health_binning import bin_metrics, bin_value, health_cache_key
+
+@pytest.fixture
+def health_data():
+    return {
+        "basic_info": {"age": 45, "gender": "male", "height": 170.2, "weight": 66.8},
+        "blood_test": {
+            "ldl_cholesterol": 143.2,
+            "hdl_cholesterol": 52.7,
+            "total_cholesterol": 228
+        },
+        "lifestyle": {"smoking": False, "exercise_frequency": 2},
+        "examination_date": "2024-01-01"
+    }
+
+def test_bin_value():
+    # 경계값 기준 구간 번호
+    assert bin_value("ldl_cholesterol", 99) == 0
+    assert bin_value("ldl_cholesterol", 143.2) == 2
+    assert bin_value("hdl_cholesterol", 52.7) == 1
+    
+    # 정의되지 않은 지표, 불리언, 문자열은 그대로 유지
+    assert bin_value("exercise_frequency", 2) == 2
+    assert bin_value("smoking", True) is True
+    assert bin_value("gender", "male") == "male"
+
+def test_bin_metrics_nested(health_data):
+    binned = bin_metrics(health_data)
+    
+    assert binned["blood_test"]["ldl_cholesterol"] == 2
+    assert binned["basic_info"]["gender"] == "male"
+    assert "examination_date" not in binned
+    # 원본은 변경되지 않음
+    assert health_data["blood_test"]["ldl_cholesterol"] == 143.2
+
+def test_health_cache_key_same_bin(health_data):
+    similar = {
+        **health_data,
+        "blood_test": {**health_data["blood_test"], "ldl_cholesterol": 141.0},
+        "examination_date": "2024-02-01"
+    }
+    different = {
+        **health_data,
+        "blood_test": {**health_data["blood_test"], "ldl_cholesterol": 165.0}
+    }
+    
+    assert health_cache_key(health_data) == health_cache_key(similar)
+    assert health_cache_key(health_data) != health_cache_key(different)
+
+def test_bin_metrics_value_by_type():
+    # value는 형제 필드 type의 구간 기준으로 변환되고 키에서 빠지지 않음
+    low = {"measurements": [{"type": "ldl_cholesterol", "value": 95.0}]}
+    high = {"measurements": [{"type": "ldl_cholesterol", "value": 170.0}]}
+    
+    assert bin_metrics(low)["measurements"][0] == {"type": "ldl_cholesterol", "value": 0}
+    assert health_cache_key(low) != health_cache_key(high)
+    # type이 BINS에 없으면 원래 값 유지
+    assert bin_metrics({"type": "memo", "value": 3})["value"] == 3
@@ -0,0 +1,43 @@
+from utils.json_utils import ArrayItemParser, ObjectParser
+
+def test_array_item_parser_streaming_chunks():
+    # 코드 블록 표시와 문자열 내부의 괄호/따옴표는 원소 경계로 보지 않음
+    text = '```json\n[{"name": "오메가\\"3", "reason": "수치 [HDL] {35}"}, {"name": "비타민D", "reason": "15ng/mL"}]\n```'
+    parser = ArrayItemParser()
+    items = []
+    for i in range(0, len(text), 4):
+        items.extend(parser.feed(text[i:i + 4]))
+    
+    assert items == [
+        {"name": "오메가\"3", "reason": "수치 [HDL] {35}"},
+        {"name": "비타민D", "reason": "15ng/mL"}
+    ]
+
+def test_array_item_parser_yields_on_close():
+    parser = ArrayItemParser()
+    
+    assert parser.feed('[{"name": "마그네슘", "reason": "수면"') == []
+    assert parser.feed('}, {"name"') == [{"name": "마그네슘", "reason": "수면"}]
+
+def test_array_item_parser_wrapped_object():
+    # JSON 모드 응답의 {"items": [...]} 래퍼 안 배열도 같은 방식으로 파싱
+    parser = ArrayItemParser()
+    
+    assert parser.feed('{"items": [{"name": "아연", "reason": "면역"}]}') == [{"name": "아연", "reason": "면역"}]
+    assert parser.done
+
+def test_array_item_parser_bracket_in_preceding_string():
+    # 배열 앞 문자열 값 안의 괄호는 배열 시작으로 보지 않음
+    parser = ArrayItemParser()
+    
+    assert parser.feed('{"note": "참고 [1] {x}", "items": [{"name": "철분"}') == [{"name": "철분"}]
+    assert not parser.done
+    assert parser.feed(']}') == []
+    assert parser.done
+
+def test_object_parser_completes_before_trailing_text():
+    parser = ObjectParser()
+    
+    assert parser.feed('```json\n{"status": "success", "evidence": ["근거 {1}"]') is None
+    assert parser.feed(', "severity": "low"}\n```') == {"status": "success", "evidence": ["근거 {1}"], "severity": "low"}
+    assert parser.done
@@ -0,0 +1,12 @@
+from pprint import pformat
+from utils.logger_config import PrettyLogger
+
+def test_format_data_truncates_like_pformat():
+    logger = PrettyLogger('test_logger_config')
+    short = {"message": "짧은 로그", "data": [1, 2, 3]}
+    large = {"message": "긴 로그", "data": [{"name": f"영양제{i}", "reason": "이유" * 30} for i in range(500)]}
+    
+    assert logger._format_data(short) == pformat(short, indent=2, width=80)
+    
+    lines = pformat(large, indent=2, width=80).split('\n')
+    assert logger._format_data(large) == '\n'.join(lines[:5]) + '\n... [truncated]'
@@ -0,0 +1,60 @@
+from utils import response_cache
+from utils.response_cache import ResponseCache
+
+def _messages(systolic):
+    return [{"role": "user", "content": f"건강 데이터: {{\"systolic\": {systolic}}} 에 맞는 영양제 추천"}]
+
+RESPONSE = {"role": "assistant", "content": "[]"}
+
+def test_hit_and_miss():
+    cache = ResponseCache()
+    
+    assert cache.get(_messages(120)) is None
+    cache.set(_messages(120), RESPONSE)
+    
+    assert cache.get(_messages(120)) == RESPONSE
+    assert cache.get(_messages(121)) is None
+
+def test_different_patients_never_share_entry():
+    cache = ResponseCache()
+    cache.set(_messages(120), {"role": "assistant", "content": "환자 A"})
+    cache.set(_messages(150), {"role": "assistant", "content": "환자 B"})
+    
+    assert cache.get(_messages(120))["content"] == "환자 A"
+    assert cache.get(_messages(150))["content"] == "환자 B"
+
+def test_ttl_expiry(monkeypatch):
+    now = [1000.0]
+    monkeypatch.setattr(response_cache.time, "monotonic", lambda: now[0])
+    cache = ResponseCache(ttl=10)
+    cache.set(_messages(120), RESPONSE)
+    
+    now[0] += 9
+    assert cache.get(_messages(120)) == RESPONSE
+    now[0] += 2
+    assert cache.get(_messages(120)) is None
+    assert len(cache) == 0
+
+def test_lru_bound():
+    cache = ResponseCache(max_entries=2)
+    cache.set(_messages(1), RESPONSE)
+    cache.set(_messages(2), RESPONSE)
+    cache.get(_messages(1))
+    cache.set(_messages(3), RESPONSE)
+    
+    assert cache.get(_messages(2)) is None
+    assert cache.get(_messages(1)) == RESPONSE
+    assert len(cache) == 2
+
+def test_returned_copy_does_not_mutate_cache():
+    cache = ResponseCache()
+    cache.set(_messages(120), RESPONSE)
+    cache.get(_messages(120))["content"] = "변경"
+    
+    assert cache.get(_messages(120)) == RESPONSE
+
+def test_disabled():
+    cache = ResponseCache(enabled=False)
+    cache.set(_messages(120), RESPONSE)
+    
+    assert cache.get(_messages(120)) is None
@@ -0,0 +1,72 @@
+import asyncio
+
+from core.session import session_manager
+from core.session.session_manager import SessionManager
+from models.session import Answer, SessionStatus
+
+def _run(coro):
+    return asyncio.run(coro)
+
+def test_session_visible_across_instances(tmp_path):
+    db_path = str(tmp_path / "sessions.sqlite3")
+    worker_a = SessionManager(db_path=db_path, ttl=60)
+    worker_b = SessionManager(db_path=db_path, ttl=60)
+    
+    session = _run(worker_a.create_session({"age": 40}))
+    loaded = _run(worker_b.get_session(session.id))
+    
+    assert loaded is not None
+    assert loaded.health_data == {"age": 40}
+
+def test_updates_from_both_instances_are_kept(tmp_path):
+    db_path = str(tmp_path / "sessions.sqlite3")
+    worker_a = SessionManager(db_path=db_path, ttl=60)
+    worker_b = SessionManager(db_path=db_path, ttl=60)
+    session = _run(worker_a.create_session({}))
+    # 두 워커 모두 메모리 사본을 가진 상태에서 각각 갱신
+    _run(worker_b.get_session(session.id))
+    
+    _run(worker_a.add_answer(session.id, Answer(question_id="q1", answer_text="예")))
+    _run(worker_b.add_answer(session.id, Answer(question_id="q2", answer_text="아니오")))
+    _run(worker_b.update_session_status(session.id, SessionStatus.COMPLETED))
+    
+    loaded = _run(worker_a.get_session(session.id))
+    assert [answer.question_id for answer in loaded.answers] == ["q1", "q2"]
+    assert loaded.status == SessionStatus.COMPLETED
+
+def test_deleted_session_is_not_revived(tmp_path):
+    db_path = str(tmp_path / "sessions.sqlite3")
+    worker_a = SessionManager(db_path=db_path, ttl=60)
+    worker_b = SessionManager(db_path=db_path, ttl=60)
+    session = _run(worker_a.create_session({}))
+    
+    assert _run(worker_b.cleanup_session(session.id))
+    
+    assert _run(worker_a.get_session(session.id)) is None
+    assert _run(worker_a.add_answer(session.id, Answer(question_id="q1", answer_text="예"))) is None
+    assert session.id not in worker_a._sessions
+
+def test_expired_session(tmp_path, monkeypatch):
+    now = [1000.0]
+    monkeypatch.setattr(session_manager.time, "time", lambda: now[0])
+    manager = SessionManager(db_path=str(tmp_path / "sessions.sqlite3"), ttl=10)
+    session = _run(manager.create_session({}))
+    
+    now[0] += 9
+    assert _run(manager.get_session(session.id)) is not None
+    now[0] += 11
+    assert _run(manager.get_session(session.id)) is None
+    assert session.id not in manager._sessions
+
+def test_memory_only_expiry_and_bound(monkeypatch):
+    now = [1000.0]
+    monkeypatch.setattr(session_manager.time, "time", lambda: now[0])
+    monkeypatch.setattr(SessionManager, "MEMORY_MAX_SESSIONS", 2)
+    manager = SessionManager(db_path="", ttl=10)
+    first, second, third = (_run(manager.create_session({})) for _ in range(3))
+    
+    assert _run(manager.get_session(first.id)) is None
+    assert _run(manager.get_session(third.id)) is not None
+    now[0] += 11
+    assert _run(manager.get_session(second.id)) is None
+    assert len(manager._sessions) == 1
@@ -0,0 +1,39 @@
+import os
+import uuid
+
+import pytest
+
+from utils import uuid_pool
+from utils.uuid_pool import fast_uuid4
+
+def test_fast_uuid4_format():
+    value = fast_uuid4()
+    parsed = uuid.UUID(value)
+    
+    assert str(parsed) == value
+    assert parsed.version == 4
+    assert parsed.variant == uuid.RFC_4122
+
+def test_fast_uuid4_refills_pool():
+    # 풀 크기보다 많이 생성해도 중복 없이 계속 생성
+    values = {fast_uuid4() for _ in range(uuid_pool.POOL_SIZE * 2 + 1)}
+    
+    assert len(values) == uuid_pool.POOL_SIZE * 2 + 1
+
+@pytest.mark.skipif(not hasattr(os, "fork"), reason="fork 미지원 플랫폼")
+def test_fast_uuid4_differs_after_fork():
+    # 부모 풀이 채워진 상태에서 fork해도 자식은 다른 UUID를 생성
+    fast_uuid4()
+    read_fd, write_fd = os.pipe()
+    pid = os.fork()
+    if pid == 0:
+        os.close(read_fd)
+        os.write(write_fd, fast_uuid4().encode())
+        os._exit(0)
+    os.close(write_fd)
+    with os.fdopen(read_fd) as reader:
+        child_value = reader.read()
+    os.waitpid(pid, 0)
+    
+    assert child_value
+    assert child_value != fast_uuid4()
@@ -0,0 +1,54 @@
+import asyncio
+import logging
+
+from core.vector_db.vector_store_manager import ChromaManager
+
+def _paper(pmid, category="mechanism"):
+    return {"pmid": pmid, "category": category}
+
+class _FailingManager(ChromaManager):
+    """첫 묶음 저장은 예외, 이후 묶음은 모두 저장되는 ChromaManager (서버 연결 없이 생성)"""
+    
+    def __init__(self):
+        self.calls = 0
+        
+    async def _flush_batch(self, collection_name, papers):
+        self.calls += 1
+        if self.calls == 1:
+            raise RuntimeError("chroma unavailable")
+        return {paper["pmid"] for paper in papers}
+
+def test_writer_reports_failed_batch_and_join_completes(caplog):
+    manager = _FailingManager()
+    categories = {"supplements": {"mechanism": 3}}
+    stats = {"new": 0, "failed": 0}
+    
+    async def run():
+        write_queue = asyncio.Queue()
+        writer = asyncio.create_task(manager._write_batches(write_queue, categories, stats))
+        await write_queue.put(("supplements", [_paper("1"), _paper("2")]))
+        await write_queue.put(("supplements", [_paper("3")]))
+        # 저장 실패가 있어도 모든 묶음이 task_done 처리되어 join이 끝나야 함
+        await asyncio.wait_for(write_queue.join(), timeout=1)
+        writer.cancel()
+        await asyncio.gather(writer, return_exceptions=True)
+        return writer
+        
+    with caplog.at_level(logging.ERROR, logger="vector_store"):
+        writer = asyncio.run(run())
+    
+    assert writer.cancelled()
+    assert stats == {"new": 1, "failed": 2}
+    # 실패한 논문은 카테고리 수에서 차감되어 다시 채울 수 있음
+    assert categories["supplements"]["mechanism"] == 1
+    assert any("chroma unavailable" in record.getMessage() for record in caplog.records)
+
+def test_invalid_paper_fields():
+    paper = {key: "x" for key in ChromaManager.PAPER_METADATA_FIELDS}
+    paper.update({"weight": 1.5, "processed_text": "본문"})
+    
+    assert ChromaManager._invalid_paper_fields(paper) == []
+    # 누락, None, 리스트 같은 비스칼라 값과 본문 누락은 모두 저장 불가
+    broken = {**paper, "authors": ["Kim", "Lee"], "journal": None}
+    del broken["title"], broken["processed_text"]
+    assert ChromaManager._invalid_paper_fields(broken) == ["title", "authors", "journal", "processed_text"]
@@ -0,0 +1,102 @@
+import bisect
+from typing import Any, Dict
+from utils import json_utils
+
+# 지표별 임상 구간 경계값 (bisect_left 기준, 오름차순)
+BINS: Dict[str, list] = {
+    # 혈압
+    "blood_pressure_systolic": [120, 130, 140, 160],
+    "blood_pressure_diastolic": [80, 85, 90, 100],
+    "systolic_bp": [120, 130, 140, 160],
+    "diastolic_bp": [80, 85, 90, 100],
+    "systolic": [120, 130, 140, 160],
+    "diastolic": [80, 85, 90, 100],
+    "heart_rate": [60, 100],
+
+    # 혈당
+    "glucose_fasting": [100, 126],
+    "fasting_blood_sugar": [100, 126],
+    "fasting": [100, 126],
+    "post_meal": [140, 200],
+
+    # 지질
+    "total_cholesterol": [200, 240],
+    "total": [200, 240],
+    "hdl_cholesterol": [40, 60],
+    "hdl": [40, 60],
+    "ldl_cholesterol": [100, 130, 160, 190],
+    "ldl": [100, 130, 160, 190],
+    "triglycerides": [150, 200, 500],
+    "triglyceride": [150, 200, 500],
+
+    # 혈액
+    "hemoglobin": [12.0, 13.5, 17.5],
+    "hematocrit": [36.0, 41.0, 50.0],
+
+    # 간/신장 기능
+    "alt": [40, 80],
+    "ast": [40, 80],
+    "sgotast": [40, 80],
+    "sgptalt": [40, 80],
+    "gammagtp": [63, 126],
+    "creatinine": [0.7, 1.2, 1.5],
+    "gfr": [60, 90],
+
+    # 신체 계측
+    "bmi": [18.5, 23.0, 25.0, 30.0],
+    "age": [20, 30, 40, 50, 60, 70],
+    "height": list(range(140, 200, 5)),
+    "weight": list(range(40, 120, 5)),
+    "waist_circumference": [85, 90, 100],
+
+    # 생활습관
+    "sleep_hours": [6.0, 7.0, 9.0],
+}
+
+# 캐시 키에서 제외할 요청별 가변 필드 (식별자, 시각)
+VOLATILE_KEYS = frozenset({
+    "uuid",
+    "created_at",
+    "updated_at",
+    "examination_date",
+    "analysis_timestamp",
+    "timestamp",
+})
+
+
+def bin_value(key: str, value: Any) -> Any:
+    """단일 지표 값을 임상 구간 번호로 변환"""
+    bins = BINS.get(key)
+    if bins is None or isinstance(value, bool) or not isinstance(value, (int, float)):
+        return value
+    return bisect.bisect_left(bins, value)
+
+
+def bin_metrics(data: Any) -> Any:
+    """건강 데이터의 연속 수치를 임상 구간으로 양자화
+
+    중첩된 딕셔너리/리스트를 재귀적으로 순회하며 BINS에 정의된 지표만 변환합니다.
+    원본 데이터는 변경하지 않습니다.
+
+    Args:
+        data: 건강 데이터 (딕셔너리, 리스트 또는 스칼라)
+
+    Returns:
+        구간화된 데이터
+    """
+    if isinstance(data, dict):
+        # {"type": "ldl", "value": 143} 형태는 형제 필드 type 기준으로 value를 구간화
+        metric = data.get("type")
+        return {
+            key: bin_metrics(bin_value(metric if key == "value" and isinstance(metric, str) else key, value))
+            for key, value in data.items()
+            if key not in VOLATILE_KEYS
+        }
+    if isinstance(data, (list, tuple)):
+        return [bin_metrics(item) for item in data]
+    return data
+
+
+def health_cache_key(data: Any) -> str:
+    """구간화된 건강 데이터로 안정적인 캐시 키 생성"""
+    return json_utils.dumps(bin_metrics(data), sort_keys=True)
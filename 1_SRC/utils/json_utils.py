@@ -0,0 +1,122 @@
+import orjson
+from typing import Any
+
+JSONDecodeError = orjson.JSONDecodeError
+
+def _default(obj: Any) -> Any:
+    """orjson이 기본 지원하지 않는 타입 변환 (datetime/date는 orjson이 직접 처리)"""
+    if hasattr(obj, 'model_dump'):  # Pydantic v2
+        return obj.model_dump()
+    elif hasattr(obj, 'dict'):  # Pydantic v1
+        return obj.dict()
+    elif hasattr(obj, '__dict__'):  # 일반 객체
+        return obj.__dict__
+    return str(obj)  # 기타 타입은 문자열로 변환
+
+def dumps(data: Any, indent: bool = False, sort_keys: bool = False) -> str:
+    """JSON 문자열 직렬화 (UTF-8 그대로 유지, ensure_ascii=False와 동일)"""
+    option = orjson.OPT_NON_STR_KEYS | orjson.OPT_SERIALIZE_NUMPY
+    if indent:
+        option |= orjson.OPT_INDENT_2
+    if sort_keys:
+        option |= orjson.OPT_SORT_KEYS
+    return orjson.dumps(data, default=_default, option=option).decode()
+
+def loads(data: str | bytes) -> Any:
+    """JSON 문자열 역직렬화"""
+    return orjson.loads(data)
+
+class ArrayItemParser:
+    """스트리밍 응답에서 첫 번째 JSON 배열의 객체 원소를 완성되는 즉시 파싱
+    
+    feed()로 들어오는 조각을 누적하면서 문자열/이스케이프 상태와 중첩 깊이를 추적하고,
+    배열 바로 아래의 객체가 닫히는 시점에 해당 구간만 역직렬화하여 반환합니다.
+    배열 바깥의 텍스트(코드 블록 표시, {"items": ...} 같은 래퍼 객체)는 무시하되,
+    배열 앞 문자열 값 안의 괄호를 배열 시작으로 오인하지 않도록 문자열 상태는
+    첫 글자부터 추적합니다. 배열이 닫히면 done이 True가 됩니다.
+    """
+    
+    def __init__(self):
+        self._buffer: list = []
+        self._depth = 0
+        self._in_string = False
+        self._escaped = False
+        self.done = False
+        
+    def feed(self, text: str) -> list:
+        """조각을 입력하고 이번에 완성된 원소 리스트 반환"""
+        items = []
+        for char in text:
+            if self.done:
+                break
+            if self._depth > 1:
+                self._buffer.append(char)
+                
+            if self._in_string:
+                if self._escaped:
+                    self._escaped = False
+                elif char == '\\':
+                    self._escaped = True
+                elif char == '"':
+                    self._in_string = False
+                continue
+                
+            if char == '"':
+                self._in_string = True
+            elif char in '[{':
+                if self._depth == 0:
+                    if char != '[':
+                        continue
+                elif self._depth == 1:
+                    self._buffer = [char]
+                self._depth += 1
+            elif char in ']}' and self._depth > 0:
+                self._depth -= 1
+                if self._depth == 1:
+                    items.append(orjson.loads(''.join(self._buffer)))
+                    self._buffer = []
+                elif self._depth == 0:
+                    self.done = True
+        return items
+
+
+class ObjectParser:
+    """스트리밍 응답에서 첫 번째 최상위 JSON 객체가 닫히는 즉시 파싱
+    
+    객체 앞뒤의 텍스트(코드 블록 표시 등)는 무시하며, 객체가 완성되면
+    나머지 응답을 기다리지 않고 결과를 사용할 수 있습니다.
+    """
+    
+    def __init__(self):
+        self._buffer: list = []
+        self._depth = 0
+        self._in_string = False
+        self._escaped = False
+        self.done = False
+        
+    def feed(self, text: str) -> Any:
+        """조각을 입력하고 객체가 완성되면 파싱 결과, 아니면 None 반환"""
+        if self.done:
+            return None
+        for char in text:
+            if self._depth == 0 and char != '{':
+                continue
+            self._buffer.append(char)
+            
+            if self._in_string:
+                if self._escaped:
+                    self._escaped = False
+                elif char == '\\':
+                    self._escaped = True
+                elif char == '"':
+                    self._in_string = False
+            elif char == '"':
+                self._in_string = True
+            elif char in '[{':
+                self._depth += 1
+            elif char in ']}':
+                self._depth -= 1
+                if self._depth == 0:
+                    self.done = True
+                    return orjson.loads(''.join(self._buffer))
+        return None
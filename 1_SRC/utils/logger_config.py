@@ -1,9 +1,31 @@
+import io
 import logging
 import os
-from pprint import pformat
+from pprint import PrettyPrinter
 from typing import Any, Dict
 from datetime import datetime
 
+class _FormatLimitReached(Exception):
+    """잘라낼 분량이 확정되어 포맷팅을 중단"""
+
+class _BoundedWriter:
+    """max_lines 줄 이상, max_length 글자 초과가 확정되면 쓰기를 중단하는 출력 스트림"""
+    
+    def __init__(self, buffer: io.StringIO, max_lines: int, max_length: int):
+        self.buffer = buffer
+        self.max_lines = max_lines
+        self.max_length = max_length
+        self.lines = 0
+        self.length = 0
+        
+    def write(self, text: str):
+        self.buffer.write(text)
+        self.lines += text.count('\n')
+        self.length += len(text)
+        # pprint가 마지막에 붙이는 줄바꿈 한 글자는 길이 비교에서 제외
+        if self.lines >= self.max_lines and self.length > self.max_length + 1:
+            raise _FormatLimitReached
+
 def setup_logging():
     """중앙 로깅 설정"""
     # 루트 로거 설정
@@ -66,18 +88,38 @@ class PrettyLogger:
     def __init__(self, name: str):
         self.logger = get_logger(name)
         
-    def _format_data(self, data: Any, max_length: int = 200) -> str:
-        """데이터를 보기 좋게 포맷팅"""
+    def isEnabledFor(self, level: int) -> bool:
+        """해당 레벨의 로그가 실제로 출력되는지 여부"""
+        return self.logger.isEnabledFor(level)
+        
+    def _format_data(self, data: Any, max_length: int = 200, max_lines: int = 5) -> str:
+        """데이터를 보기 좋게 포맷팅
+        
+        긴 데이터는 앞 max_lines 줄만 남기므로, 잘릴 것이 확정되는 시점에 포맷팅을
+        중단하여 큰 페이로드 전체를 문자열로 만들지 않습니다 (버퍼에는 앞부분만 쌓임).
+        """
         if isinstance(data, (dict, list)):
-            formatted = pformat(data, indent=2, width=80)
+            # 호출마다 새 버퍼 사용 (to_thread 워커와 공유되지 않도록)
+            buffer = io.StringIO()
+            try:
+                PrettyPrinter(
+                    indent=2, width=80, stream=_BoundedWriter(buffer, max_lines, max_length)
+                ).pprint(data)
+            except _FormatLimitReached:
+                lines = buffer.getvalue().split('\n')
+                return '\n'.join(lines[:max_lines]) + '\n... [truncated]'
+                
+            formatted = buffer.getvalue()[:-1]
             if len(formatted) > max_length:
                 lines = formatted.split('\n')
-                return '\n'.join(lines[:5]) + '\n... [truncated]'
+                return '\n'.join(lines[:max_lines]) + '\n... [truncated]'
             return formatted
         return str(data)
 
     def info(self, message: str, data: Any = None, step: str = None):
         """정보 레벨 로깅"""
+        if not self.logger.isEnabledFor(logging.INFO):
+            return
         log_entry = {
             'timestamp': datetime.now().isoformat(),
             'step': step,
@@ -88,8 +130,10 @@ class PrettyLogger:
             
         self.logger.info('\n' + self._format_data(log_entry))
 
-    def error(self, message: str, error: Exception = None, data: Any = None):
+    def error(self, message: str, error: Exception = None, data: Any = None, exc_info: bool = False):
         """에러 레벨 로깅"""
+        if not self.logger.isEnabledFor(logging.ERROR):
+            return
         log_entry = {
             'timestamp': datetime.now().isoformat(),
             'message': message,
@@ -99,10 +143,12 @@ class PrettyLogger:
         if data is not None:
             log_entry['data'] = data
             
-        self.logger.error('\n' + self._format_data(log_entry))
+        self.logger.error('\n' + self._format_data(log_entry), exc_info=exc_info)
 
     def debug(self, message: str, data: Any = None):
         """디버그 레벨 로깅"""
+        if not self.logger.isEnabledFor(logging.DEBUG):
+            return
         log_entry = {
             'timestamp': datetime.now().isoformat(),
             'message': message
@@ -114,6 +160,8 @@ class PrettyLogger:
 
     def warning(self, message: str, data: Any = None):
         """경고 레벨 로깅"""
+        if not self.logger.isEnabledFor(logging.WARNING):
+            return
         log_entry = {
             'timestamp': datetime.now().isoformat(),
             'message': message
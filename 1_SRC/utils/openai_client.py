@@ -1,16 +1,89 @@
-from openai import AsyncOpenAI
-from typing import List, Dict, Any
+from openai import AsyncOpenAI, RateLimitError
+from typing import List, Dict, Any, Optional, Callable, Awaitable, TypeVar, AsyncIterator
 from utils.logger_config import setup_logger
 from config.config_loader import CONFIG
+import httpx
+import asyncio
+import itertools
+import random
 
 logger = setup_logger('openai_client')
 
+# 프로세스 전체에서 공유하는 HTTP 연결 풀
+_http_client: Optional[httpx.AsyncClient] = None
+
+def get_http_client() -> httpx.AsyncClient:
+    """공유 HTTP 클라이언트 반환 (keep-alive 연결 풀 + HTTP/2)"""
+    global _http_client
+    if _http_client is None or _http_client.is_closed:
+        http_settings = CONFIG.get_openai_settings().get('http', {})
+        _http_client = httpx.AsyncClient(
+            http2=http_settings.get('http2', True),
+            limits=httpx.Limits(
+                max_connections=http_settings.get('max_connections', 200),
+                max_keepalive_connections=http_settings.get('max_keepalive_connections', 100)
+            ),
+            timeout=httpx.Timeout(
+                http_settings.get('timeout', 60.0),
+                connect=http_settings.get('connect_timeout', 5.0)
+            )
+        )
+        logger.info("공유 HTTP 연결 풀 생성 완료")
+    return _http_client
+
+async def close_http_client():
+    """공유 HTTP 클라이언트 종료"""
+    global _http_client
+    if _http_client is not None and not _http_client.is_closed:
+        await _http_client.aclose()
+    _http_client = None
+
+T = TypeVar('T')
+
+async def retry_on_rate_limit(
+    call: Callable[[], Awaitable[T]],
+    semaphore: Optional[asyncio.Semaphore] = None,
+    retries: Optional[int] = None,
+    max_wait: Optional[float] = None
+) -> T:
+    """동시 실행 제한 + RateLimitError 시 지수 백오프 재시도
+    
+    Args:
+        call: 매 시도마다 새 코루틴을 만드는 함수
+        semaphore: 호출 구간에만 적용할 동시 실행 제한 (대기는 세마포어 밖에서 수행)
+        retries: 최대 재시도 횟수 (기본값: service.openai.rate_limit_retries)
+        max_wait: 최대 대기 시간(초) (기본값: service.openai.rate_limit_max_wait)
+    """
+    settings = CONFIG.get_openai_settings()
+    retries = settings.get('rate_limit_retries', 5) if retries is None else retries
+    max_wait = settings.get('rate_limit_max_wait', 30.0) if max_wait is None else max_wait
+    
+    for attempt in range(retries + 1):
+        try:
+            if semaphore is None:
+                return await call()
+            async with semaphore:
+                return await call()
+        except RateLimitError:
+            if attempt >= retries:
+                raise
+            # 요청별 무작위 지수 백오프 (다른 요청은 계속 진행)
+            delay = random.uniform(0, min(max_wait, 2 ** attempt))
+            logger.warning(f"OpenAI rate limit, {delay:.2f}초 후 재시도 ({attempt + 1}/{retries})")
+            await asyncio.sleep(delay)
+
 class OpenAIClient:
     """OpenAI API 클라이언트"""
     
+    # 임베딩 요청당 입력 수 (API 상한 2048 이하)
+    EMBEDDING_BATCH_SIZE = 256
+    
     def __init__(self):
         """OpenAI 클라이언트 초기화"""
-        self.client = AsyncOpenAI(api_key=CONFIG._api_keys['openai'])
+        self.client = AsyncOpenAI(
+            api_key=CONFIG._api_keys['openai'],
+            http_client=get_http_client()
+        )
         self.settings = CONFIG.get_openai_settings()
         logger.info("OpenAI 클라이언트 초기화 완료")
         
@@ -35,6 +108,39 @@ class OpenAIClient:
             logger.error(f"입력 텍스트 길이: {len(text)}")
             return [0.0] * 1536
             
+    async def create_embeddings(self, texts: List[str]) -> List[List[float]]:
+        """여러 텍스트의 임베딩 벡터를 배치 요청으로 생성
+        
+        EMBEDDING_BATCH_SIZE 단위로 나눈 요청을 동시에 보내고 입력 순서대로 합칩니다.
+        
+        Args:
+            texts: 임베딩할 텍스트 리스트
+            
+        Returns:
+            입력 순서와 동일한 임베딩 벡터 리스트
+        """
+        if not texts:
+            return []
+            
+        batch_size = self.EMBEDDING_BATCH_SIZE
+        chunks = [texts[i:i + batch_size] for i in range(0, len(texts), batch_size)]
+        results = await asyncio.gather(*[self._create_embeddings_batch(chunk) for chunk in chunks])
+        return list(itertools.chain.from_iterable(results))
+        
+    async def _create_embeddings_batch(self, texts: List[str]) -> List[List[float]]:
+        """단일 임베딩 요청 (요청당 최대 2048개)"""
+        try:
+            response = await self.client.embeddings.create(
+                model=self.settings['embedding']['model'],
+                input=texts
+            )
+            return [item.embedding for item in sorted(response.data, key=lambda item: item.index)]
+            
+        except Exception as e:
+            logger.error(f"배치 임베딩 생성 실패: {str(e)}")
+            logger.error(f"입력 텍스트 수: {len(texts)}")
+            return [[0.0] * 1536 for _ in texts]
+            
     async def analyze_with_context(self, prompt: str, context: str = None) -> str:
         """컨텍스트를 포함한 프롬프트 분석
         
@@ -63,11 +169,16 @@ class OpenAIClient:
             logger.error(f"분석 실패: {str(e)}")
             return ""
             
-    async def chat_completion(self, messages: List[Dict[str, str]]) -> Dict[str, str]:
+    async def chat_completion(
+        self,
+        messages: List[Dict[str, str]],
+        response_format: Optional[Dict[str, Any]] = None
+    ) -> Dict[str, str]:
         """채팅 완료 요청
         
         Args:
             messages: 메시지 목록 (role과 content를 포함한 딕셔너리의 리스트)
+            response_format: 응답 형식 (json_object / json_schema, 없으면 자유 텍스트)
             
         Returns:
             응답 메시지
@@ -76,7 +187,8 @@ class OpenAIClient:
             response = await self.client.chat.completions.create(
                 model=self.settings['chat']['model'],
                 messages=messages,
-                temperature=self.settings['chat']['temperature']
+                temperature=self.settings['chat']['temperature'],
+                **({'response_format': response_format} if response_format else {})
             )
             return {
                 'content': response.choices[0].message.content,
@@ -87,6 +199,46 @@ class OpenAIClient:
             logger.error(f"채팅 완료 요청 실패: {str(e)}")
             raise
             
+    async def open_chat_stream(
+        self,
+        messages: List[Dict[str, str]],
+        response_format: Optional[Dict[str, Any]] = None
+    ) -> AsyncIterator[str]:
+        """스트리밍 채팅 완료 요청
+        
+        요청 연결까지만 await하고(RateLimitError는 여기서 발생) 본문은
+        도착하는 대로 content 조각을 내보내는 비동기 이터레이터로 반환합니다.
+        
+        Args:
+            messages: 메시지 목록 (role과 content를 포함한 딕셔너리의 리스트)
+            response_format: 응답 형식 (json_object / json_schema, 없으면 자유 텍스트)
+            
+        Returns:
+            응답 content 조각 이터레이터
+        """
+        try:
+            stream = await self.client.chat.completions.create(
+                model=self.settings['chat']['model'],
+                messages=messages,
+                temperature=self.settings['chat']['temperature'],
+                stream=True,
+                **({'response_format': response_format} if response_format else {})
+            )
+        except Exception as e:
+            logger.error(f"스트리밍 채팅 완료 요청 실패: {str(e)}")
+            raise
+            
+        async def _contents():
+            try:
+                async for chunk in stream:
+                    if chunk.choices and chunk.choices[0].delta.content:
+                        yield chunk.choices[0].delta.content
+            finally:
+                # 소비자가 중간에 종료해도 연결을 풀에 즉시 반환
+                await stream.response.aclose()
+                    
+        return _contents()
+            
     async def get_embeddings(self, text: str) -> List[float]:
         """텍스트의 임베딩 벡터를 생성"""
         return await self.create_embedding(text) 
\ No newline at end of file
@@ -0,0 +1,61 @@
+import hashlib
+import time
+from collections import OrderedDict
+from typing import Dict, List, Optional
+from utils import json_utils
+
+class ResponseCache:
+    """프롬프트 전체 기준 LLM 응답 캐시
+
+    메시지 목록 전체(역할/내용)의 SHA-256을 키로 사용하므로 프롬프트가 한 글자라도
+    다르면 (예: 다른 사용자의 건강 데이터) 절대 같은 항목을 공유하지 않습니다.
+    항목은 TTL이 지나면 만료되고, max_entries를 넘으면 가장 오래 사용되지 않은 항목부터 제거합니다.
+    """
+
+    def __init__(self, enabled: bool = True, ttl: float = 86400, max_entries: int = 1024):
+        """응답 캐시 초기화
+
+        Args:
+            enabled: 캐시 사용 여부
+            ttl: 항목 유지 시간 (초)
+            max_entries: 최대 항목 수
+        """
+        self.enabled = enabled
+        self.ttl = ttl
+        self.max_entries = max_entries
+        # 프롬프트 해시 -> (만료 시각, 응답)
+        self._entries: OrderedDict = OrderedDict()
+
+    @staticmethod
+    def key(messages: List[Dict[str, str]]) -> bytes:
+        """메시지 목록 전체의 SHA-256 키"""
+        return hashlib.sha256(json_utils.dumps(messages, sort_keys=True).encode()).digest()
+
+    def get(self, messages: List[Dict[str, str]]) -> Optional[Dict[str, str]]:
+        """같은 프롬프트의 캐시된 응답 조회 (호출자가 수정해도 캐시에 영향이 없도록 복사본 반환)"""
+        if not self.enabled:
+            return None
+
+        key = self.key(messages)
+        entry = self._entries.get(key)
+        if entry is None:
+            return None
+        if entry[0] <= time.monotonic():
+            del self._entries[key]
+            return None
+        self._entries.move_to_end(key)
+        return dict(entry[1])
+
+    def set(self, messages: List[Dict[str, str]], response: Dict[str, str]):
+        """LLM 응답 저장"""
+        if not self.enabled:
+            return
+
+        key = self.key(messages)
+        self._entries[key] = (time.monotonic() + self.ttl, dict(response))
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+
+    def __len__(self) -> int:
+        return len(self._entries)